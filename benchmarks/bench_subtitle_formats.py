@@ -0,0 +1,79 @@
+"""
+Throughput benchmark for the subtitle format layer.
+
+Compares the shared parser in src.core.subtitle_formats against pysrt and
+webvtt-py on large synthetic files.
+
+Usage:
+    python -m benchmarks.bench_subtitle_formats --cues 100000
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict
+
+import pysrt
+import webvtt
+
+from src.core.subtitle_formats import format_timestamp, read_subtitles, convert
+
+def write_synthetic(path: Path, cues: int, fmt: str):
+    """
+    Write a synthetic subtitle file with the given number of two-line cues.
+
+    Args:
+        path (Path): Output path
+        cues (int): Number of cues
+        fmt (str): 'vtt' or 'srt'
+    """
+    with open(path, 'w', encoding='utf-8') as f:
+        if fmt == 'vtt':
+            f.write('WEBVTT\n\n')
+        for i in range(cues):
+            start = i * 3000
+            f.write(f"{i + 1}\n{format_timestamp(start, fmt)} --> {format_timestamp(start + 2500, fmt)}\n")
+            f.write(f"Synthetic subtitle line number {i}\nwith a second line of text\n\n")
+
+def _time(fn: Callable[[], int]) -> Dict:
+    """Run fn once and report cues/sec."""
+    start = time.perf_counter()
+    count = fn()
+    elapsed = time.perf_counter() - start
+    return {'cues': count, 'seconds': elapsed, 'cues_per_sec': count / elapsed if elapsed else 0.0}
+
+def run(cues: int) -> Dict[str, Dict]:
+    """
+    Benchmark parsing and conversion on synthetic SRT and VTT files.
+
+    Args:
+        cues (int): Number of cues per synthetic file
+
+    Returns:
+        Dict[str, Dict]: Timing result per benchmark case
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as temp_dir:
+        srt_path = Path(temp_dir) / "synthetic.srt"
+        vtt_path = Path(temp_dir) / "synthetic.vtt"
+        write_synthetic(srt_path, cues, 'srt')
+        write_synthetic(vtt_path, cues, 'vtt')
+
+        results['parse_srt_subtitle_formats'] = _time(lambda: sum(1 for _ in read_subtitles(srt_path)))
+        results['parse_srt_pysrt'] = _time(lambda: len(pysrt.open(str(srt_path), encoding='utf-8')))
+        results['parse_vtt_subtitle_formats'] = _time(lambda: sum(1 for _ in read_subtitles(vtt_path)))
+        results['parse_vtt_webvtt'] = _time(lambda: len(webvtt.read(str(vtt_path)).captions))
+        results['convert_srt_to_vtt'] = _time(lambda: convert(str(srt_path), str(Path(temp_dir) / "out.vtt")))
+        results['convert_vtt_to_ttml'] = _time(lambda: convert(str(vtt_path), str(Path(temp_dir) / "out.ttml")))
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--cues', type=int, default=100000, help='Cues per synthetic file')
+    args = parser.parse_args()
+
+    for name, result in run(args.cues).items():
+        print(f"{name:32s} {result['cues_per_sec']:>14,.0f} cues/s  ({result['seconds']:.3f}s)")
+
+if __name__ == '__main__':
+    main()
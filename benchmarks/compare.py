@@ -0,0 +1,84 @@
+"""
+Compare two benchmark result files and flag regressions.
+
+Metrics ending in '_per_sec' are better when higher; latency, seconds and
+peak RSS metrics are better when lower. Other metrics are informational.
+
+Usage:
+    python -m benchmarks.compare benchmarks/results/base.json benchmarks/results/new.json --threshold 0.1
+"""
+import argparse
+import json
+import sys
+from typing import Dict, List, Optional
+
+def direction(metric: str) -> Optional[int]:
+    """
+    Return +1 if higher is better, -1 if lower is better, None if not comparable.
+
+    Args:
+        metric (str): Metric name
+
+    Returns:
+        Optional[int]: Comparison direction
+    """
+    if metric.endswith('_per_sec'):
+        return 1
+    if metric.endswith('_seconds') or metric in ('seconds', 'peak_rss_mb') or metric.endswith('_bytes'):
+        return -1
+    return None
+
+def compare(base: Dict, new: Dict, threshold: float = 0.1) -> List[Dict]:
+    """
+    Compare the results sections of two benchmark reports.
+
+    Args:
+        base (Dict): Baseline report
+        new (Dict): New report
+        threshold (float): Relative change treated as significant
+
+    Returns:
+        List[Dict]: One entry per comparable metric with 'case', 'metric',
+        'base', 'new', 'change' and 'regression'
+    """
+    rows = []
+    for case, metrics in new['results'].items():
+        base_metrics = base['results'].get(case, {})
+        for metric, value in metrics.items():
+            sign = direction(metric)
+            old = base_metrics.get(metric)
+            if sign is None or not isinstance(value, (int, float)) or not isinstance(old, (int, float)) or not old:
+                continue
+            change = (value - old) / old
+            rows.append({
+                'case': case,
+                'metric': metric,
+                'base': old,
+                'new': value,
+                'change': change,
+                'regression': change * sign < -threshold
+            })
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('base', help='Baseline results file')
+    parser.add_argument('new', help='New results file')
+    parser.add_argument('--threshold', type=float, default=0.1, help='Relative change treated as a regression')
+    args = parser.parse_args()
+
+    with open(args.base) as f:
+        base = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+
+    rows = compare(base, new, args.threshold)
+    for row in rows:
+        flag = 'REGRESSION' if row['regression'] else ''
+        print(f"{row['case']:20s} {row['metric']:48s} {row['base']:>14.4g} {row['new']:>14.4g} "
+              f"{row['change']:>+8.1%} {flag}")
+
+    sys.exit(1 if any(row['regression'] for row in rows) else 0)
+
+if __name__ == '__main__':
+    main()
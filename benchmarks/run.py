@@ -0,0 +1,634 @@
+"""
+Offline benchmark suite covering every pipeline stage.
+
+AWS clients and LanguageTool are replaced by the stubs in benchmarks.stubs
+(with configurable latency) and inputs are synthesized from data/. Each case
+runs in a fresh process so its peak RSS can be reported. Results are written
+as JSON for comparison with benchmarks.compare.
+
+Usage:
+    python -m benchmarks.run
+    python -m benchmarks.run --cases subtitle_processing text_regions --cues 20000
+    python -m benchmarks.run --latency '{"rekognition": 0.05, "s3": 0.01}'
+"""
+import argparse
+import json
+import multiprocessing
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from benchmarks import stubs, synthetic
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+CASES: Dict[str, Callable[[Dict], Dict]] = {}
+
+def case(fn: Callable[[Dict], Dict]) -> Callable[[Dict], Dict]:
+    """Register a benchmark case under its function name."""
+    CASES[fn.__name__] = fn
+    return fn
+
+def _latency_stats(samples: List[float]) -> Dict:
+    samples = sorted(samples)
+    return {
+        'latency_mean_seconds': statistics.mean(samples),
+        'latency_p50_seconds': samples[len(samples) // 2],
+        'latency_p95_seconds': samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+        'requests': len(samples)
+    }
+
+@case
+def subtitle_formats(config: Dict) -> Dict:
+    """Parse and convert throughput of the subtitle format layer."""
+    from benchmarks import bench_subtitle_formats
+    results = bench_subtitle_formats.run(config['cues'])
+    return {f"{name}_cues_per_sec": r['cues_per_sec'] for name, r in results.items()}
+
+@case
+def subtitle_processing(config: Dict) -> Dict:
+    """cues/sec for SubtitleProcessor.process_subtitle_file."""
+    stubs.install(stubs.latency_from_json(config['latency']), config['grammar_latency'])
+    from src.core.subtitle_processor import SubtitleProcessor
+
+    processor = SubtitleProcessor()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        input_path = Path(temp_dir) / "input.vtt"
+        cues = synthetic.scale_subtitles(input_path, config['cues'])
+        start = time.perf_counter()
+        success = processor.process_subtitle_file(str(input_path), str(Path(temp_dir) / "output.vtt"))
+        elapsed = time.perf_counter() - start
+    return {'success': success, 'cues': cues, 'seconds': elapsed, 'cues_per_sec': cues / elapsed}
+
+def _legacy_clean_text(text: str) -> str:
+    """SubtitleProcessor._clean_text before the translate-table normalizer, for comparison."""
+    text = ''.join(char for char in text if ord(char) < 65535)
+    lines = [line.strip() for line in text.split('\n') if line.strip()]
+    return '\n'.join(lines)
+
+@case
+def text_normalization(config: Dict) -> Dict:
+    """Millions of cues per minute for text cleaning and line/reading-speed reflow."""
+    from src.core.subtitle_formats import read_subtitles
+    from src.core.text_normalizer import normalize_text, Reflow
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        input_path = Path(temp_dir) / "input.vtt"
+        synthetic.scale_subtitles(input_path, config['text_cues'])
+        captions = list(read_subtitles(input_path))
+    texts = [caption.text for caption in captions]
+    results = {'cues': len(texts)}
+
+    for name, clean in (('legacy_clean', _legacy_clean_text), ('normalize', normalize_text)):
+        start = time.perf_counter()
+        for text in texts:
+            clean(text)
+        elapsed = time.perf_counter() - start
+        results[f'{name}_million_cues_per_min'] = len(texts) * 60 / elapsed / 1e6
+
+    reflow = Reflow()
+    cues = [{'start_ms': c.start_ms, 'end_ms': c.end_ms, 'start': c.start, 'end': c.end,
+             'text': normalize_text(c.text), 'position': None} for c in captions]
+    start = time.perf_counter()
+    reflowed = reflow.apply(cues)
+    elapsed = time.perf_counter() - start
+    results['reflow_million_cues_per_min'] = len(cues) * 60 / elapsed / 1e6
+    results['reflow_output_cues'] = len(reflowed)
+
+    for name, batch in (('before', cues), ('after', reflowed)):
+        results[f'long_lines_{name}'] = sum(
+            len(line) > reflow.max_chars_per_line for cue in batch for line in cue['text'].split('\n'))
+        results[f'over_max_cps_{name}'] = sum(reflow.reading_speed(cue) > reflow.max_cps for cue in batch)
+    return results
+
+@case
+def text_regions(config: Dict) -> Dict:
+    """frames/sec for VideoProcessor._analyze_text_regions."""
+    session = stubs.install(stubs.latency_from_json(config['latency']), config['grammar_latency'])
+    from src.core.video_processor import VideoProcessor
+
+    processor = VideoProcessor()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        video_path = Path(temp_dir) / "video.mp4"
+        meta = synthetic.render_video(synthetic.sample_videos()[0], video_path,
+                                      duration=config['video_seconds'],
+                                      resolution=tuple(config['resolution']))
+        start = time.perf_counter()
+        regions = processor._analyze_text_regions(str(video_path))
+        elapsed = time.perf_counter() - start
+    return {
+        'frames': meta['frames'],
+        'frames_with_text': len(regions),
+        'seconds': elapsed,
+        'frames_per_sec': meta['frames'] / elapsed,
+        'rekognition_calls': session.call_counts()['rekognition']
+    }
+
+def _pixel_text_boxes(frame_bytes: bytes) -> List[Dict]:
+    """
+    Find bright text lines in an encoded frame as sent to DetectText.
+
+    Works on the decoded JPEG pixels, so downscaling, colour conversion and
+    compression losses show up as missed or misplaced lines. Returns boxes
+    normalized to the encoded image.
+    """
+    import cv2
+    import numpy as np
+
+    image = cv2.imdecode(np.frombuffer(frame_bytes, dtype=np.uint8), cv2.IMREAD_GRAYSCALE)
+    height, width = image.shape
+    _, mask = cv2.threshold(image, 200, 255, cv2.THRESH_BINARY)
+    # Join the glyphs of a line horizontally, not neighbouring lines
+    kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (max(3, width // 40), 1))
+    mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel)
+    boxes = []
+    for contour in cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)[0]:
+        x, y, w, h = cv2.boundingRect(contour)
+        if h >= 3 and w >= 2 * h:
+            boxes.append({'Left': x / width, 'Top': y / height, 'Width': w / width, 'Height': h / height})
+    return boxes
+
+def _rekognition_text_boxes(client, frame_bytes: bytes) -> List[Dict]:
+    """LINE boxes Rekognition DetectText finds in an encoded frame."""
+    response = client.detect_text(Image={'Bytes': frame_bytes})
+    return [d['Geometry']['BoundingBox'] for d in response['TextDetections'] if d['Type'] == 'LINE']
+
+def _iou(a: Dict, b: Dict) -> float:
+    left = max(a['Left'], b['Left'])
+    top = max(a['Top'], b['Top'])
+    right = min(a['Left'] + a['Width'], b['Left'] + b['Width'])
+    bottom = min(a['Top'] + a['Height'], b['Top'] + b['Height'])
+    inter = max(0.0, right - left) * max(0.0, bottom - top)
+    union = a['Width'] * a['Height'] + b['Width'] * b['Height'] - inter
+    return inter / union if union else 0.0
+
+@case
+def frame_preprocessing(config: Dict) -> Dict:
+    """Encode time, payload size and text detection recall per preprocessing setting."""
+    from src.core.frame_preprocessor import FramePreprocessor, REDUCED, SUBTITLE_BANDS
+
+    variants = {
+        'default': FramePreprocessor(),
+        'reduced': FramePreprocessor(**REDUCED),
+        'gray_960_q70': FramePreprocessor(max_dimension=960, grayscale=True, jpeg_quality=70),
+        'subtitle_bands': FramePreprocessor(roi_bands=SUBTITLE_BANDS, **REDUCED),
+    }
+    if config['rekognition']:
+        # A real session: stubs.install replaces boto3.client, not Session.client
+        import boto3
+        client = boto3.session.Session().client('rekognition')
+        detect = lambda frame_bytes: _rekognition_text_boxes(client, frame_bytes)
+    else:
+        detect = _pixel_text_boxes
+    stats = {name: {'seconds': 0.0, 'bytes': 0, 'frames': 0, 'expected': 0, 'found': 0} for name in variants}
+
+    for description_path in synthetic.sample_videos():
+        description = synthetic.load_video_description(description_path)
+        width, height = description['metadata']['width'], description['metadata']['height']
+        timestamps = [i * 0.5 for i in range(int(description['metadata']['duration'] / 0.5))]
+        for t in timestamps:
+            frame = synthetic.render_frame(description, t, width, height)
+            truth = [synthetic.overlay_box(o, width, height) for o in synthetic.overlays_at(description, t)]
+            for name, preprocessor in variants.items():
+                start = time.perf_counter()
+                frame_bytes, layout = preprocessor.prepare(frame)
+                stats[name]['seconds'] += time.perf_counter() - start
+                stats[name]['bytes'] += len(frame_bytes)
+                stats[name]['frames'] += 1
+                if not truth:
+                    continue
+                found = [preprocessor.map_bbox(box, layout) for box in detect(frame_bytes)]
+                found = [box for box in found if box is not None]
+                stats[name]['expected'] += len(truth)
+                stats[name]['found'] += sum(1 for box in truth if any(_iou(box, f) >= 0.5 for f in found))
+
+    results = {'detector': 'rekognition' if config['rekognition'] else 'pixel'}
+    base = stats['default']
+    for name, s in stats.items():
+        results[f'{name}_encode_seconds'] = s['seconds'] / s['frames']
+        results[f'{name}_payload_bytes'] = s['bytes'] / s['frames']
+        results[f'{name}_recall'] = s['found'] / s['expected'] if s['expected'] else 1.0
+        if name != 'default':
+            # One DetectText call per frame whatever the setting, so savings are in bytes
+            results[f'{name}_payload_ratio'] = s['bytes'] / base['bytes']
+            results[f'{name}_recall_vs_default'] = (results[f'{name}_recall'] / results['default_recall']
+                                                    if results['default_recall'] else 0.0)
+    return results
+
+@case
+def text_regions_video_job(config: Dict) -> Dict:
+    """Latency of the Rekognition video job backend, including result pagination."""
+    session = stubs.install(stubs.latency_from_json(config['latency']), config['grammar_latency'])
+    from src.core.video_processor import VideoProcessor
+
+    rekognition = session.clients['rekognition']
+    rekognition.video_seconds = int(config['video_seconds'])
+    processor = VideoProcessor(text_backend='video')
+    processor.poll_interval = 0
+    with tempfile.TemporaryDirectory() as temp_dir:
+        video_path = Path(temp_dir) / "video.mp4"
+        video_path.write_bytes(b'')
+        start = time.perf_counter()
+        regions = processor._analyze_text_regions_video_job(str(video_path))
+        elapsed = time.perf_counter() - start
+    return {
+        'frames_with_text': len(regions),
+        'seconds': elapsed,
+        'rekognition_calls': session.call_counts()['rekognition'],
+        's3_calls': session.call_counts()['s3']
+    }
+
+@case
+def aws_services(config: Dict) -> Dict:
+    """Per-call latency of the AWSServices wrappers against stubbed clients."""
+    stubs.install(stubs.latency_from_json(config['latency']), config['grammar_latency'])
+    from src.core.aws_services import AWSServices
+
+    services = AWSServices()
+    services.poll_interval = 0
+    results = {}
+    with tempfile.TemporaryDirectory() as temp_dir:
+        audio_path = Path(temp_dir) / "audio.wav"
+        audio_path.write_bytes(b'')
+
+        samples = []
+        for _ in range(config['repeat']):
+            start = time.perf_counter()
+            services.transcribe_audio(str(audio_path))
+            samples.append(time.perf_counter() - start)
+        results['transcribe_audio'] = _latency_stats(samples)
+
+    samples = []
+    for _ in range(config['repeat']):
+        start = time.perf_counter()
+        services.translate_text("Hola y bienvenidos a todos!", "es", "en")
+        samples.append(time.perf_counter() - start)
+    results['translate_text'] = _latency_stats(samples)
+
+    return {f"{call}_{metric}": value for call, stats in results.items() for metric, value in stats.items()}
+
+@case
+def web_endpoints(config: Dict) -> Dict:
+    """End-to-end latency per web endpoint through the ASGI app."""
+    import os
+    stubs.install(stubs.latency_from_json(config['latency']), config['grammar_latency'])
+    # Measure the pipeline itself; web_coalescing covers the result cache
+    os.environ['SUBTITLE_RESULT_CACHE'] = '0'
+    from fastapi.testclient import TestClient
+    from src.web.app import app
+
+    client = TestClient(app)
+    results = {}
+    with tempfile.TemporaryDirectory() as temp_dir:
+        subtitle_path = Path(temp_dir) / "input.vtt"
+        synthetic.scale_subtitles(subtitle_path, config['web_cues'])
+        video_path = Path(temp_dir) / "video.mp4"
+        synthetic.render_video(synthetic.sample_videos()[0], video_path,
+                               duration=min(config['video_seconds'], 2.0),
+                               resolution=tuple(config['resolution']))
+        subtitle_bytes = subtitle_path.read_bytes()
+        video_bytes = video_path.read_bytes()
+
+        requests = {
+            'health': lambda: client.get("/health"),
+            'process_subtitle': lambda: client.post(
+                "/api/process-subtitle",
+                files={'subtitle_file': ("input.vtt", subtitle_bytes, "text/vtt")}),
+            'process_subtitle_with_video': lambda: client.post(
+                "/api/process-subtitle",
+                files={'subtitle_file': ("input.vtt", subtitle_bytes, "text/vtt"),
+                       'video_file': ("video.mp4", video_bytes, "video/mp4")}),
+            'generate_subtitle': lambda: client.post(
+                "/api/generate-subtitle",
+                files={'video_file': ("video.mp4", video_bytes, "video/mp4")}),
+        }
+        for name, send in requests.items():
+            samples = []
+            statuses = set()
+            for _ in range(config['repeat']):
+                start = time.perf_counter()
+                response = send()
+                samples.append(time.perf_counter() - start)
+                statuses.add(response.status_code)
+            results[name] = dict(_latency_stats(samples), status_codes=sorted(statuses))
+
+    return {f"{endpoint}_{metric}": value for endpoint, stats in results.items() for metric, value in stats.items()}
+
+@case
+def web_coalescing(config: Dict) -> Dict:
+    """Pipeline runs and latency for bursts of identical uploads, then cached and 304 repeats."""
+    import asyncio
+    import os
+    import httpx
+    session = stubs.install(stubs.latency_from_json(config['latency']), config['grammar_latency'])
+    with tempfile.TemporaryDirectory() as temp_dir:
+        os.environ['SUBTITLE_CACHE_DIR'] = temp_dir
+        from src.web.app import app
+
+        subtitle_path = Path(temp_dir) / "input.vtt"
+        synthetic.scale_subtitles(subtitle_path, config['web_cues'])
+        video_path = Path(temp_dir) / "video.mp4"
+        synthetic.render_video(synthetic.sample_videos()[0], video_path,
+                               duration=min(config['video_seconds'], 2.0),
+                               resolution=tuple(config['resolution']))
+        files = {'subtitle_file': ("input.vtt", subtitle_path.read_bytes(), "text/vtt"),
+                 'video_file': ("video.mp4", video_path.read_bytes(), "video/mp4")}
+
+        async def burst(client, headers=None):
+            async def send():
+                start = time.perf_counter()
+                response = await client.post("/api/process-subtitle", files=files, headers=headers)
+                return time.perf_counter() - start, response
+            return await asyncio.gather(*(send() for _ in range(config['burst'])))
+
+        async def run():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                first = await burst(client)
+                rekognition_calls = session.call_counts()['rekognition']
+                cached = await burst(client)
+                etag = cached[0][1].headers['etag']
+                revalidated = await burst(client, {'If-None-Match': etag})
+            return first, rekognition_calls, cached, revalidated
+
+        first, rekognition_calls, cached, revalidated = asyncio.run(run())
+
+    results = {'burst': config['burst'], 'rekognition_calls_first_burst': rekognition_calls,
+               'rekognition_calls_repeats': session.call_counts()['rekognition'] - rekognition_calls}
+    for name, responses in (('concurrent', first), ('cached', cached), ('not_modified', revalidated)):
+        stats = _latency_stats([elapsed for elapsed, _ in responses])
+        results[f'{name}_latency_p50_seconds'] = stats['latency_p50_seconds']
+        results[f'{name}_latency_p95_seconds'] = stats['latency_p95_seconds']
+        results[f'{name}_status_codes'] = sorted({response.status_code for _, response in responses})
+        results[f'{name}_cache_results'] = sorted({response.headers.get('x-cache', '') for _, response in responses})
+    return results
+
+@case
+def live_pipeline(config: Dict) -> Dict:
+    """End-to-end latency per segment of the live pipeline on a growing segment directory."""
+    import threading
+    stubs.install(stubs.latency_from_json(config['latency']), config['grammar_latency'])
+    from src.core.aws_services import AWSServices
+    from src.core.live_pipeline import LivePipeline, SegmentSource
+    from src.core.subtitle_processor import SubtitleProcessor
+
+    services = AWSServices()
+    services.poll_interval = 0
+    segments = config['live_segments']
+    with tempfile.TemporaryDirectory() as temp_dir:
+        feed = Path(temp_dir) / "feed"
+        feed.mkdir()
+
+        def packager():
+            # Every third segment is silent and should be skipped by VAD
+            for i in range(segments):
+                synthetic.write_audio_segment(feed / f"segment{i:05d}.wav", config['segment_seconds'],
+                                              speech=i % 3 != 2)
+                time.sleep(config['live_interval'])
+
+        writer = threading.Thread(target=packager)
+        writer.start()
+        pipeline = LivePipeline(SubtitleProcessor(), str(Path(temp_dir) / "out"),
+                                transcriber=services.transcribe_audio)
+        source = SegmentSource(str(feed), poll_interval=0.02, settle_time=0,
+                               idle_timeout=config['live_interval'] * 5 + 1.0)
+        start = time.perf_counter()
+        results = pipeline.run(source)
+        elapsed = time.perf_counter() - start
+        writer.join()
+
+    stats = _latency_stats([r['latency'] for r in results])
+    return {
+        'segments': len(results),
+        'transcribed_segments': sum(r['transcribed'] for r in results),
+        'end_to_end_latency_p50_seconds': stats['latency_p50_seconds'],
+        'end_to_end_latency_p95_seconds': stats['latency_p95_seconds'],
+        'end_to_end_latency_mean_seconds': stats['latency_mean_seconds'],
+        'seconds': elapsed
+    }
+
+def _rate_limited_worker(db_path: str, limits: Dict, level: str, start_at: float, duration: float,
+                         interval: float, queue):
+    """Worker process: acquire tokens from the shared limiter for `duration` seconds."""
+    from src.core.rate_limiter import RateLimiter, priority
+
+    limiter = RateLimiter(db_path=db_path, limits=limits)
+    limiter.acquire('bench.warmup')
+    waits = []
+    time.sleep(max(0.0, start_at - time.time()))
+    with priority(level):
+        while True:
+            start = time.perf_counter()
+            limiter.acquire('bench.call')
+            if time.time() >= start_at + duration:
+                break
+            waits.append(time.perf_counter() - start)
+            if interval:
+                time.sleep(interval)
+    queue.put({'level': level, 'waits': waits})
+
+@case
+def rate_limiter(config: Dict) -> Dict:
+    """Throughput of batch processes sharing one quota, and interactive wait while they saturate it."""
+    from src.core.rate_limiter import BATCH, INTERACTIVE
+
+    quota = config['quota']
+    duration = config['rate_seconds']
+    limits = {'bench.call': (quota, max(1.0, quota / 10.0))}
+    ctx = multiprocessing.get_context('spawn')
+    queue = ctx.Queue()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = str(Path(temp_dir) / "ratelimit.sqlite")
+        start_at = time.time() + 3.0
+        workers = [(BATCH, 0.0)] * config['rate_workers'] + [(INTERACTIVE, 0.2)]
+        processes = [
+            ctx.Process(target=_rate_limited_worker,
+                        args=(db_path, limits, level, start_at, duration, interval, queue))
+            for level, interval in workers
+        ]
+        for process in processes:
+            process.start()
+        reports = [queue.get() for _ in processes]
+        for process in processes:
+            process.join()
+
+    waits = {level: [w for r in reports if r['level'] == level for w in r['waits']] for level in (BATCH, INTERACTIVE)}
+    calls = sum(len(w) for w in waits.values())
+    results = {
+        'quota_per_sec': quota,
+        'calls_per_sec': calls / duration,
+        'quota_utilization': calls / duration / quota,
+        'batch_processes': config['rate_workers']
+    }
+    for level, samples in waits.items():
+        if samples:
+            stats = _latency_stats(samples)
+            results[f'{level}_wait_p50_seconds'] = stats['latency_p50_seconds']
+            results[f'{level}_wait_p95_seconds'] = stats['latency_p95_seconds']
+            results[f'{level}_calls'] = stats['requests']
+    return results
+
+@case
+def grammar_pool(config: Dict) -> Dict:
+    """cues/sec of grammar checking against LanguageTool pools of increasing size."""
+    import os
+    # Each stub server answers after a fixed delay, standing in for a check in its own JVM
+    stubs.install(stubs.latency_from_json(config['latency']), config['grammar_latency'] or 0.01)
+    from src.core.grammar_pool import LanguageToolPool
+    from src.core.subtitle_formats import read_subtitles
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        input_path = Path(temp_dir) / "input.vtt"
+        synthetic.scale_subtitles(input_path, config['grammar_cues'])
+        texts = [caption.text for caption in read_subtitles(input_path)]
+
+    sizes = config['pool_sizes'] or sorted({1, 2, 4, os.cpu_count() or 1})
+    results = {'cues': len(texts)}
+    baseline = None
+    for size in sizes:
+        pool = LanguageToolPool(size=size)
+        pool.check('warm up', 'en-US')
+        start = time.perf_counter()
+        pool.check_many(texts, 'en-US')
+        elapsed = time.perf_counter() - start
+        pool.close()
+        rate = len(texts) / elapsed
+        baseline = baseline or rate / size
+        results[f'pool_{size}_cues_per_sec'] = rate
+        results[f'pool_{size}_scaling_efficiency'] = rate / (baseline * size)
+    return results
+
+@case
+def metrics_overhead(config: Dict) -> Dict:
+    """Cost of a metrics span with collection enabled and disabled."""
+    from src.core import metrics
+
+    iterations = 200000
+    results = {}
+    for enabled in (False, True):
+        metrics.set_enabled(enabled)
+        start = time.perf_counter()
+        for _ in range(iterations):
+            with metrics.span('benchmark.noop'):
+                pass
+        elapsed = time.perf_counter() - start
+        state = 'enabled' if enabled else 'disabled'
+        results[f'span_{state}_seconds'] = elapsed / iterations
+        results[f'span_{state}_per_sec'] = iterations / elapsed
+    return results
+
+def _run_case(name: str, config: Dict, queue):
+    """Child process entry point: run one case and report its result and peak RSS."""
+    try:
+        result = CASES[name](config)
+        error = None
+    except Exception as e:
+        result, error = {}, f"{type(e).__name__}: {e}"
+    result['peak_rss_mb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+    if error:
+        result['error'] = error
+    queue.put(result)
+
+def run_case(name: str, config: Dict) -> Dict:
+    """
+    Run a benchmark case in a fresh process.
+
+    Args:
+        name (str): Registered case name
+        config (Dict): Suite configuration
+
+    Returns:
+        Dict: Case metrics including peak_rss_mb
+    """
+    ctx = multiprocessing.get_context('spawn')
+    queue = ctx.Queue()
+    process = ctx.Process(target=_run_case, args=(name, config, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                              cwd=Path(__file__).parent).stdout.strip()
+    except OSError:
+        return ''
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--cases', nargs='+', choices=sorted(CASES), default=sorted(CASES), help='Cases to run')
+    parser.add_argument('--cues', type=int, default=20000, help='Cues in synthetic subtitle files')
+    parser.add_argument('--web-cues', type=int, default=500, help='Cues in subtitle files uploaded to the web app')
+    parser.add_argument('--video-seconds', type=float, default=5.0, help='Length of synthetic videos')
+    parser.add_argument('--resolution', type=int, nargs=2, default=[1920, 1080], metavar=('WIDTH', 'HEIGHT'))
+    parser.add_argument('--latency', default='{}', help='Stub AWS latency per service as JSON, in seconds')
+    parser.add_argument('--grammar-latency', type=float, default=0.0, help='Stub LanguageTool latency per check')
+    parser.add_argument('--repeat', type=int, default=5, help='Requests per latency measurement')
+    parser.add_argument('--rekognition', action='store_true',
+                        help='Measure frame_preprocessing recall with real DetectText calls (needs AWS credentials)')
+    parser.add_argument('--quota', type=float, default=50.0, help='Requests per second allowed in the rate_limiter case')
+    parser.add_argument('--rate-workers', type=int, default=4, help='Batch processes sharing the quota in the rate_limiter case')
+    parser.add_argument('--rate-seconds', type=float, default=5.0, help='Duration of the rate_limiter case')
+    parser.add_argument('--live-segments', type=int, default=20, help='Segments fed to the live_pipeline case')
+    parser.add_argument('--segment-seconds', type=float, default=2.0, help='Duration of live segments')
+    parser.add_argument('--live-interval', type=float, default=0.1, help='Seconds between live segment arrivals')
+    parser.add_argument('--text-cues', type=int, default=200000, help='Cues in the text_normalization case')
+    parser.add_argument('--burst', type=int, default=8, help='Concurrent identical uploads in the web_coalescing case')
+    parser.add_argument('--grammar-cues', type=int, default=2000, help='Cues checked per pool size in the grammar_pool case')
+    parser.add_argument('--pool-sizes', type=int, nargs='+', help='LanguageTool pool sizes in the grammar_pool case '
+                        '(default 1, 2, 4 and the number of cores)')
+    parser.add_argument('--output', type=Path, help='Results file (defaults to benchmarks/results/<timestamp>.json)')
+    args = parser.parse_args()
+
+    config = {
+        'cues': args.cues,
+        'web_cues': args.web_cues,
+        'video_seconds': args.video_seconds,
+        'resolution': args.resolution,
+        'latency': args.latency,
+        'grammar_latency': args.grammar_latency,
+        'repeat': args.repeat,
+        'rekognition': args.rekognition,
+        'quota': args.quota,
+        'rate_workers': args.rate_workers,
+        'rate_seconds': args.rate_seconds,
+        'live_segments': args.live_segments,
+        'segment_seconds': args.segment_seconds,
+        'live_interval': args.live_interval,
+        'text_cues': args.text_cues,
+        'burst': args.burst,
+        'grammar_cues': args.grammar_cues,
+        'pool_sizes': args.pool_sizes
+    }
+
+    results = {}
+    for name in args.cases:
+        print(f"Running {name}...", file=sys.stderr)
+        results[name] = run_case(name, config)
+        for metric, value in results[name].items():
+            print(f"  {metric:48s} {value}", file=sys.stderr)
+
+    report = {
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'git_commit': _git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'config': config,
+        'results': results
+    }
+    output = args.output or RESULTS_DIR / f"{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results saved to: {output}", file=sys.stderr)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,217 @@
+"""
+Offline stand-ins for the AWS clients and LanguageTool used by the pipeline.
+
+Each stub sleeps for a configurable latency per call so that benchmarks
+exercise the same call pattern as production without network access.
+install() patches boto3.client, language_tool_python.LanguageTool and
+requests.get so that modules constructing their own clients (including
+src.web.app at import time) pick the stubs up.
+"""
+import json
+import os
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional
+
+class StubLatency:
+    """Per-service latency configuration in seconds."""
+
+    def __init__(self, rekognition: float = 0.0, translate: float = 0.0,
+                 transcribe: float = 0.0, s3: float = 0.0):
+        self.rekognition = rekognition
+        self.translate = translate
+        self.transcribe = transcribe
+        self.s3 = s3
+
+class _StubClient:
+    service = None
+
+    def __init__(self, latency: StubLatency):
+        self.latency = latency
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _call(self):
+        with self._lock:
+            self.calls += 1
+        delay = getattr(self.latency, self.service)
+        if delay:
+            time.sleep(delay)
+
+class StubRekognition(_StubClient):
+    service = 'rekognition'
+
+    def __init__(self, latency: StubLatency, detections: Optional[List[Dict]] = None):
+        super().__init__(latency)
+        self.detections = detections if detections is not None else [{
+            'DetectedText': 'Introduction',
+            'Type': 'LINE',
+            'Confidence': 99.0,
+            'Geometry': {'BoundingBox': {'Left': 0.4, 'Top': 0.05, 'Width': 0.2, 'Height': 0.05}}
+        }]
+
+    def detect_text(self, Image: Dict) -> Dict:
+        self._call()
+        return {'TextDetections': self.detections}
+
+    # Asynchronous video text detection: one detection set per sampled second
+    video_seconds = 60
+    page_size = 1000
+
+    def start_text_detection(self, Video: Dict) -> Dict:
+        self._call()
+        return {'JobId': uuid.uuid4().hex}
+
+    def get_text_detection(self, JobId: str, MaxResults: int = 1000, NextToken: Optional[str] = None) -> Dict:
+        self._call()
+        items = [
+            {'Timestamp': second * 1000, 'TextDetection': detection}
+            for second in range(self.video_seconds)
+            for detection in self.detections
+        ]
+        start = int(NextToken or 0)
+        end = start + min(MaxResults, self.page_size)
+        page = {'JobStatus': 'SUCCEEDED', 'TextDetections': items[start:end]}
+        if end < len(items):
+            page['NextToken'] = str(end)
+        return page
+
+class StubTranslate(_StubClient):
+    service = 'translate'
+
+    def translate_text(self, Text: str, SourceLanguageCode: str, TargetLanguageCode: str) -> Dict:
+        self._call()
+        return {'TranslatedText': f"[{TargetLanguageCode}] {Text}"}
+
+class StubS3(_StubClient):
+    service = 's3'
+
+    def upload_file(self, filename: str, bucket: str, key: str):
+        self._call()
+
+    def put_object(self, Bucket: str, Key: str, Body=None):
+        self._call()
+
+    def delete_object(self, Bucket: str, Key: str):
+        self._call()
+
+class StubTranscribe(_StubClient):
+    """Transcribe stub whose jobs complete after one round of polling."""
+    service = 'transcribe'
+
+    transcripts: Dict[str, Dict] = {}
+
+    def __init__(self, latency: StubLatency):
+        super().__init__(latency)
+        self.jobs = {}
+
+    def start_transcription_job(self, TranscriptionJobName: str, Media: Dict, MediaFormat: str,
+                                LanguageCode: str, Settings: Optional[Dict] = None):
+        self._call()
+        uri = f"stub://transcripts/{uuid.uuid4().hex}.json"
+        StubTranscribe.transcripts[uri] = _synthetic_transcript(LanguageCode)
+        self.jobs[TranscriptionJobName] = {
+            'TranscriptionJobName': TranscriptionJobName,
+            'TranscriptionJobStatus': 'IN_PROGRESS',
+            'Transcript': {'TranscriptFileUri': uri},
+            'MediaFormat': {'DurationInSeconds': 10.0}
+        }
+
+    def get_transcription_job(self, TranscriptionJobName: str) -> Dict:
+        self._call()
+        job = self.jobs[TranscriptionJobName]
+        status = job['TranscriptionJobStatus']
+        job = dict(job, TranscriptionJobStatus='COMPLETED')
+        self.jobs[TranscriptionJobName] = job
+        return {'TranscriptionJob': dict(job, TranscriptionJobStatus=status)}
+
+def _synthetic_transcript(language_code: str) -> Dict:
+    """Build a small Transcribe output document with two sentences."""
+    words = [('Welcome', 1.0, 1.4), ('to', 1.4, 1.5), ('the', 1.5, 1.6), ('demo', 1.6, 2.0),
+             ('.', None, None), ('Thanks', 3.0, 3.4), ('for', 3.4, 3.5), ('watching', 3.5, 4.0), ('.', None, None)]
+    items = []
+    for content, start, end in words:
+        if start is None:
+            items.append({'type': 'punctuation', 'alternatives': [{'content': content}]})
+        else:
+            items.append({'type': 'pronunciation', 'start_time': str(start), 'end_time': str(end),
+                          'alternatives': [{'content': content}]})
+    return {'results': {'items': items, 'language_code': language_code}}
+
+class StubResponse:
+    def __init__(self, payload: Dict):
+        self._payload = payload
+
+    def json(self) -> Dict:
+        return self._payload
+
+class StubLanguageTool:
+    """LanguageTool stand-in that performs no corrections."""
+
+    def __init__(self, language: str = 'en-US', latency: float = 0.0, **kwargs):
+        self.language = language
+        self.latency = latency
+
+    def check(self, text: str) -> List:
+        if self.latency:
+            time.sleep(self.latency)
+        return []
+
+    def close(self):
+        pass
+
+class StubSession:
+    """Holds one stub client per service, mirroring boto3.client()."""
+
+    def __init__(self, latency: Optional[StubLatency] = None):
+        self.latency = latency or StubLatency()
+        self.clients = {
+            'rekognition': StubRekognition(self.latency),
+            'translate': StubTranslate(self.latency),
+            'transcribe': StubTranscribe(self.latency),
+            's3': StubS3(self.latency)
+        }
+
+    def client(self, service_name: str, *args, **kwargs):
+        return self.clients[service_name]
+
+    def call_counts(self) -> Dict[str, int]:
+        return {name: client.calls for name, client in self.clients.items()}
+
+def install(latency: Optional[StubLatency] = None, grammar_latency: float = 0.0) -> StubSession:
+    """
+    Patch boto3, language_tool_python and requests to use the stubs.
+
+    Args:
+        latency (StubLatency): Per-service AWS latency
+        grammar_latency (float): Seconds per LanguageTool check
+
+    Returns:
+        StubSession: The session whose clients are now returned by boto3.client
+    """
+    import boto3
+    import language_tool_python
+    import requests
+
+    # Stubs have no quota; the rate_limiter case measures the limiter itself
+    os.environ.setdefault('SUBTITLE_RATE_LIMIT', '0')
+    session = StubSession(latency)
+    boto3.client = session.client
+    language_tool_python.LanguageTool = lambda language='en-US', **kwargs: StubLanguageTool(
+        language, grammar_latency, **kwargs)
+
+    real_get = getattr(requests.get, '__wrapped__', requests.get)
+
+    def get(url, *args, **kwargs):
+        if url.startswith('stub://'):
+            return StubResponse(StubTranscribe.transcripts[url])
+        return real_get(url, *args, **kwargs)
+
+    get.__wrapped__ = real_get
+    requests.get = get
+    return session
+
+def latency_from_json(value: str) -> StubLatency:
+    """Build a StubLatency from a JSON object such as '{"rekognition": 0.05}'."""
+    return StubLatency(**json.loads(value)) if value else StubLatency()
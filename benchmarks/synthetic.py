@@ -0,0 +1,195 @@
+"""
+Synthetic benchmark inputs scaled up from the samples in data/.
+"""
+import json
+import os
+import wave
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from src.core.subtitle_formats import read_subtitles, write_subtitles
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+
+def sample_subtitles() -> List[Path]:
+    """List the sample subtitle files."""
+    return sorted((DATA_DIR / "test_subtitles").glob("*.vtt"))
+
+def sample_videos() -> List[Path]:
+    """List the sample video description files."""
+    return sorted((DATA_DIR / "test_videos").glob("*.json"))
+
+def scale_subtitles(output_path: Path, cues: int, sources: Optional[List[Path]] = None) -> int:
+    """
+    Write a subtitle file by repeating the sample cues, shifted in time, until
+    it holds the requested number of cues.
+
+    Args:
+        output_path (Path): Output file (format follows the extension)
+        cues (int): Number of cues to write
+        sources (List[Path]): Subtitle files to draw cues from
+
+    Returns:
+        int: Number of cues written
+    """
+    # Lay the source files out back to back so cue times keep increasing
+    templates = []
+    span = 0
+    for path in sources or sample_subtitles():
+        captions = list(read_subtitles(path))
+        for caption in captions:
+            caption.start_ms += span
+            caption.end_ms += span
+        templates.extend(captions)
+        if captions:
+            span = max(c.end_ms for c in captions) + 1000
+    if not templates:
+        raise ValueError("No sample cues found")
+
+    def generate():
+        for i in range(cues):
+            template = templates[i % len(templates)]
+            shift = (i // len(templates)) * span
+            yield {
+                'start_ms': template.start_ms + shift,
+                'end_ms': template.end_ms + shift,
+                'text': template.text
+            }
+
+    fmt = {'.srt': 'srt', '.ass': 'ass', '.ttml': 'ttml'}.get(output_path.suffix, 'vtt')
+    return write_subtitles(generate(), output_path, fmt)
+
+def load_video_description(path: Path) -> Dict:
+    """Load a sample video description (metadata, scenes, overlays)."""
+    with open(path) as f:
+        return json.load(f)
+
+def overlays_at(description: Dict, timestamp: float) -> List[Dict]:
+    """
+    Return the text overlays visible at a timestamp in a sample description.
+
+    Args:
+        description (Dict): Sample video description
+        timestamp (float): Time in seconds (wrapped to the description duration)
+
+    Returns:
+        List[Dict]: Overlays with 'text' and pixel 'position'
+    """
+    t = timestamp % description['metadata']['duration']
+    return [
+        overlay
+        for scene in description['scenes']
+        if scene['start_time'] <= t < scene['end_time']
+        for overlay in scene['text_overlays']
+        if t - scene['start_time'] < overlay['duration']
+    ]
+
+def _text_layout(overlay: Dict, width: int, height: int, scale: Tuple[float, float]):
+    """Return the putText origin and pixel box (x, y, w, h) of an overlay."""
+    font_scale = height / 360.0
+    (text_w, text_h), baseline = cv2.getTextSize(overlay['text'], cv2.FONT_HERSHEY_SIMPLEX, font_scale, 2)
+    cx = overlay['position']['x'] * scale[0]
+    cy = overlay['position']['y'] * scale[1]
+    origin = (int(cx - text_w / 2), int(cy + text_h / 2))
+    return origin, (cx - text_w / 2, cy - text_h / 2, text_w, text_h + baseline)
+
+def overlay_box(overlay: Dict, width: int, height: int, scale: Tuple[float, float] = (1.0, 1.0)) -> Dict:
+    """
+    Compute the normalized bounding box of an overlay as rendered by render_video.
+
+    Args:
+        overlay (Dict): Overlay with 'text' and centre 'position' in description pixels
+        width (int): Rendered frame width
+        height (int): Rendered frame height
+        scale (Tuple[float, float]): Rendered size divided by description size
+
+    Returns:
+        Dict: Rekognition-style BoundingBox
+    """
+    _, (x, y, w, h) = _text_layout(overlay, width, height, scale)
+    return {'Left': x / width, 'Top': y / height, 'Width': w / width, 'Height': h / height}
+
+def render_frame(description: Dict, timestamp: float, width: int, height: int) -> np.ndarray:
+    """
+    Render one synthetic BGR frame with the overlays visible at a timestamp.
+
+    Args:
+        description (Dict): Sample video description
+        timestamp (float): Time in seconds
+        width (int): Frame width
+        height (int): Frame height
+
+    Returns:
+        np.ndarray: Frame
+    """
+    meta = description['metadata']
+    scale = (width / meta['width'], height / meta['height'])
+    gradient = np.linspace(0, 255, width, dtype=np.uint8)
+    shade = np.tile(np.roll(gradient, int(timestamp * meta['fps']) * 4), (height, 1))
+    frame = cv2.merge([shade, np.full_like(shade, 64), 255 - shade])
+    for overlay in overlays_at(description, timestamp):
+        origin, _ = _text_layout(overlay, width, height, scale)
+        cv2.putText(frame, overlay['text'], origin, cv2.FONT_HERSHEY_SIMPLEX,
+                    height / 360.0, (255, 255, 255), 2, cv2.LINE_AA)
+    return frame
+
+def render_video(description_path: Path, output_path: Path, duration: Optional[float] = None,
+                 fps: Optional[float] = None, resolution: Optional[Tuple[int, int]] = None) -> Dict:
+    """
+    Render a synthetic video for a sample description, drawing its text
+    overlays on a moving background and looping scenes to fill the duration.
+
+    Args:
+        description_path (Path): Sample video description JSON
+        output_path (Path): Output .mp4 path
+        duration (float): Video length in seconds (defaults to the description duration)
+        fps (float): Frame rate (defaults to the description frame rate)
+        resolution (Tuple[int, int]): Width and height (defaults to the description size)
+
+    Returns:
+        Dict: Metadata of the rendered video
+    """
+    description = load_video_description(description_path)
+    meta = description['metadata']
+    duration = duration or meta['duration']
+    fps = fps or meta['fps']
+    width, height = resolution or (meta['width'], meta['height'])
+
+    writer = cv2.VideoWriter(str(output_path), cv2.VideoWriter_fourcc(*'mp4v'), fps, (width, height))
+    frames = int(duration * fps)
+    try:
+        for i in range(frames):
+            writer.write(render_frame(description, i / fps, width, height))
+    finally:
+        writer.release()
+
+    return {'width': width, 'height': height, 'duration': frames / fps, 'fps': fps, 'frames': frames}
+
+def write_audio_segment(output_path: Path, duration: float, speech: bool = True, rate: int = 16000):
+    """
+    Write a 16-bit mono WAV segment containing a voiced tone or silence.
+
+    The file is written under a temporary name and renamed into place, like
+    a live packager, so watchers never see a partial segment.
+
+    Args:
+        output_path (Path): Output .wav path
+        duration (float): Segment length in seconds
+        speech (bool): Write a tone above the VAD threshold instead of silence
+        rate (int): Sample rate
+    """
+    t = np.arange(int(rate * duration)) / float(rate)
+    if speech:
+        samples = (np.sin(2 * np.pi * 180 * t) * np.sin(2 * np.pi * 3 * t) * 9000).astype(np.int16)
+    else:
+        samples = np.zeros(len(t), dtype=np.int16)
+    temp_path = output_path.with_name(f".{output_path.name}")
+    with wave.open(str(temp_path), 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(samples.tobytes())
+    os.replace(temp_path, output_path)
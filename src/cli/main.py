@@ -3,23 +3,47 @@ import os
 from pathlib import Path
 from ..core.subtitle_processor import SubtitleProcessor
 from ..core.video_processor import VideoProcessor
+from ..core.analysis_cache import AnalysisCache
+from ..core.frame_preprocessor import FramePreprocessor, REDUCED
+from ..core.live_pipeline import LivePipeline, SegmentSource
+from ..core.subtitle_formats import convert as convert_subtitles, SUPPORTED_FORMATS
+from ..core.text_normalizer import Reflow
+from ..core import metrics
 from typing import Optional
 
 @click.group()
-def cli():
+@click.option('--profile', is_flag=True, help='Print a per-stage timing breakdown when the command finishes')
+@click.pass_context
+def cli(ctx: click.Context, profile: bool):
     """Subtitle Enhancement System CLI"""
-    pass
+    # Metrics are only collected when profiling so normal runs pay nothing for them
+    metrics.set_enabled(profile)
+    if profile:
+        ctx.call_on_close(lambda: click.echo(metrics.REGISTRY.format_profile(), err=True))
 
 @cli.command()
 @click.argument('input_file', type=click.Path(exists=True))
 @click.option('--output', '-o', type=click.Path(), help='Output file path')
 @click.option('--video', '-v', type=click.Path(exists=True), help='Associated video file for positioning')
-def process_subtitle(input_file: str, output: Optional[str], video: Optional[str]):
+@click.option('--text-backend', type=click.Choice(VideoProcessor.TEXT_BACKENDS), default='auto', help='Rekognition text detection backend')
+@click.option('--analysis-cache/--no-analysis-cache', default=True, help='Reuse cached video analysis from earlier runs')
+@click.option('--preprocess/--no-preprocess', default=False, help='Send smaller grayscale frames to text detection (may change what is detected)')
+@click.option('--incremental', is_flag=True, help='Only re-process cues changed since the last run on this output')
+@click.option('--state-file', type=click.Path(), help='Incremental state file (default: OUTPUT.state.json)')
+@click.option('--language', '-l', help='Language code for grammar checking (detected by default)')
+@click.option('--max-line-length', type=int, default=42, show_default=True, help='Characters per line (0 keeps line breaks)')
+@click.option('--max-cps', type=float, default=17.0, show_default=True, help='Reading speed limit in characters per second (0 disables)')
+def process_subtitle(input_file: str, output: Optional[str], video: Optional[str], text_backend: str,
+                     analysis_cache: bool, preprocess: bool, incremental: bool, state_file: Optional[str], language: Optional[str],
+                     max_line_length: int, max_cps: float):
     """Process a subtitle file for enhancement."""
     try:
         # Create processors
-        subtitle_processor = SubtitleProcessor()
-        video_processor = None if not video else VideoProcessor()
+        subtitle_processor = SubtitleProcessor(
+            reflow=Reflow(max_chars_per_line=max_line_length or None, max_cps=max_cps or None))
+        video_processor = None if not video else VideoProcessor(
+            text_backend=text_backend, analysis_cache=AnalysisCache() if analysis_cache else None,
+            frame_preprocessor=FramePreprocessor(**REDUCED) if preprocess else None)
         
         # Determine output path
         if not output:
@@ -36,9 +60,14 @@ def process_subtitle(input_file: str, output: Optional[str], video: Optional[str
                 click.echo("Warning: Video analysis failed, proceeding with default positioning")
         
         # Process subtitles
-        success = subtitle_processor.process_subtitle_file(input_file, output)
+        state_path = None
+        if incremental:
+            state_path = state_file or f"{output}.state.json"
+        result = subtitle_processor.process_subtitle_file_incremental(input_file, output, state_path, language)
         
-        if success:
+        if result:
+            if incremental:
+                click.echo(f"Re-processed {result['reprocessed']} of {result['cues']} cues")
             click.echo(f"Successfully processed subtitles. Output saved to: {output}")
         else:
             click.echo("Error: Failed to process subtitles", err=True)
@@ -50,12 +79,21 @@ def process_subtitle(input_file: str, output: Optional[str], video: Optional[str
 @click.argument('video_file', type=click.Path(exists=True))
 @click.option('--output', '-o', type=click.Path(), help='Output subtitle file path')
 @click.option('--language', '-l', default='en-US', help='Language code for transcription')
-def generate_subtitle(video_file: str, output: Optional[str], language: str):
+@click.option('--text-backend', type=click.Choice(VideoProcessor.TEXT_BACKENDS), default='auto', help='Rekognition text detection backend')
+@click.option('--analysis-cache/--no-analysis-cache', default=True, help='Reuse cached video analysis from earlier runs')
+@click.option('--preprocess/--no-preprocess', default=False, help='Send smaller grayscale frames to text detection (may change what is detected)')
+@click.option('--max-line-length', type=int, default=42, show_default=True, help='Characters per line (0 keeps line breaks)')
+@click.option('--max-cps', type=float, default=17.0, show_default=True, help='Reading speed limit in characters per second (0 disables)')
+def generate_subtitle(video_file: str, output: Optional[str], language: str, text_backend: str,
+                      analysis_cache: bool, preprocess: bool, max_line_length: int, max_cps: float):
     """Generate subtitles from a video file."""
     try:
         # Create processors
-        video_processor = VideoProcessor()
-        subtitle_processor = SubtitleProcessor()
+        video_processor = VideoProcessor(
+            text_backend=text_backend, analysis_cache=AnalysisCache() if analysis_cache else None,
+            frame_preprocessor=FramePreprocessor(**REDUCED) if preprocess else None)
+        subtitle_processor = SubtitleProcessor(
+            reflow=Reflow(max_chars_per_line=max_line_length or None, max_cps=max_cps or None))
         
         # Determine output path
         if not output:
@@ -75,7 +113,8 @@ def generate_subtitle(video_file: str, output: Optional[str], language: str):
             click.echo("Generating subtitles...")
             success = subtitle_processor.process_subtitle_file(
                 video_analysis['speech_timestamps'],
-                output
+                output,
+                language=language
             )
             
             if success:
@@ -88,5 +127,50 @@ def generate_subtitle(video_file: str, output: Optional[str], language: str):
     except Exception as e:
         click.echo(f"Error: {str(e)}", err=True)
 
+@cli.command()
+@click.argument('input_file', type=click.Path(exists=True))
+@click.argument('output_file', type=click.Path())
+@click.option('--to', 'output_format', type=click.Choice(SUPPORTED_FORMATS), help='Output format (defaults to output file extension)')
+@click.option('--from', 'input_format', type=click.Choice(SUPPORTED_FORMATS), help='Input format (auto-detected by default)')
+@click.option('--language', '-l', help='Language tag recorded in TTML output (taken from TTML input by default)')
+def convert(input_file: str, output_file: str, output_format: Optional[str], input_format: Optional[str],
+            language: Optional[str]):
+    """Convert a subtitle file between VTT, SRT, ASS and TTML."""
+    try:
+        count = convert_subtitles(input_file, output_file, output_format, input_format, language)
+        click.echo(f"Converted {count} cues. Output saved to: {output_file}")
+    except Exception as e:
+        click.echo(f"Error: {str(e)}", err=True)
+
+@cli.command()
+@click.argument('source', type=click.Path(exists=True))
+@click.option('--output-dir', '-o', type=click.Path(), required=True, help='Directory for WebVTT segments and subtitles.m3u8')
+@click.option('--language', '-l', default='en-US', help='Language code for transcription')
+@click.option('--window', default=3, show_default=True, help='Recent segments kept for cues spanning segment boundaries')
+@click.option('--poll-interval', default=0.5, show_default=True, help='Seconds between checks for new segments')
+@click.option('--idle-timeout', default=30.0, show_default=True, help='Stop after this many seconds without a new segment')
+@click.option('--mpegts-offset', type=float, help='Stream start in seconds on the MPEG-TS clock (probed from the first segment by default)')
+def live(source: str, output_dir: str, language: str, window: int, poll_interval: float, idle_timeout: float,
+         mpegts_offset: Optional[float]):
+    """Subtitle a live stream from a segment directory or HLS playlist."""
+    try:
+        pipeline = LivePipeline(SubtitleProcessor(), output_dir, language_code=language, window=window,
+                                mpegts_offset=mpegts_offset)
+        segment_source = SegmentSource(source, poll_interval=poll_interval, idle_timeout=idle_timeout)
+
+        click.echo(f"Watching {source} for segments...")
+        results = pipeline.run(segment_source, on_segment=lambda r: click.echo(
+            f"Segment {r['sequence']}: {r['cues']} new cues, {r['emitted']} emitted, {r['latency']:.2f}s latency"
+        ))
+
+        if results:
+            latencies = sorted(r['latency'] for r in results)
+            click.echo(f"Processed {len(results)} segments. Latency p50 {latencies[len(latencies) // 2]:.2f}s, "
+                       f"max {latencies[-1]:.2f}s. Playlist: {pipeline.playlist_path}")
+        else:
+            click.echo("No segments received")
+    except Exception as e:
+        click.echo(f"Error: {str(e)}", err=True)
+
 if __name__ == '__main__':
     cli()
@@ -0,0 +1,195 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import numpy as np
+from collections.abc import Sequence
+from typing import Dict, List, Optional
+from pathlib import Path
+
+from .metrics import span, cache_hit, cache_miss
+
+# Bump when the sidecar layout changes so stale entries are ignored
+FORMAT_VERSION = 1
+
+class LazyTextRegions(Sequence):
+    """
+    Read-only list of text regions backed by memory-mapped columns.
+
+    Entries are built on access, so loading a sidecar costs nothing until
+    the regions are actually iterated.
+    """
+
+    def __init__(self, columns: Dict[str, np.ndarray]):
+        self._timestamps = columns['timestamps']
+        self._offsets = columns['region_offsets']
+        self._bboxes = columns['bboxes']
+        self._confidence = columns['confidence']
+        self._text_offsets = columns['text_offsets']
+        self._text = columns['text']
+
+    def __len__(self) -> int:
+        return len(self._timestamps)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+
+        regions = []
+        for j in range(int(self._offsets[index]), int(self._offsets[index + 1])):
+            left, top, width, height = (float(v) for v in self._bboxes[j])
+            text = bytes(self._text[int(self._text_offsets[j]):int(self._text_offsets[j + 1])]).decode('utf-8')
+            regions.append({
+                'text': text,
+                'confidence': float(self._confidence[j]),
+                'bbox': {'Left': left, 'Top': top, 'Width': width, 'Height': height}
+            })
+        return {'timestamp': float(self._timestamps[index]), 'regions': regions}
+
+class AnalysisCache:
+    def __init__(self, cache_dir: Optional[str] = None):
+        """
+        Initialize the on-disk cache of video analysis results.
+
+        Args:
+            cache_dir (str): Cache directory (defaults to $SUBTITLE_CACHE_DIR/analysis
+                or ~/.cache/subtitle-processor/analysis)
+        """
+        if cache_dir is None:
+            root = os.getenv('SUBTITLE_CACHE_DIR', str(Path.home() / '.cache' / 'subtitle-processor'))
+            cache_dir = str(Path(root) / 'analysis')
+        self.cache_dir = Path(cache_dir)
+
+    @staticmethod
+    def content_hash(path: str, block_size: int = 1 << 20) -> str:
+        """
+        Hash a file's content.
+
+        Args:
+            path (str): File path
+            block_size (int): Bytes read at a time
+
+        Returns:
+            str: Hex digest
+        """
+        digest = hashlib.blake2b(digest_size=20)
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(block_size), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def key(self, video_path: str, settings: Dict) -> str:
+        """
+        Build the cache key for a video and the analyzer settings used on it.
+
+        Args:
+            video_path (str): Path to video file
+            settings (Dict): JSON-serializable analyzer settings
+
+        Returns:
+            str: Cache key
+        """
+        settings_hash = hashlib.blake2b(
+            json.dumps(settings, sort_keys=True).encode('utf-8'), digest_size=8
+        ).hexdigest()
+        return f"{self.content_hash(video_path)}-{settings_hash}"
+
+    def load(self, key: str) -> Optional[Dict]:
+        """
+        Load a cached analysis with its region columns memory-mapped.
+
+        Args:
+            key (str): Cache key
+
+        Returns:
+            Optional[Dict]: Analysis results, or None if not cached
+        """
+        entry = self.cache_dir / key
+        try:
+            with span('video.analysis_cache_load'):
+                with open(entry / 'meta.json', encoding='utf-8') as f:
+                    meta = json.load(f)
+                if meta.get('version') != FORMAT_VERSION:
+                    cache_miss('video_analysis')
+                    return None
+                columns = {
+                    name: np.load(entry / f"{name}.npy", mmap_mode='r')
+                    for name in ('timestamps', 'region_offsets', 'bboxes', 'confidence', 'text_offsets', 'text')
+                }
+        except (OSError, ValueError):
+            cache_miss('video_analysis')
+            return None
+
+        cache_hit('video_analysis')
+        return {
+            'metadata': meta['metadata'],
+            'text_regions': LazyTextRegions(columns),
+            'speech_timestamps': meta['speech_timestamps']
+        }
+
+    def store(self, key: str, analysis: Dict):
+        """
+        Write an analysis result as a columnar sidecar.
+
+        The entry is written to a temporary directory and renamed into place,
+        so concurrent readers never see a partial entry.
+
+        Args:
+            key (str): Cache key
+            analysis (Dict): Analysis results from VideoProcessor.process_video
+        """
+        with span('video.analysis_cache_store'):
+            columns = self._to_columns(analysis['text_regions'] or [])
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            staging = Path(tempfile.mkdtemp(prefix=f".{key}-", dir=self.cache_dir))
+            try:
+                for name, values in columns.items():
+                    np.save(staging / f"{name}.npy", values)
+                with open(staging / 'meta.json', 'w', encoding='utf-8') as f:
+                    json.dump({
+                        'version': FORMAT_VERSION,
+                        'metadata': analysis['metadata'],
+                        'speech_timestamps': analysis['speech_timestamps']
+                    }, f)
+                try:
+                    os.replace(staging, self.cache_dir / key)
+                except OSError:
+                    # Another process stored the same entry first
+                    shutil.rmtree(staging, ignore_errors=True)
+            except Exception:
+                shutil.rmtree(staging, ignore_errors=True)
+                raise
+
+    @staticmethod
+    def _to_columns(text_regions: List[Dict]) -> Dict[str, np.ndarray]:
+        """Flatten text regions into parallel arrays."""
+        timestamps = np.empty(len(text_regions), dtype=np.float64)
+        region_offsets = np.zeros(len(text_regions) + 1, dtype=np.int64)
+        bboxes = []
+        confidence = []
+        encoded = []
+        for i, entry in enumerate(text_regions):
+            timestamps[i] = entry['timestamp']
+            for region in entry['regions']:
+                bbox = region['bbox']
+                bboxes.append((bbox['Left'], bbox['Top'], bbox['Width'], bbox['Height']))
+                confidence.append(region.get('confidence', 0.0))
+                encoded.append(region['text'].encode('utf-8'))
+            region_offsets[i + 1] = len(bboxes)
+
+        text_offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        if encoded:
+            np.cumsum([len(t) for t in encoded], out=text_offsets[1:])
+        return {
+            'timestamps': timestamps,
+            'region_offsets': region_offsets,
+            'bboxes': np.array(bboxes, dtype=np.float32).reshape(-1, 4),
+            'confidence': np.array(confidence, dtype=np.float32),
+            'text_offsets': text_offsets,
+            'text': np.frombuffer(b''.join(encoded), dtype=np.uint8)
+        }
@@ -0,0 +1,234 @@
+import wave
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+from pathlib import Path
+
+class AudioChunker:
+    def __init__(self, frame_duration: float = 0.03, search_window: float = 30.0,
+                 overlap: float = 2.0, block_duration: float = 60.0):
+        """
+        Initialize the audio chunker used for parallel transcription.
+
+        Args:
+            frame_duration (float): Length in seconds of each energy analysis frame
+            search_window (float): Seconds on either side of an even split point to search for silence
+            overlap (float): Seconds of audio shared between neighbouring chunks
+            block_duration (float): Seconds of audio read from disk at a time
+        """
+        self.frame_duration = frame_duration
+        self.search_window = search_window
+        self.overlap = overlap
+        self.block_duration = block_duration
+
+    def frame_energies(self, audio_path: str) -> Tuple[np.ndarray, float]:
+        """
+        Compute the RMS energy of fixed-length frames of a PCM WAV file.
+
+        The file is read in blocks so that multi-hour recordings never have to
+        be held in memory at once.
+
+        Args:
+            audio_path (str): Path to 16-bit PCM WAV file
+
+        Returns:
+            Tuple[np.ndarray, float]: Per-frame RMS energy and total duration in seconds
+        """
+        with wave.open(audio_path, 'rb') as wav:
+            if wav.getsampwidth() != 2:
+                raise ValueError("Only 16-bit PCM audio is supported")
+            channels = wav.getnchannels()
+            rate = wav.getframerate()
+            total_frames = wav.getnframes()
+            frame_len = max(1, int(rate * self.frame_duration))
+            block_len = frame_len * max(1, int(self.block_duration / self.frame_duration))
+
+            energies = []
+            carry = np.empty(0, dtype=np.float32)
+            while True:
+                data = wav.readframes(block_len)
+                if not data:
+                    break
+                samples = np.frombuffer(data, dtype=np.int16).astype(np.float32)
+                if channels > 1:
+                    samples = samples.reshape(-1, channels).mean(axis=1)
+                samples = np.concatenate([carry, samples])
+                usable = len(samples) - len(samples) % frame_len
+                frames = samples[:usable].reshape(-1, frame_len)
+                energies.append(np.sqrt((frames ** 2).mean(axis=1)))
+                carry = samples[usable:]
+
+            if len(carry):
+                energies.append(np.array([np.sqrt((carry ** 2).mean())], dtype=np.float32))
+
+        energy = np.concatenate(energies) if energies else np.empty(0, dtype=np.float32)
+        return energy, total_frames / float(rate)
+
+    def find_split_points(self, energy: np.ndarray, duration: float, num_chunks: int) -> List[float]:
+        """
+        Choose chunk boundaries at the quietest point near each even split.
+
+        Args:
+            energy (np.ndarray): Per-frame RMS energy
+            duration (float): Total audio duration in seconds
+            num_chunks (int): Number of chunks to produce
+
+        Returns:
+            List[float]: Boundaries in seconds, starting at 0 and ending at duration
+        """
+        boundaries = [0.0]
+        if num_chunks > 1 and len(energy):
+            window = int(self.search_window / self.frame_duration)
+            for i in range(1, num_chunks):
+                target = int(i * duration / num_chunks / self.frame_duration)
+                lo = max(target - window, int(boundaries[-1] / self.frame_duration) + 1)
+                hi = min(target + window + 1, len(energy))
+                if lo >= hi:
+                    continue
+                boundaries.append((lo + int(np.argmin(energy[lo:hi]))) * self.frame_duration)
+        boundaries.append(duration)
+        return boundaries
+
+    def split(self, audio_path: str, num_chunks: int, output_dir: Optional[str] = None) -> List[Dict]:
+        """
+        Split a WAV file at silence boundaries into overlapping chunk files.
+
+        Args:
+            audio_path (str): Path to 16-bit PCM WAV file
+            num_chunks (int): Number of chunks to produce
+            output_dir (str): Directory for chunk files (defaults to the audio file's directory)
+
+        Returns:
+            List[Dict]: Chunks with 'path', 'offset' (chunk audio start) and the
+            'core_start'/'core_end' range the chunk is authoritative for
+        """
+        energy, duration = self.frame_energies(audio_path)
+        boundaries = self.find_split_points(energy, duration, num_chunks)
+        source = Path(audio_path)
+        out_dir = Path(output_dir) if output_dir else source.parent
+
+        chunks = []
+        with wave.open(audio_path, 'rb') as wav:
+            rate = wav.getframerate()
+            params = wav.getparams()
+            for i, (core_start, core_end) in enumerate(zip(boundaries, boundaries[1:])):
+                start = max(0.0, core_start - self.overlap)
+                end = min(duration, core_end + self.overlap)
+                chunk_path = out_dir / f"{source.stem}_chunk{i:03d}.wav"
+
+                wav.setpos(int(start * rate))
+                with wave.open(str(chunk_path), 'wb') as out:
+                    out.setparams(params)
+                    remaining = int((end - start) * rate)
+                    block = int(self.block_duration * rate)
+                    while remaining > 0:
+                        data = wav.readframes(min(block, remaining))
+                        if not data:
+                            break
+                        out.writeframes(data)
+                        remaining -= min(block, remaining)
+
+                chunks.append({
+                    'index': i,
+                    'path': str(chunk_path),
+                    'offset': start,
+                    'core_start': core_start,
+                    'core_end': core_end
+                })
+        return chunks
+
+    def merge_transcripts(self, chunks: List[Dict], results: List[Optional[Dict]]) -> Dict:
+        """
+        Stitch per-chunk transcription results into a single transcript.
+
+        Segment times are shifted by each chunk's offset. Segments in the
+        overlap zone are kept only by the chunk whose core range contains their
+        midpoint, and speaker labels are reconciled across chunks.
+
+        Args:
+            chunks (List[Dict]): Chunk descriptions as returned by split()
+            results (List[Optional[Dict]]): Transcription results, one per chunk
+
+        Returns:
+            Dict: Merged transcription results
+        """
+        shifted = []
+        for chunk, result in zip(chunks, results):
+            segments = []
+            for segment in (result or {}).get('segments', []):
+                if segment['start_time'] is None:
+                    continue
+                segment = dict(segment)
+                segment['start_time'] += chunk['offset']
+                segment['end_time'] += chunk['offset']
+                segments.append(segment)
+            shifted.append(segments)
+
+        speaker_maps = self._reconcile_speakers(chunks, shifted)
+
+        merged = []
+        for chunk, segments, speaker_map in zip(chunks, shifted, speaker_maps):
+            for segment in segments:
+                midpoint = (segment['start_time'] + segment['end_time']) / 2
+                if not (chunk['core_start'] <= midpoint < chunk['core_end']
+                        or (chunk is chunks[-1] and midpoint >= chunk['core_end'])):
+                    continue
+                if segment.get('speaker') is not None:
+                    segment['speaker'] = speaker_map.get(segment['speaker'], segment['speaker'])
+                merged.append(segment)
+        merged.sort(key=lambda s: s['start_time'])
+
+        language_code = next((r['language_code'] for r in results if r), None)
+        return {
+            'segments': merged,
+            'language_code': language_code,
+            'duration': chunks[-1]['core_end'] if chunks else 0.0
+        }
+
+    def _reconcile_speakers(self, chunks: List[Dict], shifted: List[List[Dict]]) -> List[Dict[str, str]]:
+        """
+        Map each chunk's local speaker labels onto global labels.
+
+        Labels in neighbouring chunks are matched by how long their segments
+        overlap in time inside the shared audio; unmatched labels get a fresh
+        global label.
+
+        Args:
+            chunks (List[Dict]): Chunk descriptions as returned by split()
+            shifted (List[List[Dict]]): Offset-corrected segments per chunk
+
+        Returns:
+            List[Dict[str, str]]: Local-to-global label mapping per chunk
+        """
+        maps = []
+        next_id = 0
+        previous = []
+        for chunk, segments in zip(chunks, shifted):
+            mapping = {}
+            scores = {}
+            shared_end = chunk['core_start'] + 2 * self.overlap
+            previous = [(seg, label) for seg, label in previous if seg['end_time'] > chunk['offset']]
+            for seg in segments:
+                if seg.get('speaker') is None or seg['start_time'] >= shared_end:
+                    continue
+                for prev_seg, prev_label in previous:
+                    shared = (min(seg['end_time'], prev_seg['end_time'])
+                              - max(seg['start_time'], prev_seg['start_time']))
+                    if shared > 0:
+                        key = (seg['speaker'], prev_label)
+                        scores[key] = scores.get(key, 0.0) + shared
+
+            used = set()
+            for (local, global_label), _ in sorted(scores.items(), key=lambda kv: -kv[1]):
+                if local not in mapping and global_label not in used:
+                    mapping[local] = global_label
+                    used.add(global_label)
+
+            for seg in segments:
+                local = seg.get('speaker')
+                if local is not None and local not in mapping:
+                    mapping[local] = f"spk_{next_id}"
+                    next_id += 1
+
+            maps.append(mapping)
+            previous = [(seg, mapping[seg['speaker']]) for seg in segments if seg.get('speaker') is not None]
+        return maps
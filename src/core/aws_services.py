@@ -1,13 +1,27 @@
 import boto3
 import json
 import time
+import uuid
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional
 from pathlib import Path
 import os
 
+from .audio_chunker import AudioChunker
+from .metrics import span, timed, api_call, api_error
+from .rate_limiter import RateLimiter, default_rate_limiter
+
 class AWSServices:
-    def __init__(self):
-        """Initialize AWS service clients."""
+    def __init__(self, rate_limiter: Optional[RateLimiter] = None):
+        """
+        Initialize AWS service clients.
+
+        Args:
+            rate_limiter (Optional[RateLimiter]): Scheduler every AWS call goes
+                through (defaults to the process-wide limiter)
+        """
+        self.rate_limiter = rate_limiter or default_rate_limiter()
         self.transcribe = boto3.client('transcribe')
         self.translate = boto3.client('translate')
         self.rekognition = boto3.client('rekognition')
@@ -16,6 +30,10 @@ class AWSServices:
         # Configure S3 bucket (should be set via environment variable in production)
         self.bucket_name = os.getenv('AWS_S3_BUCKET', 'subtitle-processor-bucket')
 
+        # Seconds between Transcribe job status checks
+        self.poll_interval = 5
+
+    @timed('aws.transcribe')
     def transcribe_audio(self, audio_path: str, language_code: str = 'en-US') -> Dict:
         """
         Transcribe audio using Amazon Transcribe.
@@ -27,15 +45,24 @@ class AWSServices:
         Returns:
             Dict: Transcription results
         """
+        s3_path = None
         try:
-            # Upload audio to S3
+            # Upload audio to S3 under a key unique to this call, so concurrent
+            # jobs on files with the same name (e.g. chunks) don't collide
+            run_id = uuid.uuid4().hex[:8]
             file_name = Path(audio_path).name
-            s3_path = f"audio/{file_name}"
-            self.s3.upload_file(audio_path, self.bucket_name, s3_path)
+            s3_path = f"audio/{run_id}_{file_name}"
+            api_call('s3', 'upload_file')
+            with span('aws.s3_upload'):
+                self.rate_limiter.call('s3.upload_file', self.s3.upload_file,
+                                       audio_path, self.bucket_name, s3_path)
             
             # Start transcription job
-            job_name = f"transcribe_{int(time.time())}"
-            self.transcribe.start_transcription_job(
+            job_name = f"transcribe_{int(time.time())}_{run_id}"
+            api_call('transcribe', 'start_transcription_job')
+            self.rate_limiter.call(
+                'transcribe.start_transcription_job',
+                self.transcribe.start_transcription_job,
                 TranscriptionJobName=job_name,
                 Media={'MediaFileUri': f"s3://{self.bucket_name}/{s3_path}"},
                 MediaFormat='wav',
@@ -47,11 +74,15 @@ class AWSServices:
             )
             
             # Wait for completion
-            while True:
-                status = self.transcribe.get_transcription_job(TranscriptionJobName=job_name)
-                if status['TranscriptionJob']['TranscriptionJobStatus'] in ['COMPLETED', 'FAILED']:
-                    break
-                time.sleep(5)
+            with span('aws.transcribe_poll'):
+                while True:
+                    api_call('transcribe', 'get_transcription_job')
+                    status = self.rate_limiter.call('transcribe.get_transcription_job',
+                                                    self.transcribe.get_transcription_job,
+                                                    TranscriptionJobName=job_name)
+                    if status['TranscriptionJob']['TranscriptionJobStatus'] in ['COMPLETED', 'FAILED']:
+                        break
+                    time.sleep(self.poll_interval)
             
             if status['TranscriptionJob']['TranscriptionJobStatus'] == 'COMPLETED':
                 return self._process_transcription_results(status['TranscriptionJob'])
@@ -59,15 +90,74 @@ class AWSServices:
                 raise Exception("Transcription job failed")
                 
         except Exception as e:
+            api_error('transcribe', 'transcribe_audio')
             print(f"Error in transcription: {str(e)}")
             return None
         finally:
             # Cleanup S3
             try:
-                self.s3.delete_object(Bucket=self.bucket_name, Key=s3_path)
+                if s3_path:
+                    api_call('s3', 'delete_object')
+                    self.rate_limiter.call('s3.delete_object', self.s3.delete_object,
+                                           Bucket=self.bucket_name, Key=s3_path)
             except:
                 pass
 
+    @timed('aws.transcribe_chunked')
+    def transcribe_audio_chunked(self, audio_path: str, language_code: str = 'en-US',
+                                 num_chunks: int = 4, overlap: float = 2.0) -> Dict:
+        """
+        Transcribe long audio by splitting it at silence boundaries and running
+        one Transcribe job per chunk concurrently.
+
+        Segments are stitched back together with offset correction, duplicates
+        in the overlap between chunks are dropped and speaker labels are
+        reconciled across chunks. A chunk whose job fails is retried once; if
+        it fails again the whole call fails rather than returning a transcript
+        with a gap.
+
+        Args:
+            audio_path (str): Path to 16-bit PCM WAV audio file
+            language_code (str): Language code for transcription
+            num_chunks (int): Number of chunks to transcribe in parallel
+            overlap (float): Seconds of audio shared between neighbouring chunks
+
+        Returns:
+            Dict: Transcription results in the same shape as transcribe_audio,
+            or None if any chunk could not be transcribed
+        """
+        if num_chunks <= 1:
+            return self.transcribe_audio(audio_path, language_code)
+
+        try:
+            chunker = AudioChunker(overlap=overlap)
+            with tempfile.TemporaryDirectory() as chunk_dir:
+                chunks = chunker.split(audio_path, num_chunks, chunk_dir)
+                with ThreadPoolExecutor(max_workers=len(chunks)) as executor:
+                    results = list(executor.map(
+                        lambda chunk: self.transcribe_audio(chunk['path'], language_code),
+                        chunks
+                    ))
+
+                    # Retry failed chunks once before giving up on the transcript
+                    failed = [i for i, result in enumerate(results) if not result]
+                    retried = executor.map(
+                        lambda i: self.transcribe_audio(chunks[i]['path'], language_code),
+                        failed
+                    )
+                    for i, result in zip(failed, retried):
+                        results[i] = result
+
+            missing = [f"{c['core_start']:.1f}-{c['core_end']:.1f}s" for c, r in zip(chunks, results) if not r]
+            if missing:
+                raise Exception(f"Transcription failed for {len(missing)} of {len(chunks)} chunks: {', '.join(missing)}")
+            return chunker.merge_transcripts(chunks, results)
+
+        except Exception as e:
+            print(f"Error in chunked transcription: {str(e)}")
+            return None
+
+    @timed('aws.translate')
     def translate_text(self, text: str, source_lang: str, target_lang: str) -> str:
         """
         Translate text using Amazon Translate.
@@ -81,16 +171,21 @@ class AWSServices:
             str: Translated text
         """
         try:
-            response = self.translate.translate_text(
+            api_call('translate', 'translate_text')
+            response = self.rate_limiter.call(
+                'translate.translate_text',
+                self.translate.translate_text,
                 Text=text,
                 SourceLanguageCode=source_lang,
                 TargetLanguageCode=target_lang
             )
             return response['TranslatedText']
         except Exception as e:
+            api_error('translate', 'translate_text')
             print(f"Error in translation: {str(e)}")
             return None
 
+    @timed('aws.rekognition_detect_text')
     def detect_text_in_image(self, image_bytes: bytes) -> List[Dict]:
         """
         Detect text in image using Amazon Rekognition.
@@ -102,7 +197,10 @@ class AWSServices:
             List[Dict]: Detected text regions
         """
         try:
-            response = self.rekognition.detect_text(
+            api_call('rekognition', 'detect_text')
+            response = self.rate_limiter.call(
+                'rekognition.detect_text',
+                self.rekognition.detect_text,
                 Image={'Bytes': image_bytes}
             )
             
@@ -116,6 +214,7 @@ class AWSServices:
                 if detection['Type'] == 'LINE'
             ]
         except Exception as e:
+            api_error('rekognition', 'detect_text')
             print(f"Error in text detection: {str(e)}")
             return None
 
@@ -132,8 +231,9 @@ class AWSServices:
         try:
             # Get transcription results
             import requests
-            response = requests.get(job['Transcript']['TranscriptFileUri'])
-            transcript = response.json()
+            with span('aws.transcript_fetch'):
+                response = requests.get(job['Transcript']['TranscriptFileUri'])
+                transcript = response.json()
             
             # Extract items with timestamps
             items = transcript['results']['items']
@@ -0,0 +1,132 @@
+import cv2
+import numpy as np
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .metrics import span, REGISTRY, is_enabled
+
+# Subtitle and lower-third bands: top quarter and bottom 30% of the frame
+SUBTITLE_BANDS = ((0.0, 0.25), (0.7, 1.0))
+
+# Smaller payloads for DetectText (--preprocess): grayscale, at most 1280px,
+# JPEG quality 80. Not the default, as it can change what Rekognition detects
+REDUCED = {'max_dimension': 1280, 'grayscale': True, 'jpeg_quality': 80}
+
+class FramePreprocessor:
+    def __init__(self, max_dimension: Optional[int] = None, grayscale: bool = False,
+                 jpeg_quality: int = 95, roi_bands: Optional[Sequence[Tuple[float, float]]] = None):
+        """
+        Initialize the frame preprocessor applied before Rekognition text detection.
+
+        The defaults send the full colour frame at OpenCV's default JPEG
+        quality; pass REDUCED for smaller payloads.
+
+        Args:
+            max_dimension (Optional[int]): Longest side in pixels of the frame
+                before cropping; larger frames are downscaled (None keeps full size)
+            grayscale (bool): Encode single-channel images
+            jpeg_quality (int): JPEG quality from 0 to 100
+            roi_bands (Optional[Sequence[Tuple[float, float]]]): Vertical bands
+                as normalized (top, bottom) pairs to keep; bands are stacked into
+                one image so a frame still costs a single call (None keeps the whole frame)
+        """
+        self.max_dimension = max_dimension
+        self.grayscale = grayscale
+        self.jpeg_quality = jpeg_quality
+        self.roi_bands = self._normalize_bands(roi_bands)
+
+    @staticmethod
+    def _normalize_bands(bands: Optional[Sequence[Tuple[float, float]]]) -> List[Tuple[float, float]]:
+        """Sort, clip and merge overlapping bands."""
+        if not bands:
+            return [(0.0, 1.0)]
+        merged = []
+        for top, bottom in sorted((max(0.0, t), min(1.0, b)) for t, b in bands):
+            if bottom <= top:
+                continue
+            if merged and top <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], bottom))
+            else:
+                merged.append((top, bottom))
+        if not merged:
+            raise ValueError("Region of interest bands are empty")
+        return merged
+
+    def prepare(self, frame: np.ndarray) -> Tuple[bytes, List[Dict]]:
+        """
+        Convert, crop, downscale and JPEG-encode a frame for text detection.
+
+        Args:
+            frame (np.ndarray): BGR frame as read by OpenCV
+
+        Returns:
+            Tuple[bytes, List[Dict]]: Encoded image and the band layout needed
+            by map_bbox to translate boxes back to full-frame coordinates
+        """
+        with span('video.frame_preprocess'):
+            # Convert and crop before resizing so the resize touches as few
+            # pixels and channels as possible
+            if self.grayscale and frame.ndim == 3:
+                frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+
+            height, width = frame.shape[:2]
+            layout = []
+            if self.roi_bands != [(0.0, 1.0)]:
+                crops = [frame[int(round(top * height)):int(round(bottom * height))]
+                         for top, bottom in self.roi_bands]
+                frame = np.concatenate(crops, axis=0)
+
+                stacked = float(frame.shape[0])
+                offset = 0
+                for (top, bottom), crop in zip(self.roi_bands, crops):
+                    layout.append({
+                        'source_top': top,
+                        'source_bottom': bottom,
+                        'image_top': offset / stacked,
+                        'image_bottom': (offset + crop.shape[0]) / stacked
+                    })
+                    offset += crop.shape[0]
+
+            # Scale relative to the full frame so crops keep the same text size
+            if self.max_dimension and max(height, width) > self.max_dimension:
+                scale = self.max_dimension / float(max(height, width))
+                frame = cv2.resize(frame, (max(1, int(frame.shape[1] * scale)), max(1, int(frame.shape[0] * scale))),
+                                   interpolation=cv2.INTER_LINEAR)
+
+        with span('video.jpeg_encode'):
+            _, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+            frame_bytes = buffer.tobytes()
+
+        if is_enabled():
+            REGISTRY.increment('subtitle_rekognition_payload_bytes_total', len(frame_bytes))
+        return frame_bytes, layout
+
+    def map_bbox(self, bbox: Dict, layout: List[Dict]) -> Optional[Dict]:
+        """
+        Map a normalized bounding box in the encoded image back to the full frame.
+
+        Args:
+            bbox (Dict): Rekognition BoundingBox relative to the encoded image
+            layout (List[Dict]): Band layout returned by prepare()
+
+        Returns:
+            Optional[Dict]: BoundingBox relative to the full frame, or None if
+            the box does not fall inside any band
+        """
+        if not layout:
+            return bbox
+
+        centre = bbox['Top'] + bbox['Height'] / 2
+        for band in layout:
+            if band['image_top'] <= centre <= band['image_bottom']:
+                image_span = band['image_bottom'] - band['image_top']
+                source_span = band['source_bottom'] - band['source_top']
+                ratio = source_span / image_span if image_span else 0.0
+                top = max(bbox['Top'], band['image_top'])
+                bottom = min(bbox['Top'] + bbox['Height'], band['image_bottom'])
+                return {
+                    'Left': bbox['Left'],
+                    'Top': band['source_top'] + (top - band['image_top']) * ratio,
+                    'Width': bbox['Width'],
+                    'Height': (bottom - top) * ratio
+                }
+        return None
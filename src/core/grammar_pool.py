@@ -0,0 +1,318 @@
+import os
+import queue
+import re
+import threading
+import time
+import psutil
+import language_tool_python
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional
+
+from .metrics import span, REGISTRY, is_enabled
+
+# LanguageTool languages that need a regional variant; others use the base code
+DEFAULT_VARIANTS = {
+    'en': 'en-US',
+    'de': 'de-DE',
+    'pt': 'pt-PT',
+    'ca': 'ca-ES'
+}
+LANGUAGE_VARIANTS = {
+    'en-US', 'en-GB', 'en-AU', 'en-CA', 'en-NZ', 'en-ZA',
+    'de-DE', 'de-AT', 'de-CH', 'pt-PT', 'pt-BR', 'pt-AO', 'pt-MZ', 'ca-ES'
+}
+
+# Frequent function words used to guess the language of untagged subtitles
+STOPWORDS = {
+    'en': {'the', 'and', 'is', 'are', 'you', 'to', 'of', 'it', 'that', 'this', 'what', 'was', 'for', 'with', 'have'},
+    'es': {'el', 'la', 'los', 'las', 'que', 'y', 'es', 'de', 'en', 'un', 'una', 'por', 'para', 'con', 'no', 'está'},
+    'fr': {'le', 'la', 'les', 'et', 'est', 'de', 'des', 'un', 'une', 'que', 'pour', 'dans', 'pas', 'vous', 'je', 'c\'est'},
+    'de': {'der', 'die', 'das', 'und', 'ist', 'nicht', 'ich', 'du', 'sie', 'ein', 'eine', 'zu', 'mit', 'auf', 'für'},
+    'it': {'il', 'lo', 'la', 'che', 'e', 'è', 'di', 'un', 'una', 'per', 'non', 'sono', 'con', 'gli', 'questo'},
+    'pt': {'o', 'a', 'os', 'as', 'que', 'e', 'é', 'de', 'um', 'uma', 'para', 'com', 'não', 'você', 'está'},
+    'nl': {'de', 'het', 'een', 'en', 'is', 'van', 'niet', 'dat', 'ik', 'je', 'op', 'voor', 'met', 'zijn', 'wat'}
+}
+
+_WORD = re.compile(r"[^\W\d_]+(?:'[^\W\d_]+)?")
+
+def languagetool_language(language_code: str) -> str:
+    """
+    Map a transcript language code (e.g. 'es-US') to a LanguageTool language.
+
+    Args:
+        language_code (str): BCP 47 language code
+
+    Returns:
+        str: LanguageTool language code
+    """
+    if language_code in LANGUAGE_VARIANTS:
+        return language_code
+    base = language_code.split('-')[0].lower()
+    return DEFAULT_VARIANTS.get(base, base)
+
+def detect_language(texts: Iterable[str], default: str = 'en-US', max_words: int = 2000) -> str:
+    """
+    Guess the language of subtitle text from stopword frequencies.
+
+    Args:
+        texts (Iterable[str]): Cue texts
+        default (str): Language returned when nothing matches
+        max_words (int): Words examined before deciding
+
+    Returns:
+        str: LanguageTool language code
+    """
+    scores = dict.fromkeys(STOPWORDS, 0)
+    words = 0
+    for text in texts:
+        for word in _WORD.findall(text.lower()):
+            for language, stopwords in STOPWORDS.items():
+                if word in stopwords:
+                    scores[language] += 1
+            words += 1
+        if words >= max_words:
+            break
+    best = max(scores, key=scores.get)
+    if not scores[best]:
+        return default
+    return DEFAULT_VARIANTS.get(best, best)
+
+class _Instance:
+    """One LanguageTool server and its health bookkeeping."""
+
+    def __init__(self, language: str, factory: Callable):
+        self.language = language
+        self.factory = factory
+        self.tool = None
+        self.checked = 0.0
+
+    def start(self):
+        self.tool = self.factory(self.language)
+        self.checked = time.monotonic()
+
+    def close(self):
+        if self.tool is not None:
+            try:
+                self.tool.close()
+            except Exception:
+                pass
+            self.tool = None
+
+    def process(self) -> Optional[psutil.Process]:
+        """The server's JVM process, or None for remote servers and stand-ins."""
+        server = getattr(self.tool, '_server', None)
+        pid = getattr(server, 'pid', None)
+        if pid is None:
+            return None
+        try:
+            return psutil.Process(pid)
+        except psutil.NoSuchProcess:
+            return None
+
+    def memory_mb(self) -> Optional[float]:
+        """Resident memory of the server process and its children in MB."""
+        process = self.process()
+        if process is None:
+            return None
+        try:
+            rss = process.memory_info().rss
+            for child in process.children(recursive=True):
+                rss += child.memory_info().rss
+        except psutil.NoSuchProcess:
+            return None
+        return rss / (1024.0 * 1024.0)
+
+    def alive(self) -> bool:
+        if self.tool is None:
+            return False
+        server = getattr(self.tool, '_server', None)
+        if server is None:
+            return True
+        return server.poll() is None
+
+class LanguageToolPool:
+    def __init__(self, size: Optional[int] = None, max_memory_mb: Optional[float] = None,
+                 health_interval: float = 30.0, factory: Optional[Callable] = None):
+        """
+        Initialize a pool of local LanguageTool servers, started per language on first use.
+
+        Each server is a JVM of roughly 1 GB, so the pool is small unless
+        LANGUAGETOOL_POOL_SIZE asks for more.
+
+        Args:
+            size (Optional[int]): Servers per language (defaults to $LANGUAGETOOL_POOL_SIZE
+                or 2, at most the number of CPU cores)
+            max_memory_mb (Optional[float]): Restart a server whose resident memory
+                exceeds this many MB (defaults to $LANGUAGETOOL_MAX_MEMORY_MB or 1536;
+                0 disables)
+            health_interval (float): Seconds between health checks of a server
+            factory (Optional[Callable]): Creates a server for a language
+                (defaults to language_tool_python.LanguageTool)
+        """
+        if size is None:
+            size = int(os.getenv('LANGUAGETOOL_POOL_SIZE', '0')) or min(2, os.cpu_count() or 1)
+        if max_memory_mb is None:
+            max_memory_mb = float(os.getenv('LANGUAGETOOL_MAX_MEMORY_MB', '1536')) or None
+        self.size = size
+        self.max_memory_mb = max_memory_mb
+        self.health_interval = health_interval
+        self.factory = factory or (lambda language: language_tool_python.LanguageTool(language))
+
+        # Idle queue per language, resolved once its servers are running
+        self._queues: Dict[str, Future] = {}
+        self._instances: Dict[str, List[_Instance]] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix='languagetool')
+        self._startup_executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix='languagetool-start')
+        self.restarts = 0
+
+    def _queue(self, language: str) -> queue.Queue:
+        """
+        Return the idle queue for a language, starting its servers if needed.
+
+        The servers are started outside the lock, so a language starting up
+        does not hold up languages already running; callers of the same
+        language wait for its start-up to finish.
+        """
+        with self._lock:
+            starting = self._queues.get(language)
+            owner = starting is None
+            if owner:
+                starting = self._queues[language] = Future()
+        if not owner:
+            return starting.result()
+
+        instances = [_Instance(language, self.factory) for _ in range(self.size)]
+        try:
+            with span('grammar.pool_start'):
+                # JVM start-up dominates, so start the servers side by side
+                list(self._startup_executor.map(lambda instance: instance.start(), instances))
+        except Exception as e:
+            for instance in instances:
+                instance.close()
+            with self._lock:
+                self._queues.pop(language, None)
+            starting.set_exception(e)
+            raise
+
+        idle = queue.Queue()
+        for instance in instances:
+            idle.put(instance)
+        with self._lock:
+            self._instances[language] = instances
+        starting.set_result(idle)
+        return idle
+
+    def _restart(self, instance: _Instance, reason: str):
+        instance.close()
+        instance.start()
+        self.restarts += 1
+        if is_enabled():
+            REGISTRY.increment('subtitle_languagetool_restarts_total', language=instance.language, reason=reason)
+
+    def _ensure_healthy(self, instance: _Instance):
+        """Restart a server that died or grew past the memory cap."""
+        if not instance.alive():
+            self._restart(instance, 'dead')
+            return
+        if time.monotonic() - instance.checked < self.health_interval:
+            return
+        instance.checked = time.monotonic()
+        if self.max_memory_mb is not None:
+            memory = instance.memory_mb()
+            if memory is not None and memory > self.max_memory_mb:
+                self._restart(instance, 'memory')
+
+    def check(self, text: str, language: str = 'en-US') -> List:
+        """
+        Check text on an idle server for the language.
+
+        A server that fails a request is restarted and the request retried once.
+
+        Args:
+            text (str): Text to check
+            language (str): LanguageTool language code
+
+        Returns:
+            List: LanguageTool matches
+        """
+        idle = self._queue(language)
+        instance = idle.get()
+        try:
+            self._ensure_healthy(instance)
+            with span('grammar.check'):
+                try:
+                    return instance.tool.check(text)
+                except Exception:
+                    self._restart(instance, 'error')
+                    return instance.tool.check(text)
+        finally:
+            idle.put(instance)
+
+    def map(self, function: Callable, items: List, language: str = 'en-US') -> List:
+        """
+        Run a function calling check() over many items, as many at once as the
+        language has servers.
+
+        Args:
+            function (Callable): Called with each item
+            items (List): Items, e.g. texts
+            language (str): LanguageTool language code the function checks in
+
+        Returns:
+            List: Results, in input order
+        """
+        if not items:
+            return []
+        self._queue(language)
+        return list(self._executor.map(function, items))
+
+    def check_many(self, texts: List[str], language: str = 'en-US') -> List[List]:
+        """
+        Check many texts concurrently across the language's servers.
+
+        Args:
+            texts (List[str]): Texts to check
+            language (str): LanguageTool language code
+
+        Returns:
+            List[List]: Matches per text, in input order
+        """
+        return self.map(lambda text: self.check(text, language), texts, language)
+
+    def memory_usage(self) -> Dict[str, List[Optional[float]]]:
+        """
+        Report resident memory per server.
+
+        Returns:
+            Dict[str, List[Optional[float]]]: MB per server, by language
+        """
+        with self._lock:
+            return {language: [i.memory_mb() for i in instances] for language, instances in self._instances.items()}
+
+    def close(self):
+        """Stop every server."""
+        with self._lock:
+            for instances in self._instances.values():
+                for instance in instances:
+                    instance.close()
+            self._instances.clear()
+            self._queues.clear()
+        self._executor.shutdown(wait=False)
+        self._startup_executor.shutdown(wait=False)
+
+_default_pool = None
+_default_lock = threading.Lock()
+
+def default_pool() -> LanguageToolPool:
+    """
+    Return the process-wide LanguageTool pool.
+
+    Returns:
+        LanguageToolPool: Shared pool
+    """
+    global _default_pool
+    with _default_lock:
+        if _default_pool is None:
+            _default_pool = LanguageToolPool()
+        return _default_pool
@@ -0,0 +1,440 @@
+import collections
+import io
+import math
+import os
+import re
+import shutil
+import tempfile
+import time
+import uuid
+import wave
+import ffmpeg
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from pathlib import Path
+
+from .audio_chunker import AudioChunker
+from .subtitle_formats import Caption, read_subtitles, write_subtitles
+from .processing_state import cue_key
+from .metrics import span, REGISTRY, is_enabled
+
+MEDIA_EXTENSIONS = ('.ts', '.m4s', '.mp4', '.aac', '.wav')
+CAPTION_EXTENSIONS = ('.vtt', '.srt')
+
+class Segment:
+    """A media or caption segment of a live stream."""
+
+    __slots__ = ('sequence', 'path', 'start', 'duration', 'arrived')
+
+    def __init__(self, sequence: int, path: str, start: float, duration: float, arrived: float):
+        self.sequence = sequence
+        self.path = path
+        self.start = start
+        self.duration = duration
+        self.arrived = arrived
+
+    @property
+    def end(self) -> float:
+        return self.start + self.duration
+
+    @property
+    def is_caption(self) -> bool:
+        return Path(self.path).suffix.lower() in CAPTION_EXTENSIONS
+
+    def __repr__(self) -> str:
+        return f"Segment({self.sequence}, {self.path!r}, {self.start:.3f}, {self.duration:.3f})"
+
+def parse_playlist(text: str, base_dir: str = '.') -> Tuple[List[Tuple[str, float]], bool]:
+    """
+    Parse an HLS media playlist.
+
+    Args:
+        text (str): Playlist content
+        base_dir (str): Directory relative segment URIs are resolved against
+
+    Returns:
+        Tuple[List[Tuple[str, float]], bool]: (segment path, duration) pairs in
+        playlist order, and whether the playlist has ended
+    """
+    entries = []
+    ended = False
+    duration = None
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith('#EXTINF:'):
+            duration = float(line[8:].split(',', 1)[0])
+        elif line == '#EXT-X-ENDLIST':
+            ended = True
+        elif not line.startswith('#'):
+            path = line if os.path.isabs(line) else os.path.join(base_dir, line)
+            entries.append((path, duration))
+            duration = None
+    return entries, ended
+
+def _natural_key(name: str):
+    return [int(part) if part.isdigit() else part for part in re.split(r'(\d+)', name)]
+
+def probe_duration(path: str) -> Optional[float]:
+    """
+    Return the duration of a media segment in seconds, or None if unknown.
+
+    Args:
+        path (str): Segment path
+
+    Returns:
+        Optional[float]: Duration in seconds
+    """
+    try:
+        if path.lower().endswith('.wav'):
+            with wave.open(path, 'rb') as wav:
+                return wav.getnframes() / float(wav.getframerate())
+        return float(ffmpeg.probe(path)['format']['duration'])
+    except Exception:
+        return None
+
+def probe_start_time(path: str) -> Optional[float]:
+    """
+    Return the presentation timestamp a media segment starts at in seconds, or None if unknown.
+
+    Args:
+        path (str): Segment path
+
+    Returns:
+        Optional[float]: Start time in seconds on the media clock
+    """
+    if path.lower().endswith('.wav'):
+        return None
+    try:
+        return float(ffmpeg.probe(path)['format']['start_time'])
+    except Exception:
+        return None
+
+class SegmentSource:
+    def __init__(self, source: str, poll_interval: float = 0.5, idle_timeout: Optional[float] = 30.0,
+                 default_duration: float = 6.0, settle_time: Optional[float] = None,
+                 duration_probe: Callable[[str], Optional[float]] = probe_duration):
+        """
+        Initialize a source of live segments from a directory or an HLS playlist.
+
+        Args:
+            source (str): Directory receiving segment files, or a local .m3u8 playlist
+            poll_interval (float): Seconds between checks for new segments
+            idle_timeout (Optional[float]): Stop after this many seconds without a
+                new segment (None waits forever; playlists also stop at #EXT-X-ENDLIST)
+            default_duration (float): Segment duration used when it cannot be determined
+            settle_time (Optional[float]): Seconds a file in a directory must stay
+                unmodified before it is read (defaults to poll_interval)
+            duration_probe (Callable): Returns a segment's duration in seconds
+        """
+        self.source = source
+        self.poll_interval = poll_interval
+        self.idle_timeout = idle_timeout
+        self.default_duration = default_duration
+        self.settle_time = poll_interval if settle_time is None else settle_time
+        self.duration_probe = duration_probe
+
+    def _list(self) -> Tuple[List[Tuple[str, Optional[float], Optional[float]]], bool]:
+        """List ready segments as (path, duration, arrival time) and whether the stream has ended."""
+        if self.source.endswith('.m3u8'):
+            try:
+                with open(self.source, encoding='utf-8') as f:
+                    entries, ended = parse_playlist(f.read(), os.path.dirname(self.source))
+            except OSError:
+                return [], False
+            return [(path, duration, None) for path, duration in entries], ended
+
+        now = time.time()
+        entries = []
+        for entry in os.scandir(self.source):
+            name = entry.name.lower()
+            if not entry.is_file() or name.startswith(('.', 'init')):
+                continue
+            if not name.endswith(MEDIA_EXTENSIONS + CAPTION_EXTENSIONS):
+                continue
+            # Skip files still being written
+            mtime = entry.stat().st_mtime
+            if now - mtime < self.settle_time:
+                continue
+            entries.append((entry.path, None, mtime))
+        return sorted(entries, key=lambda e: _natural_key(os.path.basename(e[0]))), False
+
+    def segments(self) -> Iterator[Segment]:
+        """
+        Yield segments as they appear, with start times on the stream timeline.
+
+        Yields:
+            Segment: The next segment
+        """
+        seen = set()
+        sequence = 0
+        start = 0.0
+        last_new = time.monotonic()
+        while True:
+            entries, ended = self._list()
+            found = False
+            for path, duration, arrived in entries:
+                if path in seen:
+                    continue
+                seen.add(path)
+                found = True
+                if duration is None:
+                    duration = self.duration_probe(path) or self.default_duration
+                # Directory segments count from when they were written, playlist
+                # segments from when they were first listed
+                yield Segment(sequence, path, start, duration, arrived or time.time())
+                sequence += 1
+                start += duration
+
+            if found:
+                last_new = time.monotonic()
+            if ended or (self.idle_timeout is not None and time.monotonic() - last_new > self.idle_timeout):
+                return
+            time.sleep(self.poll_interval)
+
+class LivePipeline:
+    def __init__(self, subtitle_processor, output_dir: str, transcriber: Optional[Callable] = None,
+                 language_code: str = 'en-US', window: int = 3, vad_threshold: float = 500.0,
+                 min_speech: float = 0.2, mpegts_offset: Optional[float] = None,
+                 playlist_name: str = 'subtitles.m3u8',
+                 start_probe: Callable[[str], Optional[float]] = probe_start_time):
+        """
+        Initialize the live subtitle pipeline for segmented (HLS/DASH) streams.
+
+        Args:
+            subtitle_processor (SubtitleProcessor): Cleans, corrects and positions cues
+            output_dir (str): Directory for WebVTT segments and the subtitle playlist
+            transcriber (Optional[Callable]): Called as transcriber(audio_path, language_code)
+                and returning a result shaped like AWSServices.transcribe_audio
+                (defaults to AWSServices().transcribe_audio)
+            language_code (str): Language code for transcription and grammar checking
+            window (int): Number of recent segments kept for cues that span
+                segment boundaries
+            vad_threshold (float): RMS energy (16-bit scale) above which a frame
+                counts as speech
+            min_speech (float): Seconds of speech needed before a segment is transcribed
+            mpegts_offset (Optional[float]): Stream start in seconds on the MPEG-TS clock,
+                written to X-TIMESTAMP-MAP (None probes the first media segment's start time)
+            playlist_name (str): File name of the subtitle playlist
+            start_probe (Callable): Returns a media segment's start time in seconds
+        """
+        self.subtitle_processor = subtitle_processor
+        self.output_dir = Path(output_dir)
+        self._transcriber = transcriber
+        self.language_code = language_code
+        self.window = collections.deque(maxlen=window)
+        self.vad_threshold = vad_threshold
+        self.min_speech = min_speech
+        self.mpegts_offset = mpegts_offset
+        self.start_probe = start_probe
+        # Names this pipeline's uploads so concurrent pipelines never share an S3 key
+        self.pipeline_id = uuid.uuid4().hex[:8]
+        self.playlist_path = self.output_dir / playlist_name
+        self.chunker = AudioChunker()
+        self.playlist: List[Tuple[str, float]] = []
+        self.media_sequence = None
+
+    @property
+    def transcriber(self) -> Callable:
+        """Transcription function, created on first use since caption feeds do not need it."""
+        if self._transcriber is None:
+            from .aws_services import AWSServices
+            self._transcriber = AWSServices().transcribe_audio
+        return self._transcriber
+
+    def run(self, source: SegmentSource, on_segment: Optional[Callable[[Dict], None]] = None) -> List[Dict]:
+        """
+        Process segments from a source until it ends.
+
+        Args:
+            source (SegmentSource): Segment source
+            on_segment (Optional[Callable[[Dict], None]]): Called with each segment's result
+
+        Returns:
+            List[Dict]: Per-segment results (see process_segment)
+        """
+        results = []
+        for segment in source.segments():
+            result = self.process_segment(segment)
+            results.append(result)
+            if on_segment:
+                on_segment(result)
+        # Only a source that ended ends the playlist; after a failure players
+        # keep treating the stream as live
+        self._write_playlist(ended=True)
+        return results
+
+    def process_segment(self, segment: Segment) -> Dict:
+        """
+        Produce the WebVTT segment for one media or caption segment.
+
+        Args:
+            segment (Segment): Incoming segment
+
+        Returns:
+            Dict: 'sequence', 'output' path, 'cues' new in this segment, 'emitted'
+            cues written, whether it was 'transcribed', and end-to-end 'latency'
+            in seconds from segment arrival to subtitle publication
+        """
+        transcribed = False
+        with span('live.segment'):
+            if segment.is_caption:
+                with span('live.caption_parse'):
+                    captions = list(read_subtitles(segment.path))
+                language = self.language_code
+            else:
+                captions, transcribed, language = self._transcribe_segment(segment)
+
+            # Cues repeated across segments (as in HLS WebVTT feeds) are enhanced once
+            recent = {key: cue for entry in self.window for key, cue in entry.items()}
+            new = {}
+            for caption in captions:
+                key = cue_key(caption)
+                if key not in recent:
+                    new.setdefault(key, caption)
+            language = self.subtitle_processor.resolve_language(captions, language)
+            enhanced = dict(zip(new, self.subtitle_processor.enhance_captions(list(new.values()), language)))
+            new_cues = len(enhanced)
+            self.window.append(enhanced)
+            recent.update(enhanced)
+
+            # Emit every cue overlapping this segment so players see cues
+            # that started in an earlier segment
+            start_ms = int(round(segment.start * 1000))
+            end_ms = int(round(segment.end * 1000))
+            emitted = sorted(
+                (cue for cue in recent.values() if cue['start_ms'] < end_ms and cue['end_ms'] > start_ms),
+                key=lambda cue: (cue['start_ms'], cue['end_ms'])
+            )
+            output = self._write_segment(segment, emitted)
+
+        latency = time.time() - segment.arrived
+        if is_enabled():
+            REGISTRY.observe('live.end_to_end_latency', latency)
+        return {
+            'sequence': segment.sequence,
+            'output': str(output),
+            'cues': new_cues,
+            'emitted': len(emitted),
+            'transcribed': transcribed,
+            'latency': latency
+        }
+
+    def _transcribe_segment(self, segment: Segment) -> Tuple[List[Caption], bool, str]:
+        """Extract audio, skip silent segments and transcribe the rest (with the transcript's language)."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with span('live.extract_audio'):
+                audio_name = f"live_{self.pipeline_id}_{segment.sequence:05d}.wav"
+                audio_path = self._extract_audio(segment.path, temp_dir, audio_name)
+            with span('live.vad'):
+                speech = self._speech_seconds(audio_path)
+            if speech < self.min_speech:
+                return [], False, self.language_code
+
+            with span('live.transcribe'):
+                result = self.transcriber(audio_path, self.language_code)
+
+        captions = []
+        for item in (result or {}).get('segments', []):
+            captions.append(Caption(
+                int(round((segment.start + item['start_time']) * 1000)),
+                int(round((segment.start + item['end_time']) * 1000)),
+                item['text']
+            ))
+        return captions, True, (result or {}).get('language_code') or self.language_code
+
+    def _extract_audio(self, segment_path: str, temp_dir: str, audio_name: str) -> str:
+        """
+        Convert a segment to 16 kHz mono PCM WAV.
+
+        fMP4 (DASH/CMAF) media segments are prefixed with the stream's
+        initialization segment when one sits next to them.
+
+        Args:
+            segment_path (str): Media segment path
+            temp_dir (str): Directory for intermediate files
+            audio_name (str): File name of the WAV file, which names its upload
+
+        Returns:
+            str: Path to the WAV file
+        """
+        audio_path = os.path.join(temp_dir, audio_name)
+        if segment_path.lower().endswith('.wav'):
+            shutil.copyfile(segment_path, audio_path)
+            return audio_path
+
+        source = segment_path
+        if segment_path.lower().endswith('.m4s'):
+            init = next(iter(sorted(Path(segment_path).parent.glob('init*'))), None)
+            if init is not None:
+                source = os.path.join(temp_dir, 'segment.mp4')
+                with open(source, 'wb') as out:
+                    out.write(init.read_bytes())
+                    out.write(Path(segment_path).read_bytes())
+
+        stream = ffmpeg.output(ffmpeg.input(source), audio_path, acodec='pcm_s16le', ac=1, ar='16k')
+        ffmpeg.run(stream, overwrite_output=True, quiet=True)
+        return audio_path
+
+    def _speech_seconds(self, audio_path: str) -> float:
+        """
+        Estimate seconds of speech in a WAV file with an energy-based voice activity detector.
+
+        Args:
+            audio_path (str): Path to 16-bit PCM WAV file
+
+        Returns:
+            float: Seconds of audio above the speech threshold
+        """
+        energy, _ = self.chunker.frame_energies(audio_path)
+        return int((energy > self.vad_threshold).sum()) * self.chunker.frame_duration
+
+    def _write_segment(self, segment: Segment, cues: List[Dict]) -> Path:
+        """Write a WebVTT segment aligned to the media segment and update the playlist."""
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        name = f"sub_{segment.sequence:05d}.vtt"
+        buffer = io.StringIO()
+        write_subtitles(cues, buffer, 'vtt')
+        if self.mpegts_offset is None:
+            # Transport streams rarely start at PTS 0 and a sliding-window
+            # playlist starts mid-stream, so anchor on the first segment's PTS
+            probed = None if segment.is_caption else self.start_probe(segment.path)
+            self.mpegts_offset = probed or 0.0
+        # Map cue times (stream timeline) onto the 33-bit 90 kHz MPEG-TS clock for HLS players
+        mpegts = int(round(self.mpegts_offset * 90000)) % 2 ** 33
+        header = f"WEBVTT\nX-TIMESTAMP-MAP=MPEGTS:{mpegts},LOCAL:00:00:00.000\n"
+        content = header + buffer.getvalue()[len('WEBVTT\n'):]
+        output = self.output_dir / name
+        _write_atomic(output, content)
+
+        if self.media_sequence is None:
+            self.media_sequence = segment.sequence
+        self.playlist.append((name, segment.duration))
+        self._write_playlist(ended=False)
+        return output
+
+    def _write_playlist(self, ended: bool):
+        """Write the subtitle media playlist."""
+        if self.media_sequence is None:
+            return
+        target = max(int(math.ceil(duration)) for _, duration in self.playlist)
+        lines = [
+            '#EXTM3U',
+            '#EXT-X-VERSION:3',
+            '#EXT-X-PLAYLIST-TYPE:EVENT',
+            f'#EXT-X-TARGETDURATION:{target}',
+            f'#EXT-X-MEDIA-SEQUENCE:{self.media_sequence}'
+        ]
+        for name, duration in self.playlist:
+            lines.append(f'#EXTINF:{duration:.3f},')
+            lines.append(name)
+        if ended:
+            lines.append('#EXT-X-ENDLIST')
+        _write_atomic(self.playlist_path, '\n'.join(lines) + '\n')
+
+def _write_atomic(path: Path, content: str):
+    """Replace a file in one step so players never read a partial file."""
+    temp_path = path.with_name(f".{path.name}.tmp")
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.replace(temp_path, path)
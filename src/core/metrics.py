@@ -0,0 +1,254 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import nullcontext
+from functools import wraps
+from typing import Callable, Dict, List, Tuple
+
+# Histogram bucket upper bounds in seconds
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+STAGE_METRIC = 'subtitle_stage_duration_seconds'
+
+COUNTER_HELP = {
+    'subtitle_api_calls_total': 'External API calls by service and operation.',
+    'subtitle_api_errors_total': 'External API calls that raised an error.',
+    'subtitle_api_throttled_total': 'External API calls that were throttled and retried.',
+    'subtitle_cache_hits_total': 'Cache lookups that found a stored result.',
+    'subtitle_cache_misses_total': 'Cache lookups that had to compute the result.',
+    'subtitle_languagetool_restarts_total': 'LanguageTool servers restarted after dying, failing or exceeding the memory cap.',
+    'subtitle_rekognition_payload_bytes_total': 'Bytes of encoded frames sent to Rekognition DetectText.',
+    'subtitle_web_requests_total': 'Web processing requests by whether they were served from cache, joined a running computation or computed.'
+}
+
+class Histogram:
+    """Cumulative latency histogram for a single stage."""
+
+    __slots__ = ('buckets', 'counts', 'sum', 'count', 'max')
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+        if value > self.max:
+            self.max = value
+
+class MetricsRegistry:
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        """
+        Initialize an empty registry of stage histograms and counters.
+
+        Args:
+            buckets (Tuple[float, ...]): Histogram bucket upper bounds in seconds
+        """
+        self.buckets = buckets
+        self.histograms: Dict[str, Histogram] = {}
+        self.counters: Dict[str, Dict[Tuple[Tuple[str, str], ...], float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage: str, seconds: float):
+        """
+        Record the duration of one execution of a stage.
+
+        Args:
+            stage (str): Stage name
+            seconds (float): Elapsed time in seconds
+        """
+        with self._lock:
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = self.histograms[stage] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    def increment(self, name: str, amount: float = 1, **labels):
+        """
+        Increment a labelled counter.
+
+        Args:
+            name (str): Counter name
+            amount (float): Amount to add
+            **labels: Label values identifying the series
+        """
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + amount
+
+    def reset(self):
+        """Drop all recorded values."""
+        with self._lock:
+            self.histograms.clear()
+            self.counters.clear()
+
+    def stage_summary(self) -> List[Dict]:
+        """
+        Summarize recorded stages, slowest total first.
+
+        Returns:
+            List[Dict]: Per-stage 'stage', 'count', 'total', 'mean' and 'max' seconds
+        """
+        with self._lock:
+            rows = [
+                {
+                    'stage': stage,
+                    'count': h.count,
+                    'total': h.sum,
+                    'mean': h.sum / h.count if h.count else 0.0,
+                    'max': h.max
+                }
+                for stage, h in self.histograms.items()
+            ]
+        return sorted(rows, key=lambda row: -row['total'])
+
+    def format_profile(self) -> str:
+        """
+        Render the per-stage breakdown as a text table.
+
+        Returns:
+            str: Table of stage timings and counters
+        """
+        rows = self.stage_summary()
+        lines = [f"{'stage':40s} {'calls':>8s} {'total s':>10s} {'mean ms':>10s} {'max ms':>10s}"]
+        for row in rows:
+            lines.append(f"{row['stage']:40s} {row['count']:>8d} {row['total']:>10.3f} "
+                         f"{row['mean'] * 1000:>10.2f} {row['max'] * 1000:>10.2f}")
+        with self._lock:
+            counters = {name: dict(series) for name, series in self.counters.items()}
+        for name, series in sorted(counters.items()):
+            for labels, value in sorted(series.items()):
+                label_text = ','.join(f"{k}={v}" for k, v in labels)
+                lines.append(f"{name}{{{label_text}}} {value:g}")
+        return '\n'.join(lines)
+
+    def render_prometheus(self) -> str:
+        """
+        Render all metrics in the Prometheus text exposition format.
+
+        Returns:
+            str: Exposition text
+        """
+        lines = [
+            f"# HELP {STAGE_METRIC} Time spent in each pipeline stage.",
+            f"# TYPE {STAGE_METRIC} histogram"
+        ]
+        with self._lock:
+            for stage, h in sorted(self.histograms.items()):
+                label = _escape_label(stage)
+                cumulative = 0
+                for bound, count in zip(h.buckets, h.counts):
+                    cumulative += count
+                    lines.append(f'{STAGE_METRIC}_bucket{{stage="{label}",le="{bound:g}"}} {cumulative}')
+                lines.append(f'{STAGE_METRIC}_bucket{{stage="{label}",le="+Inf"}} {h.count}')
+                lines.append(f'{STAGE_METRIC}_sum{{stage="{label}"}} {h.sum:.6f}')
+                lines.append(f'{STAGE_METRIC}_count{{stage="{label}"}} {h.count}')
+
+            for name in sorted(set(COUNTER_HELP) | set(self.counters)):
+                lines.append(f"# HELP {name} {COUNTER_HELP.get(name, name)}")
+                lines.append(f"# TYPE {name} counter")
+                for labels, value in sorted(self.counters.get(name, {}).items()):
+                    label_text = ','.join(f'{k}="{_escape_label(str(v))}"' for k, v in labels)
+                    lines.append(f"{name}{{{label_text}}} {value:g}")
+        return '\n'.join(lines) + '\n'
+
+def _escape_label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+REGISTRY = MetricsRegistry()
+
+_enabled = os.getenv('SUBTITLE_METRICS', '1') != '0'
+_NULL_SPAN = nullcontext()
+
+class _Span:
+    __slots__ = ('stage', 'start')
+
+    def __init__(self, stage: str):
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        REGISTRY.observe(self.stage, time.perf_counter() - self.start)
+        return False
+
+def set_enabled(enabled: bool):
+    """
+    Turn metric collection on or off for the whole process.
+
+    Args:
+        enabled (bool): Whether spans and counters record values
+    """
+    global _enabled
+    _enabled = enabled
+
+def is_enabled() -> bool:
+    """Return whether metric collection is on."""
+    return _enabled
+
+def span(stage: str):
+    """
+    Time a block of code as a pipeline stage.
+
+    Returns a shared no-op context manager when metrics are disabled.
+
+    Args:
+        stage (str): Stage name, e.g. 'video.jpeg_encode'
+
+    Returns:
+        A context manager
+    """
+    if not _enabled:
+        return _NULL_SPAN
+    return _Span(stage)
+
+def timed(stage: str) -> Callable:
+    """
+    Decorator that times every call of a function as a pipeline stage.
+
+    Args:
+        stage (str): Stage name
+
+    Returns:
+        Callable: Decorator
+    """
+    def decorator(fn: Callable) -> Callable:
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                REGISTRY.observe(stage, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+def api_call(service: str, operation: str):
+    """Count one external API call."""
+    if _enabled:
+        REGISTRY.increment('subtitle_api_calls_total', service=service, operation=operation)
+
+def api_error(service: str, operation: str):
+    """Count one failed external API call."""
+    if _enabled:
+        REGISTRY.increment('subtitle_api_errors_total', service=service, operation=operation)
+
+def cache_hit(cache: str):
+    """Count one cache hit."""
+    if _enabled:
+        REGISTRY.increment('subtitle_cache_hits_total', cache=cache)
+
+def cache_miss(cache: str):
+    """Count one cache miss."""
+    if _enabled:
+        REGISTRY.increment('subtitle_cache_misses_total', cache=cache)
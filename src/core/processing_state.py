@@ -0,0 +1,70 @@
+import hashlib
+import json
+import os
+import tempfile
+from typing import Dict
+from pathlib import Path
+
+# Bump when the enhanced cue layout changes so old state files are ignored
+STATE_VERSION = 1
+
+def cue_key(caption) -> str:
+    """
+    Identify a cue by its timing and a hash of its text.
+
+    Args:
+        caption: Caption object
+
+    Returns:
+        str: Cue identity
+    """
+    digest = hashlib.blake2b(caption.text.encode('utf-8'), digest_size=12).hexdigest()
+    return f"{caption.start_ms}:{caption.end_ms}:{digest}"
+
+def load_state(state_path: str, settings: Dict) -> Dict[str, Dict]:
+    """
+    Load the enhanced cues recorded by a previous run.
+
+    Args:
+        state_path (str): Path to the state file
+        settings (Dict): Settings of the current run; a state file written
+            with different settings is ignored
+
+    Returns:
+        Dict[str, Dict]: Enhanced caption data by cue identity (empty if
+        there is no usable state)
+    """
+    try:
+        with open(state_path, encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if state.get('version') != STATE_VERSION or state.get('settings') != settings:
+        return {}
+    return state.get('cues', {})
+
+def save_state(state_path: str, settings: Dict, cues: Dict[str, Dict]):
+    """
+    Record enhanced cues for the next incremental run.
+
+    The file is written next to its destination and renamed into place so
+    an interrupted run never leaves a truncated state file.
+
+    Args:
+        state_path (str): Path to the state file
+        settings (Dict): Settings of the current run
+        cues (Dict[str, Dict]): Enhanced caption data by cue identity
+    """
+    directory = Path(state_path).parent
+    directory.mkdir(parents=True, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(prefix='.state-', dir=str(directory))
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            # dumps() uses the C encoder; dump() streams through the pure Python one
+            f.write(json.dumps({'version': STATE_VERSION, 'settings': settings, 'cues': cues},
+                               ensure_ascii=False, separators=(',', ':')))
+        os.replace(temp_path, state_path)
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
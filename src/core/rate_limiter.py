@@ -0,0 +1,286 @@
+import contextvars
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional, Tuple
+from pathlib import Path
+
+from .metrics import span, REGISTRY, is_enabled
+
+# Priority classes: interactive callers (web requests) are served before batch callers
+INTERACTIVE = 'interactive'
+BATCH = 'batch'
+PRIORITIES = (INTERACTIVE, BATCH)
+
+# Default (requests per second, burst) per API operation, kept at or below
+# the default AWS quotas. Operations without an entry are not limited but
+# are still retried when throttled.
+DEFAULT_LIMITS: Dict[str, Tuple[float, float]] = {
+    'rekognition.detect_text': (50.0, 50.0),
+    'rekognition.start_text_detection': (5.0, 5.0),
+    'rekognition.get_text_detection': (20.0, 20.0),
+    'translate.translate_text': (20.0, 20.0),
+    'transcribe.start_transcription_job': (10.0, 10.0),
+    'transcribe.get_transcription_job': (20.0, 20.0),
+}
+
+THROTTLING_ERROR_CODES = {
+    'Throttling', 'ThrottlingException', 'ThrottledException', 'TooManyRequestsException',
+    'ProvisionedThroughputExceededException', 'RequestLimitExceeded', 'LimitExceededException',
+    'RequestThrottled', 'SlowDown'
+}
+
+_priority = contextvars.ContextVar('subtitle_rate_limit_priority', default=BATCH)
+
+@contextmanager
+def priority(level: str):
+    """
+    Run a block of code with the given priority class for rate-limited calls.
+
+    Args:
+        level (str): INTERACTIVE or BATCH
+    """
+    if level not in PRIORITIES:
+        raise ValueError(f"Unknown priority: {level}")
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+def current_priority() -> str:
+    """Return the priority class of the current context."""
+    return _priority.get()
+
+def is_throttling_error(error: Exception) -> bool:
+    """
+    Check whether an exception is an AWS throttling error.
+
+    Args:
+        error (Exception): Exception raised by a boto3 client
+
+    Returns:
+        bool: True if the request was throttled
+    """
+    response = getattr(error, 'response', None)
+    if not isinstance(response, dict):
+        return False
+    return response.get('Error', {}).get('Code') in THROTTLING_ERROR_CODES
+
+class RateLimiter:
+    def __init__(self, db_path: Optional[str] = None, limits: Optional[Dict[str, Tuple[float, float]]] = None,
+                 account: Optional[str] = None, max_retries: int = 5, base_delay: float = 0.2,
+                 max_delay: float = 20.0):
+        """
+        Initialize a token-bucket rate limiter shared by every process using the same database.
+
+        Bucket state lives in a local SQLite database, so CLI batch workers,
+        web workers and video analysis on one host draw from the same quota.
+
+        Args:
+            db_path (str): SQLite database path (defaults to $SUBTITLE_RATE_LIMIT_DB or
+                ratelimit.sqlite under $SUBTITLE_CACHE_DIR / ~/.cache/subtitle-processor)
+            limits (Dict[str, Tuple[float, float]]): (requests per second, burst) per
+                'service.operation'; defaults to DEFAULT_LIMITS updated with the JSON
+                object in $SUBTITLE_RATE_LIMITS
+            account (str): Quota owner; buckets are per account and operation
+                (defaults to $AWS_ACCOUNT_ID, then $AWS_PROFILE, then 'default')
+            max_retries (int): Retries of a throttled call before the error is raised
+            base_delay (float): First backoff delay in seconds, doubled per retry
+            max_delay (float): Longest backoff delay in seconds
+        """
+        if db_path is None:
+            root = os.getenv('SUBTITLE_CACHE_DIR', str(Path.home() / '.cache' / 'subtitle-processor'))
+            db_path = os.getenv('SUBTITLE_RATE_LIMIT_DB', str(Path(root) / 'ratelimit.sqlite'))
+        if limits is None:
+            limits = dict(DEFAULT_LIMITS)
+            limits.update({
+                api: tuple(limit)
+                for api, limit in json.loads(os.getenv('SUBTITLE_RATE_LIMITS', '{}')).items()
+            })
+        self.db_path = db_path
+        self.limits = limits
+        self.account = account or os.getenv('AWS_ACCOUNT_ID') or os.getenv('AWS_PROFILE') or 'default'
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        # Longest single sleep while waiting, so new interactive waiters are noticed
+        self.max_sleep = 0.25
+        # Seconds an interactive waiter stays registered without refreshing it
+        self.waiter_ttl = 1.0
+
+        self._schema_ready = False
+        self._schema_lock = threading.Lock()
+
+    @contextmanager
+    def _connection(self):
+        """
+        Open a database connection for one operation, creating the schema on first use.
+
+        Connections are not kept per thread: limiter calls come from short-lived
+        executor threads, whose cached connections would leak file handles and
+        WAL readers.
+        """
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=30.0, isolation_level=None)
+        try:
+            conn.execute('PRAGMA synchronous=NORMAL')
+            if not self._schema_ready:
+                with self._schema_lock:
+                    if not self._schema_ready:
+                        conn.execute('PRAGMA journal_mode=WAL')
+                        conn.execute(
+                            'CREATE TABLE IF NOT EXISTS buckets '
+                            '(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)'
+                        )
+                        conn.execute(
+                            'CREATE TABLE IF NOT EXISTS waiters '
+                            '(id TEXT PRIMARY KEY, key TEXT NOT NULL, expires REAL NOT NULL)'
+                        )
+                        self._schema_ready = True
+            yield conn
+        finally:
+            conn.close()
+
+    def _bucket_key(self, api: str) -> str:
+        return f"{self.account}:{api}"
+
+    def acquire(self, api: str, cost: float = 1.0) -> float:
+        """
+        Block until a call to an API operation is allowed.
+
+        Batch callers wait while any interactive caller is waiting on the
+        same bucket.
+
+        Args:
+            api (str): 'service.operation', e.g. 'rekognition.detect_text'
+            cost (float): Tokens the call consumes
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        limit = self.limits.get(api)
+        if not limit:
+            return 0.0
+        rate, burst = limit
+        key = self._bucket_key(api)
+        interactive = current_priority() == INTERACTIVE
+        waiter_id = uuid.uuid4().hex if interactive else None
+        start = time.monotonic()
+
+        with span('ratelimit.wait'), self._connection() as conn:
+            try:
+                while True:
+                    conn.execute('BEGIN IMMEDIATE')
+                    try:
+                        # Read the clock while holding the lock so updates stay ordered
+                        now = time.time()
+                        if waiter_id:
+                            conn.execute('INSERT OR REPLACE INTO waiters VALUES (?, ?, ?)',
+                                         (waiter_id, key, now + self.waiter_ttl))
+                        row = conn.execute('SELECT tokens, updated FROM buckets WHERE key = ?', (key,)).fetchone()
+                        tokens = burst if row is None else min(burst, row[0] + max(0.0, now - row[1]) * rate)
+                        blocked = not interactive and conn.execute(
+                            'SELECT 1 FROM waiters WHERE key = ? AND expires > ? LIMIT 1', (key, now)
+                        ).fetchone() is not None
+                        granted = not blocked and tokens >= cost
+                        if granted:
+                            tokens -= cost
+                            if waiter_id:
+                                conn.execute('DELETE FROM waiters WHERE id = ?', (waiter_id,))
+                                waiter_id = None
+                        conn.execute('INSERT OR REPLACE INTO buckets VALUES (?, ?, ?)', (key, tokens, now))
+                        conn.execute('COMMIT')
+                    except Exception:
+                        conn.execute('ROLLBACK')
+                        raise
+
+                    if granted:
+                        return time.monotonic() - start
+                    wait = 1.0 / rate if blocked else (cost - tokens) / rate
+                    time.sleep(min(max(wait, 0.001), self.max_sleep))
+            finally:
+                if waiter_id:
+                    conn.execute('DELETE FROM waiters WHERE id = ?', (waiter_id,))
+
+    def penalize(self, api: str, delay: float):
+        """
+        Empty an API's bucket so every process pauses calls for about `delay` seconds.
+
+        Args:
+            api (str): 'service.operation'
+            delay (float): Seconds before the bucket has a token again
+        """
+        limit = self.limits.get(api)
+        if not limit:
+            return
+        rate, _ = limit
+        with self._connection() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                row = conn.execute('SELECT tokens FROM buckets WHERE key = ?', (self._bucket_key(api),)).fetchone()
+                tokens = min(row[0] if row else 0.0, 1.0 - rate * delay)
+                conn.execute('INSERT OR REPLACE INTO buckets VALUES (?, ?, ?)',
+                             (self._bucket_key(api), tokens, time.time()))
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+
+    def call(self, api: str, fn: Callable, *args, **kwargs):
+        """
+        Call an API operation within its rate limit, retrying when throttled.
+
+        Throttled calls are retried with exponential backoff and jitter; the
+        backoff is applied to the shared bucket so other processes slow down too.
+
+        Args:
+            api (str): 'service.operation'
+            fn (Callable): Client method to call
+            *args, **kwargs: Arguments for fn
+
+        Returns:
+            The result of fn
+        """
+        attempt = 0
+        while True:
+            self.acquire(api)
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                if not is_throttling_error(e) or attempt >= self.max_retries:
+                    raise
+                if is_enabled():
+                    service, _, operation = api.partition('.')
+                    REGISTRY.increment('subtitle_api_throttled_total', service=service, operation=operation)
+                delay = min(self.max_delay, self.base_delay * 2 ** attempt) * random.uniform(0.5, 1.0)
+                attempt += 1
+                if api in self.limits:
+                    self.penalize(api, delay)
+                else:
+                    time.sleep(delay)
+
+_default_limiter = None
+_default_lock = threading.Lock()
+
+def default_rate_limiter() -> RateLimiter:
+    """
+    Return the process-wide rate limiter.
+
+    Set SUBTITLE_RATE_LIMIT=0 to disable limiting (throttled calls are still retried).
+
+    Returns:
+        RateLimiter: Shared limiter
+    """
+    global _default_limiter
+    with _default_lock:
+        if _default_limiter is None:
+            limits = {} if os.getenv('SUBTITLE_RATE_LIMIT', '1') == '0' else None
+            _default_limiter = RateLimiter(limits=limits)
+        return _default_limiter
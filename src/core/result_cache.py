@@ -0,0 +1,264 @@
+import contextvars
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .metrics import span, cache_hit, cache_miss, is_enabled, REGISTRY
+
+# Bump when the entry layout changes so stale entries are ignored
+FORMAT_VERSION = 1
+
+HIT = 'hit'
+COALESCED = 'coalesced'
+MISS = 'miss'
+
+def _with_etag(result: Dict) -> Dict:
+    """Copy a result, adding a strong ETag derived from its body."""
+    etag = '"' + hashlib.blake2b(result['body'], digest_size=16).hexdigest() + '"'
+    return dict(result, etag=etag, headers=result.get('headers') or {})
+
+class ResultCache:
+    def __init__(self, cache_dir: Optional[str] = None, max_bytes: Optional[int] = None,
+                 ttl: Optional[float] = None):
+        """
+        Initialize the bounded on-disk cache of finished web results.
+
+        Each entry is a single file holding a JSON header line followed by the
+        response body, so it can be renamed into place atomically.
+
+        Args:
+            cache_dir (str): Cache directory (defaults to $SUBTITLE_CACHE_DIR/results
+                or ~/.cache/subtitle-processor/results)
+            max_bytes (int): Total size above which the least recently used entries
+                are evicted (defaults to $SUBTITLE_RESULT_CACHE_MB, 512 MB)
+            ttl (float): Seconds an entry stays valid (defaults to
+                $SUBTITLE_RESULT_CACHE_TTL, one day)
+        """
+        if cache_dir is None:
+            root = os.getenv('SUBTITLE_CACHE_DIR', str(Path.home() / '.cache' / 'subtitle-processor'))
+            cache_dir = str(Path(root) / 'results')
+        if max_bytes is None:
+            max_bytes = int(float(os.getenv('SUBTITLE_RESULT_CACHE_MB', '512')) * 1024 * 1024)
+        if ttl is None:
+            ttl = float(os.getenv('SUBTITLE_RESULT_CACHE_TTL', str(24 * 3600)))
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+
+    @staticmethod
+    def key(kind: str, digests: List[str], options: Dict) -> str:
+        """
+        Build the cache key for a request from its input hashes and options.
+
+        Args:
+            kind (str): Endpoint or job type
+            digests (List[str]): Content hashes of the inputs, in a fixed order
+            options (Dict): JSON-serializable options that affect the result
+
+        Returns:
+            str: Cache key
+        """
+        payload = json.dumps([FORMAT_VERSION, kind, digests, options], sort_keys=True)
+        return hashlib.blake2b(payload.encode('utf-8'), digest_size=20).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.result"
+
+    def load(self, key: str) -> Optional[Dict]:
+        """
+        Load a finished result.
+
+        Args:
+            key (str): Cache key
+
+        Returns:
+            Optional[Dict]: Result with 'body', 'etag', 'media_type' and 'headers',
+            or None if not cached or expired
+        """
+        path = self._path(key)
+        try:
+            with span('web.result_cache_load'):
+                with open(path, 'rb') as f:
+                    meta = json.loads(f.readline())
+                    body = f.read()
+        except (OSError, ValueError):
+            cache_miss('web_result')
+            return None
+
+        if self._expired(meta, time.time()):
+            self._remove(path)
+            cache_miss('web_result')
+            return None
+
+        # Mark as recently used for eviction (expiry uses the creation time)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        cache_hit('web_result')
+        return {'body': body, 'etag': meta['etag'], 'media_type': meta['media_type'], 'headers': meta['headers']}
+
+    def store(self, key: str, result: Dict) -> Dict:
+        """
+        Store a finished result and evict entries beyond the size limit.
+
+        Args:
+            key (str): Cache key
+            result (Dict): Result with 'body' bytes, 'media_type' and optional 'headers'
+
+        Returns:
+            Dict: The result with its 'etag' filled in
+        """
+        result = _with_etag(result)
+        if len(result['body']) > self.max_bytes:
+            return result
+
+        meta = {
+            'version': FORMAT_VERSION,
+            'created': time.time(),
+            'etag': result['etag'],
+            'media_type': result['media_type'],
+            'headers': result['headers']
+        }
+        with span('web.result_cache_store'):
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            fd, staging = tempfile.mkstemp(prefix=f".{key}-", dir=self.cache_dir)
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(json.dumps(meta).encode('utf-8') + b'\n')
+                    f.write(result['body'])
+                os.replace(staging, self._path(key))
+            except Exception:
+                self._remove(Path(staging))
+                raise
+            self._evict()
+        return result
+
+    def _expired(self, meta: Dict, now: float) -> bool:
+        """Return whether an entry header is from another format or older than the TTL."""
+        return meta.get('version') != FORMAT_VERSION or now - meta['created'] > self.ttl
+
+    def _evict(self):
+        """
+        Drop expired entries, then the least recently used ones until under max_bytes.
+
+        Expiry is judged by each entry's creation time, as in load(); the
+        modification time, refreshed on every hit, only orders eviction.
+        """
+        now = time.time()
+        entries = []
+        total = 0
+        for path in self.cache_dir.glob('*.result'):
+            try:
+                stat = path.stat()
+                with open(path, 'rb') as f:
+                    meta = json.loads(f.readline())
+            except (OSError, ValueError):
+                continue
+            if self._expired(meta, now):
+                self._remove(path)
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    @staticmethod
+    def _remove(path: Path):
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+class RequestCoalescer:
+    def __init__(self, cache: Optional[ResultCache] = None, max_workers: Optional[int] = None):
+        """
+        Initialize request coalescing in front of a result cache.
+
+        Identical requests (same key) running at the same time share one
+        computation; finished results are served from the cache.
+
+        Args:
+            cache (Optional[ResultCache]): Finished results (None only shares in-flight work)
+            max_workers (Optional[int]): Threads running computations
+        """
+        self.cache = cache
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='coalescer')
+        self._in_flight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, key: str, compute: Callable[[], Dict]) -> Tuple[Future, str]:
+        """
+        Return the result for a key, computing it only if nobody else is.
+
+        The computation runs in a worker thread with the caller's context
+        variables (e.g. the rate limiter priority). Exceptions are delivered
+        to every caller sharing the computation and are not cached.
+
+        Args:
+            key (str): Request key (see ResultCache.key)
+            compute (Callable[[], Dict]): Produces a result with 'body' bytes,
+                'media_type' and optional 'headers'
+
+        Returns:
+            Tuple[Future, str]: Future for the result (with 'etag' filled in) and
+            whether it was a cache HIT, COALESCED with a running computation or a MISS
+        """
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                self._count(COALESCED)
+                return future, COALESCED
+
+        cached = self.cache.load(key) if self.cache else None
+        if cached is not None:
+            future = Future()
+            future.set_result(cached)
+            self._count(HIT)
+            return future, HIT
+
+        with self._lock:
+            # Another request may have started the same computation meanwhile
+            future = self._in_flight.get(key)
+            if future is not None:
+                self._count(COALESCED)
+                return future, COALESCED
+            context = contextvars.copy_context()
+            future = self._executor.submit(context.run, self._run, key, compute)
+            self._in_flight[key] = future
+        # Clear the key however the future finishes, including when it is
+        # cancelled before its computation starts
+        future.add_done_callback(lambda done: self._finished(key, done))
+        self._count(MISS)
+        return future, MISS
+
+    def _run(self, key: str, compute: Callable[[], Dict]) -> Dict:
+        result = compute()
+        if self.cache:
+            return self.cache.store(key, result)
+        return _with_etag(result)
+
+    def _finished(self, key: str, future: Future):
+        with self._lock:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+
+    @staticmethod
+    def _count(status: str):
+        if is_enabled():
+            REGISTRY.increment('subtitle_web_requests_total', result=status)
+
+    def close(self):
+        """Stop the worker threads once running computations finish."""
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,554 @@
+import io
+import re
+import xml.etree.ElementTree as ET
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Union
+from pathlib import Path
+from xml.sax.saxutils import escape, quoteattr
+
+SUPPORTED_FORMATS = ('vtt', 'srt', 'ass', 'ttml')
+
+FORMAT_EXTENSIONS = {
+    '.vtt': 'vtt',
+    '.srt': 'srt',
+    '.ass': 'ass',
+    '.ssa': 'ass',
+    '.ttml': 'ttml',
+    '.dfxp': 'ttml',
+    '.xml': 'ttml'
+}
+
+MEDIA_TYPES = {
+    'vtt': 'text/vtt',
+    'srt': 'application/x-subrip',
+    'ass': 'text/x-ssa',
+    'ttml': 'application/ttml+xml'
+}
+
+TTML_NS = 'http://www.w3.org/ns/ttml'
+XML_NS = 'http://www.w3.org/XML/1998/namespace'
+
+# Whitespace as XML defines it (not Unicode spaces such as U+00A0)
+_XML_SPACE = re.compile('[ \t\r\n]+')
+
+ASS_HEADER = (
+    "[Script Info]\n"
+    "ScriptType: v4.00+\n"
+    "PlayResX: 384\n"
+    "PlayResY: 288\n"
+    "\n"
+    "[V4+ Styles]\n"
+    "Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, BackColour, "
+    "Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, "
+    "Shadow, Alignment, MarginL, MarginR, MarginV, Encoding\n"
+    "Style: Default,Arial,16,&H00FFFFFF,&H000000FF,&H00000000,&H00000000,0,0,0,0,100,100,0,0,1,1,0,2,10,10,10,1\n"
+    "\n"
+    "[Events]\n"
+    "Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text\n"
+)
+
+class Caption:
+    """A single subtitle cue, independent of the file format it came from."""
+
+    __slots__ = ('start_ms', 'end_ms', 'text', 'identifier', 'settings')
+
+    def __init__(self, start_ms: int, end_ms: int, text: str,
+                 identifier: Optional[str] = None, settings: str = ''):
+        self.start_ms = start_ms
+        self.end_ms = end_ms
+        self.text = text
+        self.identifier = identifier
+        self.settings = settings
+
+    @property
+    def start(self) -> str:
+        """Start time as a WebVTT timestamp."""
+        return format_timestamp(self.start_ms)
+
+    @property
+    def end(self) -> str:
+        """End time as a WebVTT timestamp."""
+        return format_timestamp(self.end_ms)
+
+    def __repr__(self) -> str:
+        return f"Caption({self.start!r}, {self.end!r}, {self.text!r})"
+
+def parse_timestamp(value: str, frame_rate: float = 30.0, tick_rate: float = 1.0) -> int:
+    """
+    Parse a subtitle timestamp into milliseconds in a single pass.
+
+    Accepts clock times with or without hours and with '.' or ',' before the
+    fraction (WebVTT, SRT, ASS and TTML clock times), TTML clock times with a
+    trailing frame field, and TTML offset times such as '12.5s', '500ms',
+    '25f' (frames) or '10000000t' (ticks).
+
+    Args:
+        value (str): Timestamp text
+        frame_rate (float): Frame rate used for TTML frame fields and frame offsets
+        tick_rate (float): Ticks per second used for TTML tick offsets
+
+    Returns:
+        int: Time in milliseconds
+    """
+    # Fast path for the fixed-width HH:MM:SS.mmm / HH:MM:SS,mmm layout
+    if len(value) == 12 and value[2] == ':' and value[5] == ':':
+        try:
+            return (int(value[0:2]) * 3600000 + int(value[3:5]) * 60000
+                    + int(value[6:8]) * 1000 + int(value[9:12]))
+        except ValueError:
+            pass
+
+    value = value.strip()
+    if value and value[-1] in 'ft' and ':' not in value:
+        rate = frame_rate if value[-1] == 'f' else tick_rate
+        try:
+            count = float(value[:-1])
+        except ValueError:
+            raise ValueError(f"Invalid timestamp: {value!r}") from None
+        if not count >= 0 or count == float('inf'):
+            raise ValueError(f"Invalid timestamp: {value!r}")
+        return int(round(count * 1000 / rate))
+
+    unit = 0
+    if value and value[-1] in 'hms' and ':' not in value:
+        if value.endswith('ms'):
+            unit, value = 1, value[:-2]
+        else:
+            unit, value = {'h': 3600000, 'm': 60000, 's': 1000}[value[-1]], value[:-1]
+
+    fields = 0
+    seconds = 0
+    field = 0
+    frac = 0
+    frac_digits = 0
+    in_frac = False
+    seen_digit = False
+    for ch in value:
+        digit = ord(ch) - 48
+        if 0 <= digit <= 9:
+            seen_digit = True
+            if in_frac:
+                if frac_digits < 3:
+                    frac = frac * 10 + digit
+                    frac_digits += 1
+            else:
+                field = field * 10 + digit
+        elif ch == ':' and not in_frac:
+            seconds = seconds * 60 + field
+            field = 0
+            fields += 1
+        elif (ch == '.' or ch == ',') and not in_frac:
+            in_frac = True
+        else:
+            raise ValueError(f"Invalid timestamp: {value!r}")
+
+    if not seen_digit:
+        raise ValueError(f"Invalid timestamp: {value!r}")
+
+    millis = frac * 10 ** (3 - frac_digits) if frac_digits else 0
+    if unit:
+        return field * unit + millis * unit // 1000
+
+    if fields == 3:
+        # HH:MM:SS:FF - the last field counts frames
+        return seconds * 1000 + int(field * 1000 / frame_rate)
+
+    return (seconds * 60 + field) * 1000 + millis
+
+def format_timestamp(ms: int, fmt: str = 'vtt') -> str:
+    """
+    Format milliseconds as a timestamp for the given subtitle format.
+
+    Args:
+        ms (int): Time in milliseconds
+        fmt (str): Target format ('vtt', 'srt', 'ass' or 'ttml')
+
+    Returns:
+        str: Formatted timestamp
+    """
+    ms = max(0, int(ms))
+    hours, ms = divmod(ms, 3600000)
+    minutes, ms = divmod(ms, 60000)
+    seconds, ms = divmod(ms, 1000)
+    if fmt == 'srt':
+        return f"{hours:02d}:{minutes:02d}:{seconds:02d},{ms:03d}"
+    if fmt == 'ass':
+        return f"{hours:d}:{minutes:02d}:{seconds:02d}.{ms // 10:02d}"
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}.{ms:03d}"
+
+def detect_format(head: str) -> str:
+    """
+    Detect the subtitle format from the beginning of a file.
+
+    Args:
+        head (str): The first few kilobytes of the file
+
+    Returns:
+        str: Detected format name
+    """
+    text = head.lstrip('\ufeff \t\r\n')
+    if text.startswith('WEBVTT'):
+        return 'vtt'
+    if text.startswith('[Script Info]') or '\n[Events]' in text or text.startswith('[Events]'):
+        return 'ass'
+    if text.startswith('<?xml') or text.startswith('<tt'):
+        return 'ttml'
+    if '-->' in text:
+        timing = text[:text.index('-->')].rsplit('\n', 1)[-1]
+        return 'srt' if ',' in timing else 'vtt'
+    raise ValueError("Unrecognized subtitle format")
+
+def format_for_path(path: Union[str, Path], default: Optional[str] = None) -> Optional[str]:
+    """
+    Look up the subtitle format for a file extension.
+
+    Args:
+        path (Union[str, Path]): File path
+        default (str): Format returned for unknown extensions
+
+    Returns:
+        Optional[str]: Format name
+    """
+    return FORMAT_EXTENSIONS.get(Path(path).suffix.lower(), default)
+
+def read_subtitles(path: Union[str, Path], fmt: Optional[str] = None) -> Iterator[Caption]:
+    """
+    Stream captions from a subtitle file in any supported format.
+
+    Args:
+        path (Union[str, Path]): Path to subtitle file
+        fmt (str): Format name, auto-detected from content when omitted
+
+    Returns:
+        Iterator[Caption]: Captions in file order
+    """
+    if fmt is None:
+        with open(path, 'r', encoding='utf-8-sig') as f:
+            fmt = detect_format(f.read(4096))
+    if fmt == 'ttml':
+        yield from _read_ttml(str(path))
+        return
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        yield from _READERS[fmt](f)
+
+def iter_captions(text: str, fmt: Optional[str] = None) -> Iterator[Caption]:
+    """
+    Parse captions from subtitle text already held in memory.
+
+    Args:
+        text (str): Subtitle file content
+        fmt (str): Format name, auto-detected from content when omitted
+
+    Returns:
+        Iterator[Caption]: Captions in order
+    """
+    text = text.lstrip('\ufeff')
+    fmt = fmt or detect_format(text[:4096])
+    if fmt == 'ttml':
+        return _read_ttml(io.BytesIO(text.encode('utf-8')))
+    return _READERS[fmt](io.StringIO(text))
+
+def _blocks(lines: Iterable[str]) -> Iterator[List[str]]:
+    """Group lines into blank-line separated blocks."""
+    block = []
+    for line in lines:
+        line = line.rstrip('\r\n')
+        if line.strip():
+            block.append(line)
+        elif block:
+            yield block
+            block = []
+    if block:
+        yield block
+
+def _read_vtt(lines: TextIO) -> Iterator[Caption]:
+    """Parse WebVTT cues."""
+    blocks = _blocks(lines)
+    next(blocks, None)  # WEBVTT header block
+    for block in blocks:
+        first = block[0]
+        if first.startswith('NOTE') or first.startswith('STYLE') or first.startswith('REGION'):
+            continue
+        for i, line in enumerate(block):
+            if '-->' in line:
+                break
+        else:
+            continue
+        left, _, right = line.partition('-->')
+        right = right.strip()
+        end_text, _, settings = right.partition(' ')
+        yield Caption(
+            parse_timestamp(left.strip()),
+            parse_timestamp(end_text),
+            '\n'.join(block[i + 1:]),
+            block[0] if i else None,
+            settings.strip()
+        )
+
+def _read_srt(lines: TextIO) -> Iterator[Caption]:
+    """Parse SubRip cues."""
+    for block in _blocks(lines):
+        for i, line in enumerate(block):
+            if '-->' in line:
+                break
+        else:
+            continue
+        left, _, right = line.partition('-->')
+        end_text = right.strip().partition(' ')[0]
+        yield Caption(
+            parse_timestamp(left.strip()),
+            parse_timestamp(end_text),
+            '\n'.join(block[i + 1:]),
+            block[0] if i else None
+        )
+
+def _ass_text(text: str) -> str:
+    """Convert ASS dialogue text to plain text, dropping override blocks."""
+    if '{' in text:
+        parts = []
+        depth = 0
+        start = 0
+        for i, ch in enumerate(text):
+            if ch == '{':
+                if depth == 0:
+                    parts.append(text[start:i])
+                depth += 1
+            elif ch == '}' and depth:
+                depth -= 1
+                if depth == 0:
+                    start = i + 1
+        if depth == 0:
+            parts.append(text[start:])
+        text = ''.join(parts)
+    return text.replace('\\N', '\n').replace('\\n', '\n').replace('\\h', ' ')
+
+def _read_ass(lines: TextIO) -> Iterator[Caption]:
+    """Parse Advanced SubStation Alpha dialogue events."""
+    in_events = False
+    columns = ['layer', 'start', 'end', 'style', 'name', 'marginl', 'marginr', 'marginv', 'effect', 'text']
+    for line in lines:
+        line = line.rstrip('\r\n')
+        if line.startswith('['):
+            in_events = line.strip().lower() == '[events]'
+            continue
+        if not in_events:
+            continue
+        key, _, value = line.partition(':')
+        if key == 'Format':
+            columns = [c.strip().lower() for c in value.split(',')]
+        elif key == 'Dialogue':
+            fields = value.lstrip().split(',', len(columns) - 1)
+            if len(fields) < len(columns):
+                continue
+            row = dict(zip(columns, fields))
+            yield Caption(
+                parse_timestamp(row['start'].strip()),
+                parse_timestamp(row['end'].strip()),
+                _ass_text(row['text']),
+                row.get('name') or None
+            )
+
+def _ttml_timing(root) -> Dict[str, float]:
+    """
+    Read the frame and tick rates of a TTML document from its <tt> element.
+
+    Returns:
+        Dict[str, float]: 'frame_rate' (effective, after ttp:frameRateMultiplier)
+        and 'tick_rate' (defaulting to the effective frame rate times
+        ttp:subFrameRate when a frame rate is given, otherwise 1)
+    """
+    params = {name.rpartition('}')[2]: value for name, value in root.attrib.items()}
+    frame_rate = float(params.get('frameRate', 30))
+    numerator, _, denominator = params.get('frameRateMultiplier', '1 1').partition(' ')
+    frame_rate *= float(numerator) / float(denominator or 1)
+    if 'tickRate' in params:
+        tick_rate = float(params['tickRate'])
+    elif 'frameRate' in params:
+        tick_rate = frame_rate * float(params.get('subFrameRate', 1))
+    else:
+        tick_rate = 1.0
+    return {'frame_rate': frame_rate, 'tick_rate': tick_rate}
+
+def _read_ttml(source) -> Iterator[Caption]:
+    """Parse TTML paragraphs incrementally."""
+    timing = {'frame_rate': 30.0, 'tick_rate': 1.0}
+    # xml:space in effect for each open element
+    spaces = ['default']
+    for event, elem in ET.iterparse(source, events=('start', 'end')):
+        tag = elem.tag.rpartition('}')[2]
+        if event == 'start':
+            spaces.append(elem.get(f'{{{XML_NS}}}space', spaces[-1]))
+            if tag == 'tt':
+                timing = _ttml_timing(elem)
+            continue
+        space = spaces.pop()
+        if tag != 'p':
+            continue
+        begin = elem.get('begin')
+        if begin is not None:
+            start = parse_timestamp(begin, **timing)
+            if elem.get('end') is not None:
+                end = parse_timestamp(elem.get('end'), **timing)
+            else:
+                end = start + parse_timestamp(elem.get('dur', '0s'), **timing)
+            yield Caption(start, end, _ttml_text(elem, space == 'preserve'), elem.get(f'{{{XML_NS}}}id'))
+        elem.clear()
+
+def _ttml_text(elem, preserve: bool = False) -> str:
+    """
+    Flatten a TTML paragraph to text. Unless xml:space="preserve", runs of XML
+    whitespace (including the source's indentation and newlines) collapse to
+    one space and lines break only at <br/>.
+    """
+    parts = []
+    _ttml_parts(elem, parts, preserve)
+    text = ''.join(parts)
+    if preserve:
+        return text
+    return '\n'.join(line for line in (line.strip(' ') for line in text.split('\n')) if line)
+
+def _ttml_parts(elem, parts: List[str], preserve: bool):
+    text = elem.text or ''
+    parts.append(text if preserve else _XML_SPACE.sub(' ', text))
+    for child in elem:
+        if child.tag.rpartition('}')[2] == 'br':
+            parts.append('\n')
+        else:
+            _ttml_parts(child, parts, child.get(f'{{{XML_NS}}}space', 'preserve' if preserve else 'default') == 'preserve')
+        tail = child.tail or ''
+        parts.append(tail if preserve else _XML_SPACE.sub(' ', tail))
+
+_READERS = {
+    'vtt': _read_vtt,
+    'srt': _read_srt,
+    'ass': _read_ass
+}
+
+def _cue_fields(cue: Union[Caption, Dict]):
+    """Return (start_ms, end_ms, text, position) for a caption or enhanced caption dict."""
+    if isinstance(cue, Caption):
+        return cue.start_ms, cue.end_ms, cue.text, None
+    start = cue.get('start_ms')
+    end = cue.get('end_ms')
+    if start is None:
+        start = parse_timestamp(cue['start'])
+    if end is None:
+        end = parse_timestamp(cue['end'])
+    return start, end, cue['text'], cue.get('position')
+
+def _lines(text: str) -> List[str]:
+    """Split cue text into lines, dropping blank ones (a blank line would end the cue)."""
+    return [line for line in text.split('\n') if line.strip()]
+
+def _write_vtt(f: TextIO, cues: Iterable, language: Optional[str] = None) -> int:
+    """Write cues as WebVTT."""
+    f.write('WEBVTT\n\n')
+    count = 0
+    for count, cue in enumerate(cues, 1):
+        start, end, text, position = _cue_fields(cue)
+        settings = cue.settings if isinstance(cue, Caption) else cue.get('settings', '')
+        if position:
+            # The computed position replaces any position the cue came with
+            settings = ' '.join(s for s in settings.split() if not s.startswith('position:'))
+            settings = f"{settings} position:{position['x']}%,{position['y']}%".lstrip()
+        f.write(f"{count}\n")
+        f.write(f"{format_timestamp(start)} --> {format_timestamp(end)}")
+        if settings:
+            f.write(f" {settings}")
+        text = '\n'.join(_lines(text))
+        f.write(f"\n{text}\n\n")
+    return count
+
+def _write_srt(f: TextIO, cues: Iterable, language: Optional[str] = None) -> int:
+    """Write cues as SubRip."""
+    count = 0
+    for count, cue in enumerate(cues, 1):
+        start, end, text, _ = _cue_fields(cue)
+        text = '\n'.join(_lines(text))
+        f.write(f"{count}\n{format_timestamp(start, 'srt')} --> {format_timestamp(end, 'srt')}\n{text}\n\n")
+    return count
+
+def _write_ass(f: TextIO, cues: Iterable, language: Optional[str] = None) -> int:
+    """Write cues as Advanced SubStation Alpha."""
+    f.write(ASS_HEADER)
+    count = 0
+    for count, cue in enumerate(cues, 1):
+        start, end, text, _ = _cue_fields(cue)
+        text = '\\N'.join(_lines(text))
+        f.write(f"Dialogue: 0,{format_timestamp(start, 'ass')},{format_timestamp(end, 'ass')},Default,,0,0,0,,{text}\n")
+    return count
+
+def _write_ttml(f: TextIO, cues: Iterable, language: Optional[str] = None) -> int:
+    """Write cues as TTML (xml:lang is empty, meaning undetermined, when the language is unknown)."""
+    f.write('<?xml version="1.0" encoding="utf-8"?>\n')
+    f.write(f'<tt xmlns="{TTML_NS}" xml:lang={quoteattr(language or "")}>\n  <body>\n    <div>\n')
+    count = 0
+    for count, cue in enumerate(cues, 1):
+        start, end, text, _ = _cue_fields(cue)
+        lines = _lines(text)
+        # Keep runs of spaces, which TTML readers otherwise collapse
+        space = ' xml:space="preserve"' if any('  ' in line or line != line.strip(' ') for line in lines) else ''
+        text = '<br/>'.join(escape(line) for line in lines)
+        f.write(f'      <p begin="{format_timestamp(start, "ttml")}" end="{format_timestamp(end, "ttml")}"{space}>{text}</p>\n')
+    f.write('    </div>\n  </body>\n</tt>\n')
+    return count
+
+_WRITERS = {
+    'vtt': _write_vtt,
+    'srt': _write_srt,
+    'ass': _write_ass,
+    'ttml': _write_ttml
+}
+
+def write_subtitles(cues: Iterable, output: Union[str, Path, TextIO], fmt: str = 'vtt',
+                    language: Optional[str] = None) -> int:
+    """
+    Write captions or enhanced caption dicts in the given format.
+
+    Cues are consumed lazily, so a reader generator can be passed straight
+    through for single-pass conversion.
+
+    Args:
+        cues (Iterable): Caption objects or dicts with 'start'/'end' (or
+            'start_ms'/'end_ms'), 'text' and optional 'position'
+        output (Union[str, Path, TextIO]): Output file path or open text file
+        fmt (str): Output format name
+        language (str): Language tag of the text, for formats that record it (TTML)
+
+    Returns:
+        int: Number of cues written
+    """
+    if fmt not in _WRITERS:
+        raise ValueError(f"Unsupported subtitle format: {fmt}")
+    if hasattr(output, 'write'):
+        return _WRITERS[fmt](output, cues, language)
+    with open(output, 'w', encoding='utf-8') as f:
+        return _WRITERS[fmt](f, cues, language)
+
+def convert(input_path: str, output_path: str, output_format: Optional[str] = None,
+            input_format: Optional[str] = None, language: Optional[str] = None) -> int:
+    """
+    Convert a subtitle file between formats in one streaming pass.
+
+    Args:
+        input_path (str): Path to input subtitle file
+        output_path (str): Path to output subtitle file
+        output_format (str): Output format, taken from the output extension when omitted
+        input_format (str): Input format, auto-detected when omitted
+        language (str): Language tag of the text (taken from a TTML input when omitted)
+
+    Returns:
+        int: Number of cues converted
+    """
+    fmt = output_format or format_for_path(output_path, 'vtt')
+    if input_format is None:
+        with open(input_path, 'r', encoding='utf-8-sig') as f:
+            input_format = detect_format(f.read(4096))
+    if language is None and input_format == 'ttml':
+        language = _ttml_language(input_path)
+    return write_subtitles(read_subtitles(input_path, input_format), output_path, fmt, language)
+
+def _ttml_language(path: str) -> Optional[str]:
+    """Return the xml:lang of a TTML file's <tt> element, reading no further."""
+    for _, elem in ET.iterparse(path, events=('start',)):
+        return elem.get(f'{{{XML_NS}}}lang') or None
+    return None
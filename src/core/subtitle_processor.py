@@ -1,4 +1,3 @@
-import webvtt
 import boto3
 import language_tool_python
 from typing import List, Dict, Optional
@@ -6,48 +5,196 @@ import json
 import os
 from pathlib import Path
 
+from .subtitle_formats import read_subtitles, write_subtitles, format_for_path
+from .metrics import span, timed, api_call
+from .processing_state import cue_key, load_state, save_state
+from .grammar_pool import default_pool, detect_language, languagetool_language
+from .text_normalizer import normalize_text, Reflow, NORMALIZER_VERSION
+
+# Bump when enhancement output changes in a way settings() does not describe,
+# so cached results are recomputed
+PROCESSING_VERSION = 3
+
 class SubtitleProcessor:
-    def __init__(self):
-        """Initialize the subtitle processor with necessary AWS clients and language tool."""
-        self.transcribe = boto3.client('transcribe')
-        self.translate = boto3.client('translate')
-        self.rekognition = boto3.client('rekognition')
-        self.language_tool = language_tool_python.LanguageTool('en-US')
+    def __init__(self, language_tool=None, transcribe=None, translate=None, rekognition=None,
+                 grammar_pool=None, language: Optional[str] = None, reflow: Optional[Reflow] = None):
+        """
+        Initialize the subtitle processor with necessary AWS clients and language tool.
+
+        Args:
+            language_tool: Single LanguageTool instance used for every cue, in its
+                own language (grammar_pool is used when omitted)
+            transcribe: Transcribe client (created with boto3 when omitted)
+            translate: Translate client (created with boto3 when omitted)
+            rekognition: Rekognition client (created with boto3 when omitted)
+            grammar_pool: LanguageToolPool checking cues concurrently in any
+                language (the shared default pool when omitted)
+            language (str): Language of the subtitles (detected from the cue text when omitted)
+            reflow (Reflow): Line length and reading speed limits applied to the
+                output (42 characters per line and 17 characters per second when omitted)
+        """
+        self.transcribe = transcribe or boto3.client('transcribe')
+        self.translate = translate or boto3.client('translate')
+        self.rekognition = rekognition or boto3.client('rekognition')
+        self.language_tool = language_tool
+        self.grammar_pool = None if language_tool is not None else (grammar_pool or default_pool())
+        self.language = language
+        self.reflow = reflow or Reflow()
 
-    def process_subtitle_file(self, input_path: str, output_path: str) -> bool:
+    def process_subtitle_file(self, input_path: str, output_path: str, state_path: Optional[str] = None,
+                              language: Optional[str] = None) -> bool:
         """
-        Process a VTT subtitle file and generate enhanced output.
+        Process a subtitle file and generate enhanced output.
+
+        The input format (VTT, SRT, ASS or TTML) is detected from the file
+        content; the output format follows the output file extension.
         
         Args:
-            input_path (str): Path to input VTT file
-            output_path (str): Path to save enhanced VTT file
+            input_path (str): Path to input subtitle file
+            output_path (str): Path to save enhanced subtitle file
+            state_path (str): Optional state file enabling incremental
+                processing (see process_subtitle_file_incremental)
+            language (str): Language code of the subtitles, e.g. a transcript's
+                language_code (see resolve_language)
             
         Returns:
             bool: True if processing successful, False otherwise
         """
+        return self.process_subtitle_file_incremental(input_path, output_path, state_path, language) is not None
+
+    @timed('subtitle.process_file')
+    def process_subtitle_file_incremental(self, input_path: str, output_path: str,
+                                          state_path: Optional[str] = None,
+                                          language: Optional[str] = None) -> Optional[Dict]:
+        """
+        Process a subtitle file, re-enhancing only cues that changed since the last run.
+
+        Cues are identified by their timing and a hash of their text. Enhanced
+        cues from the previous run are read from the state file and reused
+        for unchanged cues; the state file is then rewritten for the next run.
+        Changed cues are grammar checked concurrently on the grammar pool.
+        Line breaking and reading speed limits are applied to the whole
+        output, so cues may be split or merged.
+
+        Args:
+            input_path (str): Path to input subtitle file
+            output_path (str): Path to save enhanced subtitle file
+            state_path (str): Path to the state file (None processes every cue)
+            language (str): Language code of the subtitles (see resolve_language)
+
+        Returns:
+            Optional[Dict]: Counts of 'cues' and 'reprocessed' cues, or None on failure
+        """
         try:
-            # Read VTT file
-            subtitles = webvtt.read(input_path)
-            enhanced_subtitles = []
+            # Read subtitle file
+            with span('subtitle.parse'):
+                subtitles = list(read_subtitles(input_path))
 
-            for caption in subtitles:
-                # Clean and enhance each caption
-                enhanced_caption = self._enhance_caption(caption)
-                enhanced_subtitles.append(enhanced_caption)
+            language = self.resolve_language(subtitles, language)
+            settings = self._state_settings(language)
+            previous = load_state(state_path, settings) if state_path else {}
+            keys = [cue_key(caption) for caption in subtitles]
+            enhanced_by_key = {}
+            changed = []
+
+            for key, caption in zip(keys, subtitles):
+                if key in enhanced_by_key:
+                    continue
+                enhanced_caption = previous.get(key)
+                if enhanced_caption is None:
+                    changed.append((key, caption))
+                enhanced_by_key[key] = enhanced_caption
+
+            # Clean and enhance the changed captions
+            enhanced = self.enhance_captions([caption for _, caption in changed], language)
+            for (key, _), enhanced_caption in zip(changed, enhanced):
+                enhanced_by_key[key] = enhanced_caption
+            enhanced_subtitles = [enhanced_by_key[key] for key in keys]
+            reprocessed = len(changed)
 
             # Write enhanced subtitles
-            self._write_enhanced_subtitles(enhanced_subtitles, output_path)
-            return True
+            with span('subtitle.reflow'):
+                enhanced_subtitles = self.reflow.apply(enhanced_subtitles)
+            self._write_enhanced_subtitles(enhanced_subtitles, output_path, language)
+            if state_path:
+                save_state(state_path, settings, enhanced_by_key)
+            return {'cues': len(subtitles), 'reprocessed': reprocessed}
         except Exception as e:
             print(f"Error processing subtitle file: {str(e)}")
-            return False
+            return None
+
+    def resolve_language(self, captions: List, language: Optional[str] = None) -> str:
+        """
+        Choose the LanguageTool language for a set of captions.
+
+        An explicit language (e.g. a transcript's language_code) wins, then the
+        language of a single language_tool, then the processor's language;
+        otherwise the language is detected from the cue text.
+
+        Args:
+            captions (List): Caption objects
+            language (str): Language code, if known
 
-    def _enhance_caption(self, caption) -> Dict:
+        Returns:
+            str: LanguageTool language code
+        """
+        if self.language_tool is not None:
+            return str(getattr(self.language_tool, 'language', ''))
+        language = language or self.language
+        if language:
+            return languagetool_language(language)
+        return detect_language(caption.text for caption in captions)
+
+    def settings(self, language: Optional[str] = None) -> Dict:
+        """
+        Describe the code and settings that affect processed output, for result cache keys.
+
+        Args:
+            language (Optional[str]): Requested language (None when detected from the cues)
+
+        Returns:
+            Dict: JSON-serializable settings
+        """
+        return {'version': PROCESSING_VERSION, **self._state_settings(language), 'reflow': self.reflow.settings()}
+
+    def _state_settings(self, language: str) -> Dict:
+        """
+        Describe the settings that affect enhanced cues, for incremental state.
+
+        Args:
+            language (str): LanguageTool language code
+
+        Returns:
+            Dict: JSON-serializable settings
+        """
+        return {'language': language, 'normalizer': NORMALIZER_VERSION}
+
+    def enhance_captions(self, captions: List, language: str) -> List[Dict]:
+        """
+        Enhance many captions, grammar checking them concurrently when a pool is in use.
+
+        Args:
+            captions (List): Caption objects
+            language (str): LanguageTool language code
+
+        Returns:
+            List[Dict]: Enhanced caption data, in input order
+        """
+        if self.grammar_pool is None:
+            return [self._enhance_caption(caption, language) for caption in captions]
+
+        texts = [self._clean_text(caption.text) for caption in captions]
+        with span('subtitle.grammar_batch'):
+            corrected = self.grammar_pool.map(lambda text: self._fix_grammar(text, language), texts, language)
+        return [self._enhanced(caption, text) for caption, text in zip(captions, corrected)]
+
+    def _enhance_caption(self, caption, language: Optional[str] = None) -> Dict:
         """
         Enhance a single caption by applying various improvements.
         
         Args:
-            caption: WebVTT caption object
+            caption: Caption object
+            language (str): LanguageTool language code (detected from the caption when omitted)
             
         Returns:
             Dict: Enhanced caption data
@@ -56,21 +203,38 @@ class SubtitleProcessor:
         text = self._clean_text(caption.text)
         
         # Fix grammar and spelling
-        text = self._fix_grammar(text)
+        text = self._fix_grammar(text, language or self.resolve_language([caption]))
         
+        return self._enhanced(caption, text)
+
+    def _enhanced(self, caption, text: str) -> Dict:
+        """
+        Build enhanced caption data from a caption and its corrected text.
+
+        Args:
+            caption: Caption object
+            text (str): Cleaned and corrected text
+
+        Returns:
+            Dict: Enhanced caption data
+        """
         # Optimize positioning
         position = self._optimize_position(text)
         
         return {
             'start': caption.start,
             'end': caption.end,
+            'start_ms': caption.start_ms,
+            'end_ms': caption.end_ms,
             'text': text,
             'position': position
         }
 
+    @timed('subtitle.clean')
     def _clean_text(self, text: str) -> str:
         """
-        Clean text by removing invalid characters and extra lines.
+        Clean text by removing invalid and zero-width characters, runs of
+        spaces and extra lines.
         
         Args:
             text (str): Input text
@@ -78,26 +242,28 @@ class SubtitleProcessor:
         Returns:
             str: Cleaned text
         """
-        # Remove invalid characters
-        text = ''.join(char for char in text if ord(char) < 65535)
-        
-        # Remove extra lines
-        lines = [line.strip() for line in text.split('\n') if line.strip()]
-        return '\n'.join(lines)
+        return normalize_text(text)
 
-    def _fix_grammar(self, text: str) -> str:
+    @timed('subtitle.grammar')
+    def _fix_grammar(self, text: str, language: str = 'en-US') -> str:
         """
         Fix grammar and spelling issues in the text.
         
         Args:
             text (str): Input text
+            language (str): LanguageTool language code (ignored with a single language_tool)
             
         Returns:
             str: Corrected text
         """
-        matches = self.language_tool.check(text)
+        api_call('languagetool', 'check')
+        if self.language_tool is not None:
+            matches = self.language_tool.check(text)
+        else:
+            matches = self.grammar_pool.check(text, language)
         return language_tool_python.utils.correct(text, matches)
 
+    @timed('subtitle.position')
     def _optimize_position(self, text: str) -> Dict[str, int]:
         """
         Calculate optimal position for subtitle text.
@@ -111,19 +277,15 @@ class SubtitleProcessor:
         # Default position (bottom center)
         return {'x': 50, 'y': 90}
 
-    def _write_enhanced_subtitles(self, subtitles: List[Dict], output_path: str):
+    @timed('subtitle.write')
+    def _write_enhanced_subtitles(self, subtitles: List[Dict], output_path: str, language: Optional[str] = None):
         """
-        Write enhanced subtitles to VTT file.
+        Write enhanced subtitles in the format matching the output path
+        (VTT when the extension is not recognised).
         
         Args:
             subtitles (List[Dict]): List of enhanced subtitles
             output_path (str): Output file path
+            language (str): Language of the text, recorded by formats that support it
         """
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write('WEBVTT\n\n')
-            
-            for i, subtitle in enumerate(subtitles, 1):
-                f.write(f"{i}\n")
-                f.write(f"{subtitle['start']} --> {subtitle['end']}")
-                f.write(f" position:{subtitle['position']['x']}%,{subtitle['position']['y']}%\n")
-                f.write(f"{subtitle['text']}\n\n")
+        write_subtitles(subtitles, output_path, format_for_path(output_path, 'vtt'), language)
@@ -0,0 +1,384 @@
+import math
+import re
+from typing import Dict, List, Optional
+
+from .subtitle_formats import format_timestamp
+
+# Bump when normalize_text output changes so incremental state is rebuilt
+NORMALIZER_VERSION = 2
+
+# Control characters (except newline and tab), C1 controls and invisible
+# format characters such as zero-width spaces are removed. Zero-width
+# (non-)joiners are kept: Persian, Indic scripts and emoji sequences need them
+_REMOVED = [*range(0x00, 0x09), 0x0b, 0x0c, *range(0x0e, 0x20), *range(0x7f, 0xa0),
+            0x00ad, 0x200b, 0x2060, 0xfeff]
+# Tabs and Unicode spaces become plain spaces; other line terminators become newlines
+_SPACES = [0x09, 0xa0, 0x1680, *range(0x2000, 0x200b), 0x202f, 0x205f, 0x3000]
+_NEWLINES = [0x0d, 0x85, 0x2028, 0x2029]
+
+TRANSLATE_TABLE = {
+    **dict.fromkeys(_REMOVED),
+    **dict.fromkeys(_SPACES, ' '),
+    **dict.fromkeys(_NEWLINES, '\n')
+}
+
+# Characters outside the Basic Multilingual Plane, which many players cannot
+# render, with the joiners and emoji variation selectors tying them to neighbours
+_ASTRAL = re.compile('\u200d?[\uffff\U00010000-\U0010ffff][\u200d\ufe0f]*')
+_RUNS_OF_SPACES = re.compile('  +')
+# Spaces around a line break plus any blank lines that follow it
+_LINE_BREAK = re.compile(' *\n[ \n]*')
+# Speaker turns in dialogue cues
+_DIALOGUE_DASHES = ('-', '\u2013', '\u2014')
+# Markup such as <i>, </font>, <v Roger> or <c.yellow>, which takes no space on screen
+_TAG = re.compile(r'<[^<>\n]*>')
+_OPEN_TAG = re.compile(r'<([A-Za-z][\w-]*)[^<>\n]*>')
+_CLOSE_TAG = re.compile(r'</([A-Za-z][\w-]*)[^<>\n]*>')
+# A word: a run of non-space characters in which tags (even ones holding
+# spaces) are never split
+_WORD = re.compile(r'(?:<[^<>\n]*>|<|[^\s<])+')
+
+def visible_length(text: str) -> int:
+    """
+    Count the characters of text shown on screen, leaving out markup tags.
+
+    Args:
+        text (str): Cue text or line
+
+    Returns:
+        int: Number of visible characters
+    """
+    if '<' not in text:
+        return len(text)
+    return len(_TAG.sub('', text))
+
+def balance_tags(lines: List[str]) -> List[str]:
+    """
+    Close tags still open at the end of each line and reopen them on the next.
+
+    Every line then carries its own markup, so lines can be regrouped into
+    separate cues. Tags left open on the last line stay as the author wrote them.
+
+    Args:
+        lines (List[str]): Consecutive lines of cue text
+
+    Returns:
+        List[str]: Lines with balanced markup
+    """
+    if not any('<' in line for line in lines):
+        return lines
+    balanced = []
+    stack = []
+    for i, line in enumerate(lines):
+        prefix = ''.join(tag for _, tag in stack)
+        for tag in _TAG.findall(line):
+            closing = _CLOSE_TAG.fullmatch(tag)
+            if closing:
+                name = closing.group(1).lower()
+                for depth in range(len(stack) - 1, -1, -1):
+                    if stack[depth][0] == name:
+                        del stack[depth:]
+                        break
+                continue
+            opening = _OPEN_TAG.fullmatch(tag)
+            if opening and not tag.endswith('/>'):
+                stack.append((opening.group(1).split('.')[0].lower(), tag))
+        suffix = ''.join(f"</{name}>" for name, _ in reversed(stack)) if i + 1 < len(lines) else ''
+        balanced.append(prefix + line + suffix)
+    return balanced
+
+def normalize_text(text: str) -> str:
+    """
+    Clean cue text: drop control and zero-width characters, collapse runs of
+    spaces, and strip blank lines and whitespace around lines.
+
+    Each step is a single C-level pass (str.translate or a precompiled
+    pattern), skipped when the text cannot contain what it removes.
+
+    Args:
+        text (str): Input text
+
+    Returns:
+        str: Cleaned text
+    """
+    text = text.translate(TRANSLATE_TABLE)
+    if not text.isascii():
+        text = _ASTRAL.sub('', text)
+    if '  ' in text:
+        text = _RUNS_OF_SPACES.sub(' ', text)
+    if '\n' in text:
+        text = _LINE_BREAK.sub('\n', text)
+    return text.strip(' \n')
+
+class Reflow:
+    def __init__(self, max_chars_per_line: Optional[int] = 42, max_lines: int = 2,
+                 max_cps: Optional[float] = 17.0, min_gap_ms: int = 80,
+                 max_duration_ms: int = 7000, merge_gap_ms: int = 500):
+        """
+        Initialize line breaking and reading speed normalization for cues.
+
+        Args:
+            max_chars_per_line (Optional[int]): Longest line allowed (None keeps line breaks)
+            max_lines (int): Lines per cue; longer text is split into several cues
+            max_cps (Optional[float]): Highest reading speed in characters per second
+                (None leaves timing alone)
+            min_gap_ms (int): Gap kept before the next cue when extending a cue
+            max_duration_ms (int): Longest cue produced by extending or merging
+            merge_gap_ms (int): Largest gap between two cues that may be merged
+        """
+        self.max_chars_per_line = max_chars_per_line
+        self.max_lines = max_lines
+        self.max_cps = max_cps
+        self.min_gap_ms = min_gap_ms
+        self.max_duration_ms = max_duration_ms
+        self.merge_gap_ms = merge_gap_ms
+
+    def settings(self) -> Dict:
+        """
+        Describe the limits applied.
+
+        Returns:
+            Dict: JSON-serializable settings
+        """
+        return {
+            'max_chars_per_line': self.max_chars_per_line,
+            'max_lines': self.max_lines,
+            'max_cps': self.max_cps,
+            'min_gap_ms': self.min_gap_ms,
+            'max_duration_ms': self.max_duration_ms,
+            'merge_gap_ms': self.merge_gap_ms
+        }
+
+    @staticmethod
+    def reading_speed(cue: Dict) -> float:
+        """
+        Characters per second needed to read a cue (line breaks and tags not counted).
+
+        Args:
+            cue (Dict): Enhanced cue with 'start_ms', 'end_ms' and 'text'
+
+        Returns:
+            float: Characters per second
+        """
+        text = cue['text']
+        duration = cue['end_ms'] - cue['start_ms']
+        chars = visible_length(text) - text.count('\n')
+        return chars * 1000.0 / duration if duration > 0 else math.inf
+
+    def apply(self, cues: List[Dict]) -> List[Dict]:
+        """
+        Break lines, split over-long cues and fix reading speed, in linear time.
+
+        Cues whose text needs more than max_lines lines are split, sharing the
+        cue's time in proportion to their length. Cues read faster than
+        max_cps are extended into the gap before the next cue, then merged
+        with a neighbour when the merged cue fits and reads slower.
+
+        Args:
+            cues (List[Dict]): Enhanced cues in time order
+
+        Returns:
+            List[Dict]: Reflowed cues (unchanged cues are passed through)
+        """
+        if self.max_chars_per_line:
+            split = []
+            for cue in cues:
+                split.extend(self._split(cue))
+            cues = split
+        if self.max_cps:
+            cues = self._fit_reading_speed(cues)
+        return cues
+
+    def break_lines(self, text: str) -> List[str]:
+        """
+        Break text into lines of at most max_chars_per_line characters.
+
+        Existing line breaks are kept when they already fit. Otherwise each
+        line is wrapped on its own, keeping the author's breaks when that
+        stays within max_lines, or always for dialogue (lines starting with a
+        dash) so each speaker keeps their own lines. Only then are all words
+        wrapped together, balancing two-line results. Tags take no space and
+        are never split; tags open across a new break are closed and reopened.
+
+        Args:
+            text (str): Cue text
+
+        Returns:
+            List[str]: Lines (possibly more than max_lines)
+        """
+        lines = self._break(text)
+        return lines if lines == text.split('\n') else balance_tags(lines)
+
+    def _break(self, text: str) -> List[str]:
+        """Break text into lines as break_lines does, leaving markup as it falls."""
+        lines = text.split('\n')
+        limit = self.max_chars_per_line
+        if not limit or (len(lines) <= self.max_lines and all(visible_length(line) <= limit for line in lines)):
+            return lines
+
+        if len(lines) > 1:
+            rewrapped = [wrapped for block in self._blocks(lines) for wrapped in block]
+            if len(rewrapped) <= self.max_lines or self._is_dialogue(lines):
+                return rewrapped
+
+        wrapped = self._wrap(text)
+        if len(wrapped) == 2:
+            return self._balance(wrapped)
+        return wrapped
+
+    def _blocks(self, lines: List[str]) -> List[List[str]]:
+        """Wrap each existing line on its own."""
+        return [self._wrap(line) or [line] for line in lines]
+
+    @staticmethod
+    def _is_dialogue(lines: List[str]) -> bool:
+        """Return whether the lines hold more than one speaker's dash-prefixed turn."""
+        return sum(1 for line in lines if _TAG.sub('', line).startswith(_DIALOGUE_DASHES)) > 1
+
+    def _wrap(self, text: str) -> List[str]:
+        """Wrap the words of text greedily into lines of at most max_chars_per_line characters."""
+        wrapped = []
+        current = []
+        length = 0
+        for word in _WORD.findall(text):
+            size = visible_length(word)
+            if current and length + 1 + size > self.max_chars_per_line:
+                wrapped.append(' '.join(current))
+                current = [word]
+                length = size
+            else:
+                length += size + 1 if current else size
+                current.append(word)
+        if current:
+            wrapped.append(' '.join(current))
+        return wrapped
+
+    def _balance(self, lines: List[str]) -> List[str]:
+        """Move the break of a two-line cue to where the lines are closest in length."""
+        words = _WORD.findall(' '.join(lines))
+        total = sum(visible_length(word) for word in words) + len(words) - 1
+        best, best_width = None, None
+        left = -1
+        for i, word in enumerate(words[:-1]):
+            left += visible_length(word) + 1
+            width = max(left, total - left - 1)
+            if width <= self.max_chars_per_line and (best_width is None or width < best_width):
+                best, best_width = i + 1, width
+        if best is None:
+            return lines
+        return [' '.join(words[:best]), ' '.join(words[best:])]
+
+    def _split(self, cue: Dict) -> List[Dict]:
+        """Wrap a cue's text, splitting it into several cues of similar length beyond max_lines."""
+        lines = self._break(cue['text'])
+        if len(lines) <= self.max_lines:
+            text = '\n'.join(lines)
+            return [cue if text == cue['text'] else dict(cue, text='\n'.join(balance_tags(lines)))]
+
+        original = cue['text'].split('\n')
+        if self._is_dialogue(original):
+            # Split between speakers, keeping consecutive turns together while they fit
+            chunks = []
+            for block in self._blocks(original):
+                for i in range(0, len(block), self.max_lines):
+                    piece = block[i:i + self.max_lines]
+                    if chunks and len(chunks[-1]) + len(piece) <= self.max_lines:
+                        chunks[-1] = chunks[-1] + piece
+                    else:
+                        chunks.append(piece)
+        else:
+            # Cut the words into groups of similar length rather than filling
+            # cues greedily, which can leave a single word in the last cue
+            words = _WORD.findall(cue['text'])
+            count = math.ceil(len(lines) / self.max_lines)
+            while True:
+                groups = [self._break(' '.join(group)) for group in self._group(words, count)]
+                if count >= len(words) or all(len(group) <= self.max_lines for group in groups):
+                    break
+                count += 1
+            chunks = [group[i:i + self.max_lines] for group in groups for i in range(0, len(group), self.max_lines)]
+
+        # Each cue must carry its own markup, so tags open across a split are
+        # closed at its end and reopened in the next cue
+        balanced = iter(balance_tags([line for chunk in chunks for line in chunk]))
+        chunks = [[next(balanced) for _ in chunk] for chunk in chunks]
+
+        start_ms, end_ms = cue['start_ms'], cue['end_ms']
+        total = sum(visible_length(line) for chunk in chunks for line in chunk)
+        pieces = []
+        consumed = 0
+        piece_start = start_ms
+        for chunk in chunks:
+            consumed += sum(visible_length(line) for line in chunk)
+            piece_end = end_ms if consumed == total else start_ms + (end_ms - start_ms) * consumed // total
+            pieces.append(self._retimed(cue, piece_start, piece_end, '\n'.join(chunk)))
+            piece_start = piece_end
+        return pieces
+
+    @staticmethod
+    def _group(words: List[str], count: int) -> List[List[str]]:
+        """Cut words into count consecutive groups of similar length."""
+        total = sum(visible_length(word) + 1 for word in words)
+        groups = []
+        group = []
+        length = 0
+        for word in words:
+            group.append(word)
+            length += visible_length(word) + 1
+            if len(groups) < count - 1 and length * count >= total * (len(groups) + 1):
+                groups.append(group)
+                group = []
+        if group:
+            groups.append(group)
+        return groups
+
+    def _fit_reading_speed(self, cues: List[Dict]) -> List[Dict]:
+        """Extend fast cues into following gaps and merge them with neighbours."""
+        fitted = []
+        count = len(cues)
+        for i, cue in enumerate(cues):
+            next_start = cues[i + 1]['start_ms'] if i + 1 < count else None
+            cue = self._extend(cue, next_start)
+            merged = self._merge(fitted[-1], cue) if fitted else None
+            if merged is not None:
+                fitted[-1] = self._extend(merged, next_start)
+            else:
+                fitted.append(cue)
+        return fitted
+
+    def _extend(self, cue: Dict, next_start: Optional[int]) -> Dict:
+        """Lengthen a cue read faster than max_cps, up to the next cue and max_duration_ms."""
+        if self.reading_speed(cue) <= self.max_cps:
+            return cue
+        start_ms, end_ms = cue['start_ms'], cue['end_ms']
+        chars = visible_length(cue['text']) - cue['text'].count('\n')
+        new_end = start_ms + min(math.ceil(chars * 1000.0 / self.max_cps), self.max_duration_ms)
+        if next_start is not None:
+            new_end = min(new_end, next_start - self.min_gap_ms)
+        if new_end <= end_ms:
+            return cue
+        return self._retimed(cue, start_ms, new_end, cue['text'])
+
+    def _merge(self, previous: Dict, cue: Dict) -> Optional[Dict]:
+        """Merge two close cues when either is too fast and the merged cue fits and reads slower."""
+        if cue['start_ms'] - previous['end_ms'] > self.merge_gap_ms:
+            return None
+        if cue['end_ms'] - previous['start_ms'] > self.max_duration_ms:
+            return None
+        previous_speed = self.reading_speed(previous)
+        speed = self.reading_speed(cue)
+        if previous_speed <= self.max_cps and speed <= self.max_cps:
+            return None
+
+        lines = self.break_lines(previous['text'] + '\n' + cue['text'])
+        if len(lines) > self.max_lines:
+            return None
+        merged = self._retimed(previous, previous['start_ms'], max(previous['end_ms'], cue['end_ms']), '\n'.join(lines))
+        if self.reading_speed(merged) >= max(previous_speed, speed):
+            return None
+        return merged
+
+    @staticmethod
+    def _retimed(cue: Dict, start_ms: int, end_ms: int, text: str) -> Dict:
+        return dict(cue, start_ms=start_ms, end_ms=end_ms,
+                    start=format_timestamp(start_ms), end=format_timestamp(end_ms), text=text)
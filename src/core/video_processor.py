@@ -1,17 +1,69 @@
 import cv2
 import boto3
 import numpy as np
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 import ffmpeg
 import json
+import os
+import time
+import uuid
 from pathlib import Path
 
+from .metrics import span, timed, api_call, api_error
+from .frame_preprocessor import FramePreprocessor
+from .analysis_cache import AnalysisCache
+from .rate_limiter import RateLimiter, default_rate_limiter
+
 class VideoProcessor:
-    def __init__(self):
-        """Initialize the video processor with AWS Rekognition client."""
-        self.rekognition = boto3.client('rekognition')
-        self.transcribe = boto3.client('transcribe')
+    # Text detection backends: per-frame DetectText image calls, or one
+    # asynchronous StartTextDetection video job
+    TEXT_BACKENDS = ('auto', 'image', 'video')
+
+    def __init__(self, rekognition=None, transcribe=None, s3=None,
+                 text_backend: str = 'auto', video_backend_min_duration: float = 60.0,
+                 frame_preprocessor: Optional[FramePreprocessor] = None,
+                 analysis_cache: Optional[AnalysisCache] = None,
+                 rate_limiter: Optional[RateLimiter] = None):
+        """
+        Initialize the video processor with AWS Rekognition client.
+
+        Args:
+            rekognition: Rekognition client (created with boto3 when omitted)
+            transcribe: Transcribe client (created with boto3 when omitted)
+            s3: S3 client used to stage videos for video jobs (created with boto3 when omitted)
+            text_backend (str): 'image', 'video', or 'auto' to choose by duration
+            video_backend_min_duration (float): Duration in seconds from which
+                'auto' switches to the video job backend
+            frame_preprocessor (Optional[FramePreprocessor]): Downscale, crop and
+                encode settings for frames sent to DetectText
+            analysis_cache (Optional[AnalysisCache]): Sidecar store used to reuse
+                analysis results across runs (None disables caching)
+            rate_limiter (Optional[RateLimiter]): Scheduler every AWS call goes
+                through (defaults to the process-wide limiter)
+        """
+        if text_backend not in self.TEXT_BACKENDS:
+            raise ValueError(f"Unknown text detection backend: {text_backend}")
+        self.rekognition = rekognition or boto3.client('rekognition')
+        self.transcribe = transcribe or boto3.client('transcribe')
+        self._s3 = s3
+        self.bucket_name = os.getenv('AWS_S3_BUCKET', 'subtitle-processor-bucket')
+        self.text_backend = text_backend
+        self.video_backend_min_duration = video_backend_min_duration
+        self.frame_preprocessor = frame_preprocessor or FramePreprocessor()
+        self.analysis_cache = analysis_cache
+        self.rate_limiter = rate_limiter or default_rate_limiter()
+
+        # Seconds between Rekognition video job status checks
+        self.poll_interval = 5
+
+    @property
+    def s3(self):
+        """S3 client, created on first use since only video jobs need it."""
+        if self._s3 is None:
+            self._s3 = boto3.client('s3')
+        return self._s3
 
+    @timed('video.process')
     def process_video(self, video_path: str, subtitle_path: str = None) -> Dict:
         """
         Process video file to extract information for subtitle positioning and timing.
@@ -24,11 +76,22 @@ class VideoProcessor:
             Dict: Video analysis results
         """
         try:
+            cache_key = None
+            if self.analysis_cache is not None:
+                cache_key = self.analysis_cache.key(video_path, self.analysis_settings(not subtitle_path))
+                cached = self.analysis_cache.load(cache_key)
+                if cached is not None:
+                    return cached
+
             # Extract video metadata
             metadata = self._extract_metadata(video_path)
             
             # Analyze video frames for text regions
-            text_regions = self._analyze_text_regions(video_path)
+            duration = metadata['duration'] if metadata else None
+            if self._select_text_backend(duration) == 'video':
+                text_regions = self._analyze_text_regions_video_job(video_path)
+            else:
+                text_regions = self._analyze_text_regions(video_path)
             
             # Generate speech timestamps if no subtitle file
             if not subtitle_path:
@@ -36,15 +99,46 @@ class VideoProcessor:
             else:
                 speech_timestamps = None
 
-            return {
+            analysis = {
                 'metadata': metadata,
                 'text_regions': text_regions,
                 'speech_timestamps': speech_timestamps
             }
+
+            # Only complete results are worth reusing
+            if cache_key is not None and metadata is not None and (subtitle_path or speech_timestamps is not None):
+                try:
+                    self.analysis_cache.store(cache_key, analysis)
+                except Exception as e:
+                    print(f"Error caching video analysis: {str(e)}")
+
+            return analysis
         except Exception as e:
             print(f"Error processing video: {str(e)}")
             return None
 
+    def analysis_settings(self, with_speech: bool) -> Dict:
+        """
+        Describe the settings that affect analysis results, for cache keys.
+
+        Args:
+            with_speech (bool): Whether speech timestamps are generated
+
+        Returns:
+            Dict: JSON-serializable analyzer settings
+        """
+        preprocessor = self.frame_preprocessor
+        return {
+            'text_backend': self.text_backend,
+            'video_backend_min_duration': self.video_backend_min_duration,
+            'max_dimension': preprocessor.max_dimension,
+            'grayscale': preprocessor.grayscale,
+            'jpeg_quality': preprocessor.jpeg_quality,
+            'roi_bands': preprocessor.roi_bands,
+            'speech_timestamps': with_speech
+        }
+
+    @timed('video.metadata')
     def _extract_metadata(self, video_path: str) -> Dict:
         """
         Extract video metadata using ffmpeg.
@@ -69,6 +163,7 @@ class VideoProcessor:
             print(f"Error extracting metadata: {str(e)}")
             return None
 
+    @timed('video.text_regions')
     def _analyze_text_regions(self, video_path: str) -> List[Dict]:
         """
         Analyze video frames to detect text regions using AWS Rekognition.
@@ -84,31 +179,42 @@ class VideoProcessor:
         
         try:
             while cap.isOpened():
-                ret, frame = cap.read()
+                with span('video.frame_decode'):
+                    ret, frame = cap.read()
                 if not ret:
                     break
 
                 timestamp = cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
                 
-                # Convert frame to bytes
-                _, buffer = cv2.imencode('.jpg', frame)
-                frame_bytes = buffer.tobytes()
+                # Downscale, crop and encode frame
+                frame_bytes, layout = self.frame_preprocessor.prepare(frame)
 
                 # Detect text in frame using Rekognition
-                response = self.rekognition.detect_text(Image={'Bytes': frame_bytes})
+                api_call('rekognition', 'detect_text')
+                with span('video.rekognition_detect_text'):
+                    try:
+                        response = self.rate_limiter.call('rekognition.detect_text', self.rekognition.detect_text,
+                                                          Image={'Bytes': frame_bytes})
+                    except Exception:
+                        api_error('rekognition', 'detect_text')
+                        raise
                 
                 if response['TextDetections']:
-                    text_regions.append({
-                        'timestamp': timestamp,
-                        'regions': [
-                            {
+                    regions = []
+                    for detection in response['TextDetections']:
+                        if detection['Type'] != 'LINE':
+                            continue
+                        # Map back to full-frame normalized coordinates
+                        bbox = self.frame_preprocessor.map_bbox(detection['Geometry']['BoundingBox'], layout)
+                        if bbox is not None:
+                            regions.append({
                                 'text': detection['DetectedText'],
                                 'confidence': detection['Confidence'],
-                                'bbox': detection['Geometry']['BoundingBox']
-                            }
-                            for detection in response['TextDetections']
-                            if detection['Type'] == 'LINE'
-                        ]
+                                'bbox': bbox
+                            })
+                    text_regions.append({
+                        'timestamp': timestamp,
+                        'regions': regions
                     })
 
         finally:
@@ -116,6 +222,118 @@ class VideoProcessor:
 
         return text_regions
 
+    def _select_text_backend(self, duration: Optional[float]) -> str:
+        """
+        Choose the text detection backend for a video.
+
+        Args:
+            duration (Optional[float]): Video duration in seconds, if known
+
+        Returns:
+            str: 'image' or 'video'
+        """
+        if self.text_backend != 'auto':
+            return self.text_backend
+        if duration is not None and duration >= self.video_backend_min_duration:
+            return 'video'
+        return 'image'
+
+    @timed('video.text_regions_video_job')
+    def _analyze_text_regions_video_job(self, video_path: str) -> List[Dict]:
+        """
+        Detect text regions with a single Rekognition video text detection job.
+
+        The video is uploaded to S3 once, StartTextDetection is started and
+        GetTextDetection is polled until the job finishes, then all result
+        pages are collected and grouped by timestamp.
+
+        Args:
+            video_path (str): Path to video file
+
+        Returns:
+            List[Dict]: List of detected text regions with timestamps, in the
+            same structure as _analyze_text_regions
+        """
+        s3_key = f"video/{uuid.uuid4().hex}_{Path(video_path).name}"
+        uploaded = False
+        try:
+            api_call('s3', 'upload_file')
+            with span('video.s3_upload'):
+                self.rate_limiter.call('s3.upload_file', self.s3.upload_file,
+                                       video_path, self.bucket_name, s3_key)
+            uploaded = True
+
+            api_call('rekognition', 'start_text_detection')
+            job = self.rate_limiter.call(
+                'rekognition.start_text_detection',
+                self.rekognition.start_text_detection,
+                Video={'S3Object': {'Bucket': self.bucket_name, 'Name': s3_key}}
+            )
+            job_id = job['JobId']
+
+            # Wait for completion; the final status response is also the first page
+            with span('video.text_detection_poll'):
+                while True:
+                    api_call('rekognition', 'get_text_detection')
+                    page = self.rate_limiter.call('rekognition.get_text_detection',
+                                                  self.rekognition.get_text_detection,
+                                                  JobId=job_id, MaxResults=1000)
+                    if page['JobStatus'] != 'IN_PROGRESS':
+                        break
+                    time.sleep(self.poll_interval)
+
+            if page['JobStatus'] != 'SUCCEEDED':
+                api_error('rekognition', 'get_text_detection')
+                raise Exception(f"Text detection job failed: {page.get('StatusMessage', page['JobStatus'])}")
+
+            detections = list(page.get('TextDetections', []))
+            while page.get('NextToken'):
+                api_call('rekognition', 'get_text_detection')
+                page = self.rate_limiter.call(
+                    'rekognition.get_text_detection',
+                    self.rekognition.get_text_detection,
+                    JobId=job_id, MaxResults=1000, NextToken=page['NextToken']
+                )
+                detections.extend(page.get('TextDetections', []))
+
+            return self._group_video_text_detections(detections)
+
+        finally:
+            if uploaded:
+                try:
+                    api_call('s3', 'delete_object')
+                    self.rate_limiter.call('s3.delete_object', self.s3.delete_object,
+                                           Bucket=self.bucket_name, Key=s3_key)
+                except Exception:
+                    pass
+
+    def _group_video_text_detections(self, detections: List[Dict]) -> List[Dict]:
+        """
+        Group GetTextDetection results into per-timestamp text regions.
+
+        Args:
+            detections (List[Dict]): TextDetections entries from all result pages
+
+        Returns:
+            List[Dict]: Text regions sorted by timestamp in seconds
+        """
+        by_timestamp = {}
+        for item in detections:
+            detection = item['TextDetection']
+            if detection['Type'] != 'LINE':
+                continue
+            by_timestamp.setdefault(item['Timestamp'], []).append({
+                'text': detection['DetectedText'],
+                'confidence': detection['Confidence'],
+                'bbox': detection['Geometry']['BoundingBox']
+            })
+
+        return [
+            {'timestamp': timestamp / 1000.0, 'regions': regions}
+            for timestamp, regions in sorted(by_timestamp.items())
+        ]
+
+    @timed('video.speech_timestamps')
     def _generate_speech_timestamps(self, video_path: str) -> List[Dict]:
         """
         Generate speech timestamps using AWS Transcribe.
@@ -143,6 +361,7 @@ class VideoProcessor:
             print(f"Error generating speech timestamps: {str(e)}")
             return None
 
+    @timed('video.extract_audio')
     def _extract_audio(self, video_path: str) -> str:
         """
         Extract audio from video file using ffmpeg.
@@ -1,16 +1,26 @@
 from fastapi import FastAPI, File, UploadFile, HTTPException, Request
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from fastapi.responses import FileResponse, HTMLResponse
+from fastapi.responses import HTMLResponse, PlainTextResponse, Response
+from fastapi.concurrency import run_in_threadpool
 from pathlib import Path
+import asyncio
 import uvicorn
 import tempfile
 import os
 import shutil
+import hashlib
+import secrets
 from typing import Optional
 
 from ..core.subtitle_processor import SubtitleProcessor
 from ..core.video_processor import VideoProcessor
+from ..core.analysis_cache import AnalysisCache
+from ..core.frame_preprocessor import FramePreprocessor, REDUCED
+from ..core.subtitle_formats import MEDIA_TYPES, format_for_path
+from ..core.metrics import REGISTRY, span
+from ..core.rate_limiter import priority, INTERACTIVE
+from ..core.result_cache import ResultCache, RequestCoalescer, MISS
 
 app = FastAPI(title="Subtitle Enhancement System")
 
@@ -22,7 +32,60 @@ templates = Jinja2Templates(directory=str(templates_path))
 
 # Initialize processors
 subtitle_processor = SubtitleProcessor()
-video_processor = VideoProcessor()
+# SUBTITLE_FRAME_PREPROCESS=1 sends smaller grayscale frames to text detection
+video_processor = VideoProcessor(
+    analysis_cache=AnalysisCache(),
+    frame_preprocessor=FramePreprocessor(**REDUCED) if os.getenv('SUBTITLE_FRAME_PREPROCESS', '0') == '1' else None)
+
+# Identical uploads share one computation; finished results are cached on disk
+# (SUBTITLE_RESULT_CACHE=0 keeps only the in-flight sharing)
+result_cache = ResultCache() if os.getenv('SUBTITLE_RESULT_CACHE', '1') != '0' else None
+coalescer = RequestCoalescer(result_cache)
+# Incremental requests depend on per-session state and bypass the result cache
+incremental_coalescer = RequestCoalescer()
+
+# Incremental processing state, one file per client session and uploaded
+# subtitle name; the session is a random id kept in a cookie
+state_dir = Path(os.getenv(
+    'SUBTITLE_STATE_DIR',
+    str(Path(os.getenv('SUBTITLE_CACHE_DIR', str(Path.home() / '.cache' / 'subtitle-processor'))) / 'state')
+))
+SESSION_COOKIE = 'subtitle_session'
+
+def _state_path(session: str, filename: str) -> Path:
+    """Return the incremental state file for a client session's uploaded subtitle file name."""
+    digest = hashlib.blake2b(f"{session}\0{filename}".encode('utf-8'), digest_size=16).hexdigest()
+    return state_dir / f"{digest}.json"
+
+def _upload_digest(upload: UploadFile) -> str:
+    """Hash an uploaded file's content and rewind it for saving."""
+    digest = hashlib.blake2b(digest_size=20)
+    for block in iter(lambda: upload.file.read(1 << 20), b''):
+        digest.update(block)
+    upload.file.seek(0)
+    return digest.hexdigest()
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Return whether an If-None-Match header matches an ETag (weak comparison)."""
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(',')]
+    return '*' in tags or etag in (tag[2:] if tag.startswith('W/') else tag for tag in tags)
+
+def _result_response(request: Request, result: dict, status: str, filename: str,
+                     headers: Optional[dict] = None) -> Response:
+    """
+    Return a processing result as an attachment download, or 304 Not Modified
+    when the client already holds it.
+    """
+    headers = {"ETag": result['etag'], "X-Cache": status, **result['headers'], **(headers or {})}
+    if _etag_matches(request.headers.get('if-none-match'), result['etag']):
+        return Response(status_code=304, headers=headers)
+    return Response(
+        content=result['body'],
+        media_type=result['media_type'],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"', **headers}
+    )
 
 @app.get("/", response_class=HTMLResponse)
 async def home(request: Request):
@@ -31,82 +94,151 @@ async def home(request: Request):
 
 @app.post("/api/process-subtitle")
 async def process_subtitle(
+    request: Request,
     subtitle_file: UploadFile = File(...),
-    video_file: Optional[UploadFile] = File(None)
+    video_file: Optional[UploadFile] = File(None),
+    incremental: bool = False,
+    language: Optional[str] = None
 ):
-    """Process a subtitle file with optional video analysis."""
+    """
+    Process a subtitle file with optional video analysis.
+
+    With incremental=true, only cues that changed since the same client's
+    last upload with the same file name are re-processed; clients are told
+    apart by a session cookie, set on first use. The grammar checking language
+    is detected from the cues unless given.
+
+    Identical uploads (same content, options and processing settings) share
+    one computation and, unless incremental, are answered from the result
+    cache afterwards; responses carry an ETag and honour If-None-Match.
+    """
     try:
-        with tempfile.TemporaryDirectory() as temp_dir:
-            # Save uploaded files
-            subtitle_path = Path(temp_dir) / subtitle_file.filename
-            with open(subtitle_path, "wb") as f:
-                shutil.copyfileobj(subtitle_file.file, f)
-            
-            video_path = None
-            if video_file:
-                video_path = Path(temp_dir) / video_file.filename
-                with open(video_path, "wb") as f:
-                    shutil.copyfileobj(video_file.file, f)
-            
-            # Process video if provided
-            if video_path:
-                video_analysis = video_processor.process_video(str(video_path), str(subtitle_path))
-                if not video_analysis:
-                    raise HTTPException(status_code=400, detail="Video analysis failed")
-            
-            # Process subtitles
-            output_path = Path(temp_dir) / f"enhanced_{subtitle_file.filename}"
-            success = subtitle_processor.process_subtitle_file(str(subtitle_path), str(output_path))
-            
-            if not success:
-                raise HTTPException(status_code=400, detail="Subtitle processing failed")
-            
-            return FileResponse(
-                output_path,
-                media_type="text/vtt",
-                filename=f"enhanced_{subtitle_file.filename}"
+        with span('web.process_subtitle'), priority(INTERACTIVE):
+            output_name = f"enhanced_{subtitle_file.filename}"
+            session = request.cookies.get(SESSION_COOKIE) or secrets.token_urlsafe(16)
+            output_format = format_for_path(output_name, 'vtt')
+            # Hash off the event loop: large videos would stall every other request
+            digests = [await run_in_threadpool(_upload_digest, subtitle_file),
+                       await run_in_threadpool(_upload_digest, video_file) if video_file else None]
+            key = ResultCache.key(
+                'process-subtitle',
+                digests,
+                {
+                    'format': output_format,
+                    'subtitle': subtitle_processor.settings(language),
+                    'video': video_processor.analysis_settings(with_speech=False) if video_file else None,
+                    # Incremental runs read and write the session's state, so
+                    # they are only shared within the session and never cached
+                    'session': session if incremental else None
+                }
             )
+
+            def compute() -> dict:
+                with tempfile.TemporaryDirectory() as temp_dir:
+                    # Save uploaded files
+                    subtitle_path = Path(temp_dir) / subtitle_file.filename
+                    with open(subtitle_path, "wb") as f:
+                        shutil.copyfileobj(subtitle_file.file, f)
+                    
+                    video_path = None
+                    if video_file:
+                        video_path = Path(temp_dir) / video_file.filename
+                        with open(video_path, "wb") as f:
+                            shutil.copyfileobj(video_file.file, f)
+                    
+                    # Process video if provided
+                    if video_path:
+                        video_analysis = video_processor.process_video(str(video_path), str(subtitle_path))
+                        if not video_analysis:
+                            raise HTTPException(status_code=400, detail="Video analysis failed")
+                    
+                    # Process subtitles
+                    output_path = Path(temp_dir) / output_name
+                    state_path = str(_state_path(session, subtitle_file.filename)) if incremental else None
+                    result = subtitle_processor.process_subtitle_file_incremental(
+                        str(subtitle_path), str(output_path), state_path, language
+                    )
+                    
+                    if not result:
+                        raise HTTPException(status_code=400, detail="Subtitle processing failed")
+                    
+                    # Read the result before the temporary directory is removed
+                    return {
+                        'body': output_path.read_bytes(),
+                        'media_type': MEDIA_TYPES[output_format],
+                        'headers': {"X-Cues-Total": str(result['cues']),
+                                    "X-Cues-Reprocessed": str(result['reprocessed'])}
+                    }
+
+            future, status = (incremental_coalescer if incremental else coalescer).submit(key, compute)
+            # A client that disconnects must not cancel the work other requests share
+            result = await asyncio.shield(asyncio.wrap_future(future))
+            # Only the request that ran the computation re-processed any cues
+            response = _result_response(request, result, status, output_name,
+                                        None if status == MISS else {"X-Cues-Reprocessed": "0"})
+            if incremental and SESSION_COOKIE not in request.cookies:
+                response.set_cookie(SESSION_COOKIE, session, httponly=True, samesite='strict')
+            return response
             
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/generate-subtitle")
 async def generate_subtitle(
+    request: Request,
     video_file: UploadFile = File(...),
     language: str = "en-US"
 ):
-    """Generate subtitles from a video file."""
+    """
+    Generate subtitles from a video file.
+
+    Identical uploads share one computation and are answered from the
+    result cache afterwards (see process_subtitle).
+    """
     try:
-        with tempfile.TemporaryDirectory() as temp_dir:
-            # Save uploaded video
-            video_path = Path(temp_dir) / video_file.filename
-            with open(video_path, "wb") as f:
-                shutil.copyfileobj(video_file.file, f)
-            
-            # Process video
-            video_analysis = video_processor.process_video(str(video_path))
-            if not video_analysis:
-                raise HTTPException(status_code=400, detail="Video analysis failed")
-            
-            if not video_analysis.get('speech_timestamps'):
-                raise HTTPException(status_code=400, detail="No speech detected in video")
-            
-            # Generate subtitles
-            output_path = Path(temp_dir) / f"{video_file.filename}.vtt"
-            success = subtitle_processor.process_subtitle_file(
-                video_analysis['speech_timestamps'],
-                str(output_path)
-            )
-            
-            if not success:
-                raise HTTPException(status_code=400, detail="Subtitle generation failed")
-            
-            return FileResponse(
-                output_path,
-                media_type="text/vtt",
-                filename=f"{Path(video_file.filename).stem}.vtt"
-            )
+        with span('web.generate_subtitle'), priority(INTERACTIVE):
+            digest = await run_in_threadpool(_upload_digest, video_file)
+            key = ResultCache.key('generate-subtitle', [digest], {
+                'subtitle': subtitle_processor.settings(language),
+                'video': video_processor.analysis_settings(with_speech=True)
+            })
+
+            def compute() -> dict:
+                with tempfile.TemporaryDirectory() as temp_dir:
+                    # Save uploaded video
+                    video_path = Path(temp_dir) / video_file.filename
+                    with open(video_path, "wb") as f:
+                        shutil.copyfileobj(video_file.file, f)
+                    
+                    # Process video
+                    video_analysis = video_processor.process_video(str(video_path))
+                    if not video_analysis:
+                        raise HTTPException(status_code=400, detail="Video analysis failed")
+                    
+                    if not video_analysis.get('speech_timestamps'):
+                        raise HTTPException(status_code=400, detail="No speech detected in video")
+                    
+                    # Generate subtitles
+                    output_path = Path(temp_dir) / f"{video_file.filename}.vtt"
+                    success = subtitle_processor.process_subtitle_file(
+                        video_analysis['speech_timestamps'],
+                        str(output_path),
+                        language=language
+                    )
+                    
+                    if not success:
+                        raise HTTPException(status_code=400, detail="Subtitle generation failed")
+                    
+                    return {'body': output_path.read_bytes(), 'media_type': "text/vtt"}
+
+            future, status = coalescer.submit(key, compute)
+            result = await asyncio.shield(asyncio.wrap_future(future))
+            return _result_response(request, result, status, f"{Path(video_file.filename).stem}.vtt")
             
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -115,6 +247,11 @@ async def health_check():
     """Health check endpoint."""
     return {"status": "healthy"}
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Expose per-stage timings and API counters in Prometheus text format."""
+    return PlainTextResponse(REGISTRY.render_prometheus(), media_type="text/plain; version=0.0.4")
+
 def run_server():
     """Run the FastAPI server."""
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,69 @@
+import pytest
+import threading
+import time
+from src.core.subtitle_processor import SubtitleProcessor
+
+class StubServer:
+    """Stand-in for the LanguageTool server subprocess."""
+
+    def __init__(self, pid=None):
+        self.pid = pid
+        self.returncode = None
+
+    def poll(self):
+        return self.returncode
+
+class StubLanguageTool:
+    """LanguageTool stand-in that finds no issues, recording its checks and how many run at once."""
+
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def __init__(self, language='en-US', pid=None, latency=0.0, failures=0):
+        self.language = language
+        self.latency = latency
+        self.failures = failures
+        self.checked = []
+        self.closed = False
+        self._server = StubServer(pid)
+
+    def check(self, text):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("server went away")
+        with StubLanguageTool.lock:
+            StubLanguageTool.active += 1
+            StubLanguageTool.peak = max(StubLanguageTool.peak, StubLanguageTool.active)
+        time.sleep(self.latency)
+        with StubLanguageTool.lock:
+            StubLanguageTool.active -= 1
+        self.checked.append(text)
+        return []
+
+    def close(self):
+        self.closed = True
+
+@pytest.fixture
+def language_tool():
+    return StubLanguageTool()
+
+@pytest.fixture
+def subtitle_processor(language_tool):
+    """Create a SubtitleProcessor with local stand-ins for its clients."""
+    return SubtitleProcessor(language_tool=language_tool, transcribe=object(),
+                             translate=object(), rekognition=object())
+
+@pytest.fixture
+def started():
+    return []
+
+@pytest.fixture
+def factory(started):
+    """LanguageToolPool factory creating stand-in servers, collected in started."""
+    def create(language, **kwargs):
+        tool = StubLanguageTool(language, **kwargs)
+        started.append(tool)
+        return tool
+    StubLanguageTool.active = StubLanguageTool.peak = 0
+    return create
@@ -0,0 +1,99 @@
+import pytest
+import numpy as np
+from src.core.analysis_cache import AnalysisCache, LazyTextRegions
+from src.core.frame_preprocessor import FramePreprocessor
+from src.core.video_processor import VideoProcessor
+from src.core.metrics import REGISTRY
+
+@pytest.fixture
+def analysis():
+    return {
+        'metadata': {'width': 1920, 'height': 1080, 'duration': 2.0, 'fps': 30.0},
+        'text_regions': [
+            {'timestamp': 0.0, 'regions': [
+                {'text': 'Introduction', 'confidence': 99.0,
+                 'bbox': {'Left': 0.4, 'Top': 0.05, 'Width': 0.2, 'Height': 0.05}},
+                {'text': 'Café ☕', 'confidence': 87.5,
+                 'bbox': {'Left': 0.1, 'Top': 0.8, 'Width': 0.3, 'Height': 0.05}}
+            ]},
+            {'timestamp': 0.5, 'regions': []},
+            {'timestamp': 1.5, 'regions': [
+                {'text': 'Outro', 'confidence': 95.0,
+                 'bbox': {'Left': 0.25, 'Top': 0.9, 'Width': 0.5, 'Height': 0.04}}
+            ]}
+        ],
+        'speech_timestamps': None
+    }
+
+@pytest.fixture
+def video_file(tmp_path):
+    path = tmp_path / "video.mp4"
+    path.write_bytes(b'not really a video' * 100)
+    return path
+
+def test_round_trip(tmp_path, analysis):
+    """Test stored analyses load back equal, with memory-mapped columns."""
+    cache = AnalysisCache(str(tmp_path / "cache"))
+    cache.store('key', analysis)
+    loaded = cache.load('key')
+
+    assert loaded['metadata'] == analysis['metadata']
+    assert loaded['speech_timestamps'] is None
+    assert isinstance(loaded['text_regions'], LazyTextRegions)
+    assert isinstance(loaded['text_regions']._bboxes, np.memmap)
+    assert len(loaded['text_regions']) == 3
+
+    for got, expected in zip(loaded['text_regions'], analysis['text_regions']):
+        assert got['timestamp'] == expected['timestamp']
+        assert [r['text'] for r in got['regions']] == [r['text'] for r in expected['regions']]
+        for got_region, expected_region in zip(got['regions'], expected['regions']):
+            assert got_region['confidence'] == pytest.approx(expected_region['confidence'])
+            for side, value in expected_region['bbox'].items():
+                assert got_region['bbox'][side] == pytest.approx(value)
+
+    assert loaded['text_regions'][-1]['regions'][0]['text'] == 'Outro'
+    assert [r['timestamp'] for r in loaded['text_regions'][1:]] == [0.5, 1.5]
+
+def test_missing_and_empty_entries(tmp_path, analysis):
+    """Test misses return None and analyses without regions round-trip."""
+    cache = AnalysisCache(str(tmp_path / "cache"))
+    assert cache.load('absent') is None
+
+    cache.store('empty', dict(analysis, text_regions=[], speech_timestamps=[]))
+    loaded = cache.load('empty')
+    assert len(loaded['text_regions']) == 0
+    assert loaded['speech_timestamps'] == []
+
+def test_key_depends_on_content_and_settings(tmp_path, video_file):
+    """Test keys change with file content or analyzer settings."""
+    cache = AnalysisCache(str(tmp_path / "cache"))
+    key = cache.key(str(video_file), {'jpeg_quality': 80})
+
+    assert cache.key(str(video_file), {'jpeg_quality': 80}) == key
+    assert cache.key(str(video_file), {'jpeg_quality': 60}) != key
+
+    video_file.write_bytes(b'edited')
+    assert cache.key(str(video_file), {'jpeg_quality': 80}) != key
+
+def test_process_video_reuses_cached_analysis(tmp_path, analysis, video_file):
+    """Test a second run loads the sidecar instead of analyzing the video again."""
+    calls = []
+    processor = VideoProcessor(rekognition=object(), transcribe=object(), text_backend='image',
+                               analysis_cache=AnalysisCache(str(tmp_path / "cache")))
+    processor._extract_metadata = lambda path: calls.append('metadata') or analysis['metadata']
+    processor._analyze_text_regions = lambda path: calls.append('text') or analysis['text_regions']
+
+    REGISTRY.reset()
+    first = processor.process_video(str(video_file), 'input.vtt')
+    second = processor.process_video(str(video_file), 'input.vtt')
+
+    assert calls == ['metadata', 'text']
+    assert first['text_regions'] is analysis['text_regions']
+    assert isinstance(second['text_regions'], LazyTextRegions)
+    assert [p['timestamp'] for p in processor.get_optimal_subtitle_positions(second)] == [0.0, 0.5, 1.5]
+    assert REGISTRY.counters['subtitle_cache_hits_total'][(('cache', 'video_analysis'),)] == 1
+
+    # Different preprocessing settings miss the cache
+    processor.frame_preprocessor = FramePreprocessor(jpeg_quality=50)
+    processor.process_video(str(video_file), 'input.vtt')
+    assert calls == ['metadata', 'text', 'metadata', 'text']
@@ -0,0 +1,170 @@
+import pytest
+import wave
+import numpy as np
+from pathlib import Path
+from src.core.audio_chunker import AudioChunker
+
+RATE = 16000
+
+@pytest.fixture
+def speech_wav(tmp_path):
+    """Create a 40 second WAV with tone 'speech' and silent gaps at 9-11s, 19-21s and 29-31s."""
+    t = np.arange(40 * RATE) / RATE
+    samples = (8000 * np.sin(2 * np.pi * 220 * t)).astype(np.int16)
+    for gap_start in (9, 19, 29):
+        samples[gap_start * RATE:(gap_start + 2) * RATE] = 0
+
+    path = tmp_path / "speech.wav"
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(RATE)
+        wav.writeframes(samples.tobytes())
+    return path
+
+def test_split_at_silence(speech_wav, tmp_path):
+    """Test that chunk boundaries land inside the silent gaps."""
+    chunker = AudioChunker(search_window=3.0, overlap=1.0, block_duration=5.0)
+    chunks = chunker.split(str(speech_wav), 4, str(tmp_path))
+
+    assert len(chunks) == 4
+    for chunk, gap_start in zip(chunks[1:], (9, 19, 29)):
+        assert gap_start <= chunk['core_start'] <= gap_start + 2
+        assert chunk['offset'] == pytest.approx(chunk['core_start'] - 1.0)
+
+    # Chunk files cover their core range plus the overlap
+    with wave.open(chunks[1]['path'], "rb") as wav:
+        duration = wav.getnframes() / wav.getframerate()
+    assert duration == pytest.approx(chunks[1]['core_end'] - chunks[1]['core_start'] + 2.0, abs=0.01)
+
+def test_merge_transcripts_offsets_and_dedup():
+    """Test offset correction and removal of duplicate segments in the overlap."""
+    chunker = AudioChunker(overlap=2.0)
+    chunks = [
+        {'index': 0, 'offset': 0.0, 'core_start': 0.0, 'core_end': 10.0},
+        {'index': 1, 'offset': 8.0, 'core_start': 10.0, 'core_end': 20.0},
+    ]
+    results = [
+        {'segments': [
+            {'start_time': 1.0, 'end_time': 4.0, 'speaker': 'spk_0', 'text': 'First.'},
+            {'start_time': 10.5, 'end_time': 11.5, 'speaker': 'spk_1', 'text': 'Edge.'},
+        ], 'language_code': 'en-US', 'duration': 12.0},
+        {'segments': [
+            {'start_time': 2.5, 'end_time': 3.5, 'speaker': 'spk_0', 'text': 'Edge.'},
+            {'start_time': 5.0, 'end_time': 8.0, 'speaker': 'spk_1', 'text': 'Second.'},
+        ], 'language_code': 'en-US', 'duration': 12.0},
+    ]
+
+    merged = chunker.merge_transcripts(chunks, results)
+
+    assert [s['text'] for s in merged['segments']] == ['First.', 'Edge.', 'Second.']
+    assert merged['segments'][1]['start_time'] == pytest.approx(10.5)
+    assert merged['segments'][2]['start_time'] == pytest.approx(13.0)
+    assert merged['duration'] == 20.0
+    assert merged['language_code'] == 'en-US'
+
+def test_speaker_reconciliation():
+    """Test that speaker labels are matched across chunks through the overlap."""
+    chunker = AudioChunker(overlap=2.0)
+    chunks = [
+        {'index': 0, 'offset': 0.0, 'core_start': 0.0, 'core_end': 10.0},
+        {'index': 1, 'offset': 8.0, 'core_start': 10.0, 'core_end': 20.0},
+    ]
+    results = [
+        {'segments': [
+            {'start_time': 1.0, 'end_time': 4.0, 'speaker': 'spk_0', 'text': 'Alice.'},
+            {'start_time': 8.5, 'end_time': 11.0, 'speaker': 'spk_1', 'text': 'Bob.'},
+        ], 'language_code': 'en-US', 'duration': 12.0},
+        {'segments': [
+            # Local spk_0 in the second chunk is Bob, heard in the overlap
+            {'start_time': 0.5, 'end_time': 3.0, 'speaker': 'spk_0', 'text': 'Bob.'},
+            {'start_time': 5.0, 'end_time': 7.0, 'speaker': 'spk_0', 'text': 'Bob again.'},
+            {'start_time': 8.0, 'end_time': 9.0, 'speaker': 'spk_1', 'text': 'Carol.'},
+        ], 'language_code': 'en-US', 'duration': 12.0},
+    ]
+
+    merged = chunker.merge_transcripts(chunks, results)
+    speakers = {s['text']: s['speaker'] for s in merged['segments']}
+
+    assert speakers['Alice.'] == 'spk_0'
+    assert speakers['Bob.'] == 'spk_1'
+    assert speakers['Bob again.'] == 'spk_1'
+    assert speakers['Carol.'] not in ('spk_0', 'spk_1')
+
+def test_merge_skips_failed_chunks():
+    """Test that a failed chunk does not break the merged transcript."""
+    chunker = AudioChunker()
+    chunks = [
+        {'index': 0, 'offset': 0.0, 'core_start': 0.0, 'core_end': 10.0},
+        {'index': 1, 'offset': 8.0, 'core_start': 10.0, 'core_end': 20.0},
+    ]
+    results = [None, {'segments': [
+        {'start_time': 5.0, 'end_time': 6.0, 'speaker': None, 'text': 'Only.'}
+    ], 'language_code': 'en-US', 'duration': 12.0}]
+
+    merged = chunker.merge_transcripts(chunks, results)
+    assert [s['text'] for s in merged['segments']] == ['Only.']
+
+def test_chunked_transcription_retries_then_fails(speech_wav, tmp_path, monkeypatch):
+    """Test a failed chunk is retried once and a chunk that keeps failing fails the whole call."""
+    import boto3
+    from src.core.aws_services import AWSServices
+    from src.core.rate_limiter import RateLimiter
+
+    monkeypatch.setattr(boto3, 'client', lambda *args, **kwargs: object())
+    services = AWSServices(rate_limiter=RateLimiter(db_path=str(tmp_path / "limits.sqlite"), limits={}))
+    attempts = {}
+    always_fail = False
+
+    def transcribe_audio(path, language_code):
+        attempts[path] = attempts.get(path, 0) + 1
+        if path.endswith('chunk001.wav') and (attempts[path] == 1 or always_fail):
+            return None
+        return {'segments': [], 'language_code': language_code, 'duration': 10.0}
+
+    monkeypatch.setattr(services, 'transcribe_audio', transcribe_audio)
+    result = services.transcribe_audio_chunked(str(speech_wav), num_chunks=4)
+    assert result is not None
+    assert sorted(attempts.values()) == [1, 1, 1, 2]
+
+    always_fail = True
+    attempts.clear()
+    assert services.transcribe_audio_chunked(str(speech_wav), num_chunks=4) is None
+
+class RecordingS3:
+    """S3 stand-in recording uploaded and deleted keys."""
+
+    def __init__(self):
+        self.uploaded = []
+        self.deleted = []
+
+    def upload_file(self, path, bucket, key):
+        self.uploaded.append(key)
+
+    def delete_object(self, Bucket, Key):
+        self.deleted.append(Key)
+
+class FailingTranscribe:
+    """Transcribe stand-in whose jobs fail straight away."""
+
+    def start_transcription_job(self, **kwargs):
+        pass
+
+    def get_transcription_job(self, TranscriptionJobName):
+        return {'TranscriptionJob': {'TranscriptionJobStatus': 'FAILED'}}
+
+def test_audio_uploads_use_unique_keys(speech_wav, tmp_path, monkeypatch):
+    """Test uploads of files with the same name go to distinct S3 keys, each cleaned up."""
+    import boto3
+    from src.core.aws_services import AWSServices
+    from src.core.rate_limiter import RateLimiter
+
+    monkeypatch.setattr(boto3, 'client', lambda *args, **kwargs: object())
+    services = AWSServices(rate_limiter=RateLimiter(db_path=str(tmp_path / "limits.sqlite"), limits={}))
+    services.s3 = RecordingS3()
+    services.transcribe = FailingTranscribe()
+
+    assert services.transcribe_audio(str(speech_wav)) is None
+    assert services.transcribe_audio(str(speech_wav)) is None
+    assert len(set(services.s3.uploaded)) == 2
+    assert services.s3.deleted == services.s3.uploaded
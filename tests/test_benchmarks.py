@@ -0,0 +1,33 @@
+import pytest
+from benchmarks import synthetic
+from benchmarks.compare import compare
+from src.core.subtitle_formats import read_subtitles
+
+def test_scale_subtitles(tmp_path):
+    """Test synthetic subtitle files are scaled from the samples with increasing times."""
+    output = tmp_path / "scaled.srt"
+    assert synthetic.scale_subtitles(output, 25) == 25
+
+    captions = list(read_subtitles(output))
+    assert len(captions) == 25
+    assert all(a.start_ms < b.start_ms for a, b in zip(captions, captions[1:]))
+
+def test_render_video(tmp_path):
+    """Test synthetic video rendering from a sample description."""
+    output = tmp_path / "video.mp4"
+    meta = synthetic.render_video(synthetic.sample_videos()[0], output, duration=0.5, resolution=(320, 180))
+
+    assert output.exists()
+    assert meta['frames'] == 15
+    assert synthetic.overlays_at(synthetic.load_video_description(synthetic.sample_videos()[0]), 1.0)
+
+def test_compare_flags_regressions():
+    """Test regression detection honours metric direction."""
+    base = {'results': {'case': {'cues_per_sec': 1000.0, 'latency_p95_seconds': 1.0, 'cues': 10}}}
+    new = {'results': {'case': {'cues_per_sec': 800.0, 'latency_p95_seconds': 0.5, 'cues': 10}}}
+
+    rows = {row['metric']: row for row in compare(base, new, threshold=0.1)}
+
+    assert rows['cues_per_sec']['regression']
+    assert not rows['latency_p95_seconds']['regression']
+    assert 'cues' not in rows
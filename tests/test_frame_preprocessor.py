@@ -0,0 +1,116 @@
+import pytest
+import cv2
+import numpy as np
+from src.core.frame_preprocessor import FramePreprocessor, SUBTITLE_BANDS
+from src.core.video_processor import VideoProcessor
+
+@pytest.fixture
+def frame():
+    """A 1080p BGR frame with a white block in the top and bottom bands."""
+    image = np.zeros((1080, 1920, 3), dtype=np.uint8)
+    image[108:162, 768:1152] = 255   # top band
+    image[918:972, 576:1344] = 255   # bottom band
+    return image
+
+def _decode(frame_bytes):
+    return cv2.imdecode(np.frombuffer(frame_bytes, dtype=np.uint8), cv2.IMREAD_UNCHANGED)
+
+def test_downscale_and_grayscale(frame):
+    """Test frames are downscaled to the max dimension and encoded single-channel."""
+    frame_bytes, layout = FramePreprocessor(max_dimension=960, grayscale=True).prepare(frame)
+    image = _decode(frame_bytes)
+
+    assert image.shape == (540, 960)
+    assert layout == []
+
+def test_full_frame_keeps_size_and_color(frame):
+    """Test disabling preprocessing keeps the full colour frame."""
+    frame_bytes, _ = FramePreprocessor(max_dimension=None, grayscale=False, jpeg_quality=95).prepare(frame)
+    assert _decode(frame_bytes).shape == (1080, 1920, 3)
+
+def test_lower_quality_shrinks_payload(frame):
+    """Test JPEG quality trades payload size."""
+    high, _ = FramePreprocessor(jpeg_quality=95).prepare(frame)
+    low, _ = FramePreprocessor(jpeg_quality=50).prepare(frame)
+    assert len(low) < len(high)
+
+def test_roi_bands_are_stacked(frame):
+    """Test region-of-interest bands are cropped into a single image."""
+    preprocessor = FramePreprocessor(grayscale=True, roi_bands=SUBTITLE_BANDS)
+    frame_bytes, layout = preprocessor.prepare(frame)
+
+    assert _decode(frame_bytes).shape == (270 + 324, 1920)
+    assert [(b['source_top'], b['source_bottom']) for b in layout] == [(0.0, 0.25), (0.7, 1.0)]
+    assert layout[0]['image_top'] == 0.0
+    assert layout[-1]['image_bottom'] == 1.0
+
+def test_map_bbox_back_to_full_frame(frame):
+    """Test boxes found in the stacked image map back to full-frame coordinates."""
+    preprocessor = FramePreprocessor(roi_bands=SUBTITLE_BANDS)
+    _, layout = preprocessor.prepare(frame)
+    stacked = 270 + 324
+
+    # White block in the bottom band, as it appears in the stacked image
+    bbox = {'Left': 0.3, 'Top': (270 + 918 - 756) / stacked, 'Width': 0.4, 'Height': 54 / stacked}
+    mapped = preprocessor.map_bbox(bbox, layout)
+
+    assert mapped['Left'] == 0.3
+    assert mapped['Width'] == 0.4
+    assert mapped['Top'] == pytest.approx(918 / 1080)
+    assert mapped['Height'] == pytest.approx(54 / 1080)
+
+    # Top band
+    bbox = {'Left': 0.4, 'Top': 108 / stacked, 'Width': 0.2, 'Height': 54 / stacked}
+    mapped = preprocessor.map_bbox(bbox, layout)
+    assert mapped['Top'] == pytest.approx(108 / 1080)
+    assert mapped['Height'] == pytest.approx(54 / 1080)
+
+def test_map_bbox_without_roi_is_identity():
+    """Test boxes pass through unchanged without bands."""
+    bbox = {'Left': 0.1, 'Top': 0.2, 'Width': 0.3, 'Height': 0.4}
+    assert FramePreprocessor().map_bbox(bbox, []) is bbox
+
+def test_invalid_bands():
+    """Test empty bands are rejected and overlapping bands merged."""
+    with pytest.raises(ValueError):
+        FramePreprocessor(roi_bands=[(0.5, 0.5)])
+    assert FramePreprocessor(roi_bands=[(0.6, 1.0), (0.0, 0.2), (0.1, 0.3)]).roi_bands == [(0.0, 0.3), (0.6, 1.0)]
+
+class RecordingRekognition:
+    """Rekognition stand-in returning one line in the stacked image."""
+
+    def __init__(self):
+        self.images = []
+
+    def detect_text(self, Image):
+        self.images.append(_decode(Image['Bytes']))
+        return {'TextDetections': [{
+            'DetectedText': 'Lower third',
+            'Type': 'LINE',
+            'Confidence': 99.0,
+            'Geometry': {'BoundingBox': {'Left': 0.3, 'Top': 0.9, 'Width': 0.4, 'Height': 0.05}}
+        }]}
+
+def test_analyze_text_regions_uses_preprocessor(tmp_path, frame):
+    """Test the per-frame backend sends preprocessed frames and maps boxes back."""
+    video_path = tmp_path / "video.mp4"
+    writer = cv2.VideoWriter(str(video_path), cv2.VideoWriter_fourcc(*'mp4v'), 10, (1920, 1080))
+    for _ in range(3):
+        writer.write(frame)
+    writer.release()
+
+    rekognition = RecordingRekognition()
+    processor = VideoProcessor(rekognition=rekognition, transcribe=object(),
+                               frame_preprocessor=FramePreprocessor(max_dimension=640, grayscale=True, roi_bands=SUBTITLE_BANDS))
+    regions = processor._analyze_text_regions(str(video_path))
+
+    assert len(regions) == 3
+    assert all(image.ndim == 2 and image.shape[1] == 640 for image in rekognition.images)
+    bbox = regions[0]['regions'][0]['bbox']
+    assert 0.7 <= bbox['Top'] <= 1.0
+
+def test_default_keeps_baseline_frame(frame):
+    """Test the default sends the full colour frame as OpenCV encodes it."""
+    frame_bytes, layout = FramePreprocessor().prepare(frame)
+    assert frame_bytes == cv2.imencode('.jpg', frame)[1].tobytes()
+    assert layout == []
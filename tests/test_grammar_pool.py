@@ -0,0 +1,111 @@
+import pytest
+import os
+import threading
+import time
+from src.core.grammar_pool import LanguageToolPool, detect_language, languagetool_language
+from src.core.subtitle_processor import SubtitleProcessor
+from src.core.metrics import REGISTRY
+
+def test_language_mapping_and_detection():
+    """Test transcript codes map to LanguageTool languages and untagged text is detected."""
+    assert languagetool_language('en-GB') == 'en-GB'
+    assert languagetool_language('es-US') == 'es'
+    assert languagetool_language('de') == 'de-DE'
+
+    assert detect_language(["¿Dónde está la estación?", "No lo sé, pero es por aquí"]) == 'es'
+    assert detect_language(["Ich weiß nicht, wo der Bahnhof ist"]) == 'de-DE'
+    assert detect_language(["42", "..."]) == 'en-US'
+
+def test_servers_are_started_per_language_and_used_concurrently(factory, started):
+    """Test each language gets its own servers and batches are spread across them."""
+    pool = LanguageToolPool(size=3, factory=lambda language: factory(language, latency=0.02))
+
+    texts = [f"Cue {i}" for i in range(12)]
+    assert pool.check_many(texts, 'en-US') == [[] for _ in texts]
+    assert started[0].peak == 3
+    assert sorted(t for tool in started for t in tool.checked) == sorted(texts)
+
+    pool.check("Hola", 'es')
+    assert [tool.language for tool in started] == ['en-US'] * 3 + ['es'] * 3
+    pool.close()
+    assert all(tool.closed for tool in started)
+
+def test_dead_and_failing_servers_are_restarted(factory, started):
+    """Test a server whose process exited, or whose request failed, is replaced."""
+    pool = LanguageToolPool(size=1, factory=factory)
+    pool.check("First", 'en-US')
+    started[0]._server.returncode = 1
+
+    pool.check("Second", 'en-US')
+    assert len(started) == 2 and started[0].closed
+    assert started[1].checked == ["Second"]
+
+    started[1].failures = 1
+    pool.check("Third", 'en-US')
+    assert len(started) == 3
+    assert started[2].checked == ["Third"]
+    assert pool.restarts == 2
+
+def test_memory_cap_restarts_server(factory, started):
+    """Test a server over the memory cap is restarted at its next health check."""
+    pool = LanguageToolPool(size=1, max_memory_mb=1.0, health_interval=0.0,
+                            factory=lambda language: factory(language, pid=os.getpid()))
+    pool.check("First", 'en-US')
+    assert pool.memory_usage()['en-US'][0] > 1.0
+
+    pool.check("Second", 'en-US')
+    assert len(started) == 3  # restarted before each check
+    assert pool.restarts == 2
+
+def test_subtitle_processor_checks_in_detected_language(tmp_path, factory, started):
+    """Test subtitle files are grammar checked on the pool in their own language."""
+    input_path = tmp_path / "input.vtt"
+    input_path.write_text("WEBVTT\n\n00:00:01.000 --> 00:00:02.000\nEl perro está en la casa\n\n"
+                          "00:00:03.000 --> 00:00:04.000\nNo es un gato\n")
+    processor = SubtitleProcessor(transcribe=object(), translate=object(), rekognition=object(),
+                                  grammar_pool=LanguageToolPool(size=2, factory=factory))
+
+    REGISTRY.reset()
+    result = processor.process_subtitle_file_incremental(str(input_path), str(tmp_path / "output.vtt"))
+    assert result == {'cues': 2, 'reprocessed': 2}
+    assert {tool.language for tool in started} == {'es'}
+    grammar = [row for row in REGISTRY.stage_summary() if row['stage'] == 'subtitle.grammar']
+    assert grammar and grammar[0]['count'] == 2
+
+    processor.process_subtitle_file(str(input_path), str(tmp_path / "output.vtt"), language='fr-FR')
+    assert {tool.language for tool in started} == {'es', 'fr'}
+
+def test_starting_language_does_not_block_running_ones(factory, started):
+    """Test a language whose servers are starting does not hold up checks in other languages."""
+    release = threading.Event()
+
+    def create(language):
+        if language == 'de-DE':
+            release.wait(5)
+        return factory(language)
+
+    pool = LanguageToolPool(size=1, factory=create)
+    pool.check("Warm", 'en-US')
+    starting = threading.Thread(target=pool.check, args=("Hallo", 'de-DE'))
+    starting.start()
+    time.sleep(0.05)
+
+    start = time.monotonic()
+    assert pool.check_many(["One", "Two"], 'en-US') == [[], []]
+    assert time.monotonic() - start < 1.0
+    release.set()
+    starting.join(5)
+    assert started[-1].checked == ["Hallo"]
+    pool.close()
+
+def test_small_default_size_and_memory_cap(monkeypatch, factory):
+    """Test the pool starts few servers and caps their memory unless configured otherwise."""
+    monkeypatch.delenv('LANGUAGETOOL_POOL_SIZE', raising=False)
+    monkeypatch.delenv('LANGUAGETOOL_MAX_MEMORY_MB', raising=False)
+    pool = LanguageToolPool(factory=factory)
+    assert pool.size <= 2 and pool.max_memory_mb == 1536
+
+    monkeypatch.setenv('LANGUAGETOOL_POOL_SIZE', '6')
+    monkeypatch.setenv('LANGUAGETOOL_MAX_MEMORY_MB', '0')
+    pool = LanguageToolPool(factory=factory)
+    assert pool.size == 6 and pool.max_memory_mb is None
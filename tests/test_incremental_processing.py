@@ -0,0 +1,63 @@
+from src.core.subtitle_formats import read_subtitles
+
+def _write_vtt(path, texts):
+    blocks = [
+        f"{i + 1}\n00:{i // 60:02d}:{i % 60:02d}.000 --> 00:{i // 60:02d}:{i % 60:02d}.900\n{text}"
+        for i, text in enumerate(texts)
+    ]
+    path.write_text("WEBVTT\n\n" + "\n\n".join(blocks) + "\n", encoding='utf-8')
+
+def test_edit_reprocesses_only_changed_cue(tmp_path, subtitle_processor, language_tool):
+    """Test a one-cue edit re-enhances one cue and keeps the rest of the output."""
+    texts = [f"Cue number {i}" for i in range(3000)]
+    input_path = tmp_path / "input.vtt"
+    output_path = tmp_path / "output.vtt"
+    state_path = tmp_path / "output.vtt.state.json"
+
+    _write_vtt(input_path, texts)
+    first = subtitle_processor.process_subtitle_file_incremental(str(input_path), str(output_path), str(state_path))
+    assert first == {'cues': 3000, 'reprocessed': 3000}
+    before = [c.text for c in read_subtitles(str(output_path))]
+
+    texts[1234] = "An edited cue"
+    _write_vtt(input_path, texts)
+    language_tool.checked.clear()
+    second = subtitle_processor.process_subtitle_file_incremental(str(input_path), str(output_path), str(state_path))
+
+    assert second == {'cues': 3000, 'reprocessed': 1}
+    assert language_tool.checked == ["An edited cue"]
+    after = [c.text for c in read_subtitles(str(output_path))]
+    assert after[1234] == "An edited cue"
+    assert after[:1234] == before[:1234]
+    assert after[1235:] == before[1235:]
+
+def test_retimed_cue_is_reprocessed(tmp_path, subtitle_processor):
+    """Test timing is part of cue identity."""
+    input_path = tmp_path / "input.vtt"
+    state_path = tmp_path / "state.json"
+    input_path.write_text("WEBVTT\n\n00:00:01.000 --> 00:00:02.000\nHello\n", encoding='utf-8')
+    subtitle_processor.process_subtitle_file_incremental(str(input_path), str(tmp_path / "out.vtt"), str(state_path))
+
+    input_path.write_text("WEBVTT\n\n00:00:01.500 --> 00:00:02.000\nHello\n", encoding='utf-8')
+    result = subtitle_processor.process_subtitle_file_incremental(str(input_path), str(tmp_path / "out.vtt"), str(state_path))
+    assert result['reprocessed'] == 1
+
+def test_state_ignored_when_settings_change(tmp_path, subtitle_processor, language_tool):
+    """Test state written under other settings is not reused."""
+    input_path = tmp_path / "input.vtt"
+    state_path = tmp_path / "state.json"
+    _write_vtt(input_path, ["One", "Two"])
+    subtitle_processor.process_subtitle_file_incremental(str(input_path), str(tmp_path / "out.vtt"), str(state_path))
+
+    language_tool.language = 'de-DE'
+    result = subtitle_processor.process_subtitle_file_incremental(str(input_path), str(tmp_path / "out.vtt"), str(state_path))
+    assert result['reprocessed'] == 2
+
+def test_without_state_processes_everything(tmp_path, subtitle_processor):
+    """Test the default mode keeps returning a bool and writes no state."""
+    input_path = tmp_path / "input.vtt"
+    _write_vtt(input_path, ["One", "Two"])
+
+    assert subtitle_processor.process_subtitle_file(str(input_path), str(tmp_path / "out.vtt")) is True
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["input.vtt", "out.vtt"]
+    assert subtitle_processor.process_subtitle_file(str(tmp_path / "missing.vtt"), str(tmp_path / "out.vtt")) is False
@@ -0,0 +1,148 @@
+import pytest
+import os
+import wave
+import numpy as np
+from src.core.live_pipeline import LivePipeline, SegmentSource, Segment, parse_playlist
+from src.core.subtitle_formats import read_subtitles
+
+class StubTranscriber:
+    """Transcriber stand-in returning one sentence per segment, in segment-relative time."""
+
+    def __init__(self):
+        self.calls = 0
+        self.audio_names = []
+
+    def __call__(self, audio_path, language_code):
+        self.calls += 1
+        self.audio_names.append(os.path.basename(audio_path))
+        return {'segments': [{'start_time': 0.5, 'end_time': 1.5, 'speaker': None,
+                              'text': f"Sentence {self.calls}"}]}
+
+def _write_wav(path, seconds, speech):
+    rate = 16000
+    t = np.arange(int(rate * seconds)) / rate
+    samples = (np.sin(2 * np.pi * 220 * t) * 8000).astype(np.int16) if speech else np.zeros(len(t), dtype=np.int16)
+    with wave.open(str(path), 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(samples.tobytes())
+
+def test_parse_playlist(tmp_path):
+    """Test HLS playlists yield segment paths with durations."""
+    text = "#EXTM3U\n#EXT-X-TARGETDURATION:6\n#EXTINF:6.000,\nseg0.ts\n#EXTINF:4.5,\nseg1.ts\n#EXT-X-ENDLIST\n"
+    entries, ended = parse_playlist(text, str(tmp_path))
+
+    assert entries == [(str(tmp_path / "seg0.ts"), 6.0), (str(tmp_path / "seg1.ts"), 4.5)]
+    assert ended
+
+def test_directory_feed_transcribes_speech_segments(tmp_path, subtitle_processor):
+    """Test audio segments are transcribed unless silent and emitted as aligned WebVTT segments."""
+    feed = tmp_path / "feed"
+    feed.mkdir()
+    for i, speech in enumerate([True, False, True]):
+        _write_wav(feed / f"segment{i}.wav", 2.0, speech)
+    (feed / "init.mp4").write_bytes(b'')  # initialization segments are not media segments
+
+    transcriber = StubTranscriber()
+    output_dir = tmp_path / "out"
+    pipeline = LivePipeline(subtitle_processor, str(output_dir), transcriber=transcriber)
+    results = pipeline.run(SegmentSource(str(feed), poll_interval=0.01, idle_timeout=0.05, settle_time=0))
+
+    assert [r['transcribed'] for r in results] == [True, False, True]
+    assert transcriber.calls == 2
+    assert all(r['latency'] >= 0 for r in results)
+
+    last = output_dir / "sub_00002.vtt"
+    assert "X-TIMESTAMP-MAP=MPEGTS:0,LOCAL:00:00:00.000" in last.read_text()
+    cues = list(read_subtitles(str(last)))
+    assert [(c.start_ms, c.end_ms, c.text) for c in cues] == [(4500, 5500, "Sentence 2")]
+
+    playlist = (output_dir / "subtitles.m3u8").read_text()
+    assert playlist.count('#EXTINF:2.000,') == 3
+    assert "sub_00000.vtt" in playlist
+    assert playlist.rstrip().endswith('#EXT-X-ENDLIST')
+
+def test_caption_feed_repeats_spanning_cues(tmp_path, subtitle_processor, language_tool):
+    """Test a cue spanning two caption segments is enhanced once and emitted in both."""
+    feed = tmp_path / "feed"
+    feed.mkdir()
+    spanning = "00:00:05.000 --> 00:00:07.000\nAcross the boundary\n"
+    (feed / "sub0.vtt").write_text("WEBVTT\n\n00:00:01.000 --> 00:00:02.000\nFirst cue\n\n" + spanning)
+    (feed / "sub1.vtt").write_text("WEBVTT\n\n" + spanning + "\n00:00:08.000 --> 00:00:09.000\nLast cue\n")
+
+    pipeline = LivePipeline(subtitle_processor, str(tmp_path / "out"), transcriber=StubTranscriber())
+    source = SegmentSource(str(feed), poll_interval=0.01, idle_timeout=0.05, settle_time=0,
+                           duration_probe=lambda path: 6.0)
+    results = pipeline.run(source)
+
+    assert [r['cues'] for r in results] == [2, 1]
+    assert [r['emitted'] for r in results] == [2, 2]
+    assert language_tool.checked.count("Across the boundary") == 1
+    second = list(read_subtitles(str(tmp_path / "out" / "sub_00001.vtt")))
+    assert [c.text for c in second] == ["Across the boundary", "Last cue"]
+
+def test_look_back_window_is_bounded(tmp_path, subtitle_processor):
+    """Test only the configured number of recent segments is kept."""
+    pipeline = LivePipeline(subtitle_processor, str(tmp_path / "out"), window=2)
+    for i in range(4):
+        path = tmp_path / f"sub{i}.vtt"
+        path.write_text(f"WEBVTT\n\n00:00:0{i}.000 --> 00:00:0{i}.500\nCue {i}\n")
+        pipeline.process_segment(Segment(i, str(path), float(i), 1.0, 0.0))
+    assert len(pipeline.window) == 2
+
+def test_failed_pipeline_does_not_end_playlist(tmp_path, subtitle_processor):
+    """Test a pipeline stopped by an error leaves the playlist open."""
+    feed = tmp_path / "feed"
+    feed.mkdir()
+    (feed / "sub0.vtt").write_text("WEBVTT\n\n00:00:01.000 --> 00:00:02.000\nFirst cue\n")
+    (feed / "sub1.vtt").write_text("WEBVTT\n\n00:00:07.000 --> 00:00:08.000\nSecond cue\n")
+
+    def fail_on_second(result):
+        if result['sequence'] == 1:
+            raise RuntimeError("publisher went away")
+
+    pipeline = LivePipeline(subtitle_processor, str(tmp_path / "out"), transcriber=StubTranscriber())
+    source = SegmentSource(str(feed), poll_interval=0.01, idle_timeout=0.05, settle_time=0,
+                           duration_probe=lambda path: 6.0)
+    with pytest.raises(RuntimeError):
+        pipeline.run(source, on_segment=fail_on_second)
+
+    playlist = (tmp_path / "out" / "subtitles.m3u8").read_text()
+    assert "sub_00001.vtt" in playlist
+    assert '#EXT-X-ENDLIST' not in playlist
+
+def test_timestamp_map_follows_first_segment_pts(tmp_path, subtitle_processor):
+    """Test X-TIMESTAMP-MAP anchors on the probed start of the first segment unless an offset is given."""
+    feed = tmp_path / "feed"
+    feed.mkdir()
+    for i in range(2):
+        _write_wav(feed / f"segment{i}.wav", 1.0, True)
+    starts = {str(feed / "segment0.wav"): 1.4, str(feed / "segment1.wav"): 2.4}
+
+    pipeline = LivePipeline(subtitle_processor, str(tmp_path / "probed"), transcriber=StubTranscriber(),
+                            start_probe=starts.get)
+    pipeline.run(SegmentSource(str(feed), poll_interval=0.01, idle_timeout=0.05, settle_time=0))
+    for name in ("sub_00000.vtt", "sub_00001.vtt"):
+        assert "X-TIMESTAMP-MAP=MPEGTS:126000,LOCAL:00:00:00.000" in (tmp_path / "probed" / name).read_text()
+
+    pipeline = LivePipeline(subtitle_processor, str(tmp_path / "given"), transcriber=StubTranscriber(),
+                            mpegts_offset=10.0, start_probe=starts.get)
+    pipeline.run(SegmentSource(str(feed), poll_interval=0.01, idle_timeout=0.05, settle_time=0))
+    assert "MPEGTS:900000," in (tmp_path / "given" / "sub_00000.vtt").read_text()
+
+def test_segment_audio_is_named_per_pipeline(tmp_path, subtitle_processor):
+    """Test uploaded segment audio is named by pipeline and sequence so concurrent pipelines never collide."""
+    feed = tmp_path / "feed"
+    feed.mkdir()
+    for i in range(2):
+        _write_wav(feed / f"segment{i}.wav", 1.0, True)
+
+    names = []
+    for run in range(2):
+        transcriber = StubTranscriber()
+        pipeline = LivePipeline(subtitle_processor, str(tmp_path / f"out{run}"), transcriber=transcriber)
+        pipeline.run(SegmentSource(str(feed), poll_interval=0.01, idle_timeout=0.05, settle_time=0))
+        assert transcriber.audio_names == [f"live_{pipeline.pipeline_id}_{i:05d}.wav" for i in range(2)]
+        names.extend(transcriber.audio_names)
+    assert len(set(names)) == 4
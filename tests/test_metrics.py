@@ -0,0 +1,76 @@
+import pytest
+from src.core import metrics
+
+@pytest.fixture(autouse=True)
+def clean_registry():
+    """Start every test with an empty, enabled registry."""
+    enabled = metrics.is_enabled()
+    metrics.set_enabled(True)
+    metrics.REGISTRY.reset()
+    yield
+    metrics.REGISTRY.reset()
+    metrics.set_enabled(enabled)
+
+def test_span_and_timed_record_stages():
+    """Test context manager and decorator spans record durations."""
+    @metrics.timed('test.decorated')
+    def work():
+        return 42
+
+    with metrics.span('test.block'):
+        assert work() == 42
+    work()
+
+    summary = {row['stage']: row for row in metrics.REGISTRY.stage_summary()}
+    assert summary['test.decorated']['count'] == 2
+    assert summary['test.block']['count'] == 1
+    assert summary['test.block']['total'] >= 0
+
+def test_span_records_on_exception():
+    """Test a span still records when the block raises."""
+    with pytest.raises(ValueError):
+        with metrics.span('test.failing'):
+            raise ValueError("boom")
+
+    assert metrics.REGISTRY.stage_summary()[0]['stage'] == 'test.failing'
+
+def test_disabled_metrics_record_nothing():
+    """Test that disabled metrics are no-ops."""
+    metrics.set_enabled(False)
+
+    @metrics.timed('test.disabled')
+    def work():
+        return 1
+
+    with metrics.span('test.disabled_block'):
+        work()
+    metrics.api_call('rekognition', 'detect_text')
+
+    assert metrics.REGISTRY.stage_summary() == []
+    assert metrics.REGISTRY.counters == {}
+
+def test_prometheus_exposition():
+    """Test histogram and counter rendering in Prometheus text format."""
+    metrics.REGISTRY.observe('video.jpeg_encode', 0.003)
+    metrics.REGISTRY.observe('video.jpeg_encode', 0.2)
+    metrics.api_call('rekognition', 'detect_text')
+    metrics.api_call('rekognition', 'detect_text')
+    metrics.cache_hit('analysis')
+
+    text = metrics.REGISTRY.render_prometheus()
+
+    assert '# TYPE subtitle_stage_duration_seconds histogram' in text
+    assert 'subtitle_stage_duration_seconds_bucket{stage="video.jpeg_encode",le="0.005"} 1' in text
+    assert 'subtitle_stage_duration_seconds_bucket{stage="video.jpeg_encode",le="+Inf"} 2' in text
+    assert 'subtitle_stage_duration_seconds_count{stage="video.jpeg_encode"} 2' in text
+    assert 'subtitle_api_calls_total{operation="detect_text",service="rekognition"} 2' in text
+    assert 'subtitle_cache_hits_total{cache="analysis"} 1' in text
+
+def test_format_profile():
+    """Test the per-stage profile table lists stages and counters."""
+    metrics.REGISTRY.observe('subtitle.grammar', 0.5)
+    metrics.api_call('languagetool', 'check')
+
+    profile = metrics.REGISTRY.format_profile()
+    assert 'subtitle.grammar' in profile
+    assert 'subtitle_api_calls_total{operation=check,service=languagetool} 1' in profile
@@ -0,0 +1,118 @@
+import pytest
+import sqlite3
+import time
+from botocore.exceptions import ClientError
+from src.core.rate_limiter import RateLimiter, priority, current_priority, is_throttling_error, INTERACTIVE, BATCH
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "ratelimit.sqlite")
+
+def _throttled():
+    return ClientError({'Error': {'Code': 'ThrottlingException', 'Message': 'Rate exceeded'}}, 'DetectText')
+
+def test_rate_is_enforced(db_path):
+    """Test calls beyond the burst are spaced at the configured rate."""
+    limiter = RateLimiter(db_path=db_path, limits={'rekognition.detect_text': (20.0, 1.0)})
+
+    start = time.monotonic()
+    for _ in range(6):
+        limiter.acquire('rekognition.detect_text')
+    assert time.monotonic() - start >= 0.2
+
+def test_unlimited_api_does_not_wait(db_path):
+    """Test operations without a limit pass straight through."""
+    limiter = RateLimiter(db_path=db_path, limits={})
+    assert limiter.acquire('s3.upload_file') == 0.0
+
+def test_buckets_are_shared_between_limiters(db_path):
+    """Test limiters on the same database (as in separate processes) share one quota."""
+    limits = {'translate.translate_text': (5.0, 2.0)}
+    first = RateLimiter(db_path=db_path, limits=limits)
+    second = RateLimiter(db_path=db_path, limits=limits)
+
+    first.acquire('translate.translate_text')
+    first.acquire('translate.translate_text')
+    assert second.acquire('translate.translate_text') >= 0.15
+
+    # Other accounts have their own bucket
+    other = RateLimiter(db_path=db_path, limits=limits, account='other')
+    assert other.acquire('translate.translate_text') < 0.05
+
+def test_batch_waits_for_interactive_waiters(db_path):
+    """Test batch callers yield while an interactive caller is waiting."""
+    limiter = RateLimiter(db_path=db_path, limits={'rekognition.detect_text': (100.0, 10.0)})
+    limiter.acquire('rekognition.detect_text')
+    conn = sqlite3.connect(db_path)
+    with conn:
+        conn.execute('INSERT INTO waiters VALUES (?, ?, ?)',
+                     ('web-request', 'default:rekognition.detect_text', time.time() + 0.3))
+    conn.close()
+
+    assert current_priority() == BATCH
+    with priority(INTERACTIVE):
+        assert limiter.acquire('rekognition.detect_text') < 0.05
+    assert limiter.acquire('rekognition.detect_text') >= 0.2
+
+def test_priority_validation():
+    """Test unknown priority classes are rejected."""
+    with pytest.raises(ValueError):
+        with priority('urgent'):
+            pass
+
+def test_call_retries_throttled_requests(db_path):
+    """Test throttled calls are retried with backoff until they succeed."""
+    limiter = RateLimiter(db_path=db_path, limits={'rekognition.detect_text': (1000.0, 10.0)}, base_delay=0.01)
+    attempts = []
+
+    def detect_text(Image):
+        attempts.append(Image)
+        if len(attempts) < 3:
+            raise _throttled()
+        return {'TextDetections': []}
+
+    assert limiter.call('rekognition.detect_text', detect_text, Image={'Bytes': b''}) == {'TextDetections': []}
+    assert len(attempts) == 3
+
+def test_call_gives_up_and_passes_other_errors_through(db_path):
+    """Test retries are bounded and non-throttling errors are raised at once."""
+    limiter = RateLimiter(db_path=db_path, limits={}, max_retries=2, base_delay=0.001)
+    attempts = []
+
+    def throttled():
+        attempts.append(1)
+        raise _throttled()
+
+    with pytest.raises(ClientError):
+        limiter.call('translate.translate_text', throttled)
+    assert len(attempts) == 3
+
+    def invalid():
+        attempts.append(1)
+        raise ClientError({'Error': {'Code': 'InvalidParameterException'}}, 'TranslateText')
+
+    attempts.clear()
+    with pytest.raises(ClientError):
+        limiter.call('translate.translate_text', invalid)
+    assert len(attempts) == 1
+    assert not is_throttling_error(ValueError('boom'))
+
+def test_connections_are_closed_after_each_call(db_path, monkeypatch):
+    """Test no database connection outlives the call that opened it."""
+    opened = []
+    connect = sqlite3.connect
+
+    def tracking_connect(*args, **kwargs):
+        conn = connect(*args, **kwargs)
+        opened.append(conn)
+        return conn
+
+    monkeypatch.setattr(sqlite3, 'connect', tracking_connect)
+    limiter = RateLimiter(db_path=db_path, limits={'rekognition.detect_text': (100.0, 10.0)})
+    limiter.acquire('rekognition.detect_text')
+    limiter.penalize('rekognition.detect_text', 0.01)
+
+    assert len(opened) == 2
+    for conn in opened:
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute('SELECT 1')
@@ -0,0 +1,149 @@
+import pytest
+import asyncio
+import json
+import os
+import threading
+import time
+from src.core.result_cache import ResultCache, RequestCoalescer, HIT, COALESCED, MISS
+from src.core.rate_limiter import priority, current_priority, INTERACTIVE
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResultCache(cache_dir=str(tmp_path / "results"), max_bytes=1024, ttl=60)
+
+def _result(body: bytes) -> dict:
+    return {'body': body, 'media_type': 'text/vtt', 'headers': {'X-Cues-Total': '1'}}
+
+def test_key_depends_on_content_and_options():
+    """Test keys change with input hashes and options but not option order."""
+    key = ResultCache.key('process-subtitle', ['abc', None], {'format': 'vtt', 'language': None})
+    assert key == ResultCache.key('process-subtitle', ['abc', None], {'language': None, 'format': 'vtt'})
+    assert key != ResultCache.key('process-subtitle', ['abd', None], {'format': 'vtt', 'language': None})
+    assert key != ResultCache.key('process-subtitle', ['abc', None], {'format': 'srt', 'language': None})
+
+def test_store_and_load(cache):
+    """Test results round-trip with a stable ETag and expire after the TTL."""
+    stored = cache.store('k1', _result(b"WEBVTT\n"))
+    loaded = cache.load('k1')
+
+    assert loaded['body'] == b"WEBVTT\n"
+    assert loaded['etag'] == stored['etag'] and loaded['etag'].startswith('"')
+    assert loaded['headers'] == {'X-Cues-Total': '1'}
+    assert cache.load('missing') is None
+
+    cache.ttl = 0
+    time.sleep(0.01)
+    assert cache.load('k1') is None
+    assert not list(cache.cache_dir.glob('*.result'))
+
+def test_least_recently_used_entries_are_evicted(cache):
+    """Test the cache stays under max_bytes by dropping the least recently used entries."""
+    now = time.time()
+    for i, key in enumerate(['a', 'b']):
+        cache.store(key, _result(b"x" * 300))
+        os.utime(cache.cache_dir / f"{key}.result", (now - 10 + i, now - 10 + i))
+    assert cache.load('a') is not None  # 'a' is now the most recently used
+
+    cache.store('c', _result(b"x" * 300))
+    assert cache.load('b') is None
+    assert cache.load('a') is not None and cache.load('c') is not None
+
+def test_identical_requests_share_one_computation(cache):
+    """Test concurrent requests with the same key run once and later ones hit the cache."""
+    release = threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(current_priority())
+        release.wait(5)
+        return _result(b"enhanced")
+
+    coalescer = RequestCoalescer(cache)
+    with priority(INTERACTIVE):
+        first, first_status = coalescer.submit('key', compute)
+    second, second_status = coalescer.submit('key', compute)
+    release.set()
+
+    assert (first_status, second_status) == (MISS, COALESCED)
+    assert first.result(5)['body'] == second.result(5)['body'] == b"enhanced"
+    assert calls == [INTERACTIVE]
+
+    third, third_status = coalescer.submit('key', compute)
+    assert third_status == HIT
+    assert third.result()['etag'] == first.result()['etag']
+    assert len(calls) == 1
+    coalescer.close()
+
+def test_failures_are_shared_but_not_cached(cache):
+    """Test a failed computation is reported to its callers and retried by the next request."""
+    attempts = []
+
+    def compute():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise ValueError("analysis failed")
+        return _result(b"ok")
+
+    coalescer = RequestCoalescer(cache)
+    future, _ = coalescer.submit('key', compute)
+    with pytest.raises(ValueError):
+        future.result(5)
+
+    future, status = coalescer.submit('key', compute)
+    assert status == MISS
+    assert future.result(5)['body'] == b"ok"
+    coalescer.close()
+
+def test_cancelled_waiters_do_not_strand_a_key(cache):
+    """Test a cancelled waiter leaves the shared job running and a cancelled job frees its key."""
+    release = threading.Event()
+    coalescer = RequestCoalescer(cache, max_workers=1)
+    busy, _ = coalescer.submit('busy', lambda: release.wait(5) and _result(b"busy"))
+    queued, _ = coalescer.submit('key', lambda: _result(b"shared"))
+
+    async def disconnect():
+        waiter = asyncio.ensure_future(asyncio.shield(asyncio.wrap_future(queued)))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+
+    asyncio.run(disconnect())
+    assert not queued.cancelled()
+    _, status = coalescer.submit('key', lambda: _result(b"shared"))
+    assert status == COALESCED
+
+    # Cancelling the queued job itself must not leave later requests coalescing onto it
+    assert queued.cancel()
+    future, status = coalescer.submit('key', lambda: _result(b"fresh"))
+    assert status == MISS
+    release.set()
+    assert future.result(5)['body'] == b"fresh"
+    assert busy.result(5)['body'] == b"busy"
+    coalescer.close()
+
+def test_frequently_used_entries_still_expire(cache):
+    """Test entries expire by creation time even when recent hits refreshed their use time."""
+    cache.store('old', _result(b"x" * 100))
+    path = cache.cache_dir / "old.result"
+    header, body = path.read_bytes().split(b'\n', 1)
+    meta = json.loads(header)
+    meta['created'] -= 120
+    path.write_bytes(json.dumps(meta).encode('utf-8') + b'\n' + body)
+    os.utime(path)  # just used
+
+    cache.store('new', _result(b"y" * 100))
+    assert not path.exists()
+    assert cache.load('new') is not None
+
+def test_key_changes_with_processing_settings():
+    """Test results cached under one set of processing settings are not reused under another."""
+    from src.core.subtitle_processor import SubtitleProcessor
+    from src.core.text_normalizer import Reflow
+
+    processor = SubtitleProcessor(language_tool=object(), transcribe=object(), translate=object(), rekognition=object())
+    key = ResultCache.key('process-subtitle', ['abc'], {'subtitle': processor.settings(None)})
+    assert key == ResultCache.key('process-subtitle', ['abc'], {'subtitle': processor.settings(None)})
+
+    processor.reflow = Reflow(max_chars_per_line=32)
+    assert key != ResultCache.key('process-subtitle', ['abc'], {'subtitle': processor.settings(None)})
+    assert processor.settings('es')['normalizer'] == processor.settings(None)['normalizer']
@@ -0,0 +1,167 @@
+import pytest
+from pathlib import Path
+import webvtt
+from src.core.subtitle_formats import (
+    parse_timestamp, format_timestamp, detect_format, read_subtitles, iter_captions,
+    write_subtitles, convert
+)
+
+@pytest.fixture
+def sample_subtitle():
+    """Get path to sample subtitle file."""
+    return Path(__file__).parent.parent / "data" / "test_subtitles" / "sample1.vtt"
+
+SRT_CONTENT = """1
+00:00:01,000 --> 00:00:04,000
+First line
+second line
+
+2
+00:00:05,500 --> 00:00:08,250
+Another cue
+"""
+
+ASS_CONTENT = """[Script Info]
+ScriptType: v4.00+
+
+[Events]
+Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
+Dialogue: 0,0:00:01.00,0:00:04.00,Default,,0,0,0,,{\\an8}First line\\Nsecond line
+Dialogue: 0,0:00:05.50,0:00:08.25,Default,Bob,0,0,0,,Another, with comma
+"""
+
+TTML_CONTENT = """<?xml version="1.0" encoding="utf-8"?>
+<tt xmlns="http://www.w3.org/ns/ttml">
+  <body><div>
+    <p begin="00:00:01.000" end="00:00:04.000">First line<br/>second line</p>
+    <p begin="5.5s" dur="2750ms">Another cue</p>
+  </div></body>
+</tt>
+"""
+
+def test_parse_timestamp():
+    """Test timestamp parsing across format conventions."""
+    assert parse_timestamp("00:00:01.000") == 1000
+    assert parse_timestamp("01:02:03,456") == 3723456
+    assert parse_timestamp("02:03.5") == 123500
+    assert parse_timestamp("0:00:05.50") == 5500
+    assert parse_timestamp("12.5s") == 12500
+    assert parse_timestamp("250ms") == 250
+    assert parse_timestamp("00:00:01:15", frame_rate=30) == 1500
+    assert parse_timestamp("25f", frame_rate=25) == 1000
+    assert parse_timestamp("15000000t", tick_rate=10000000) == 1500
+
+    with pytest.raises(ValueError):
+        parse_timestamp("00:0a:01.000")
+
+def test_format_timestamp():
+    """Test timestamp formatting for each output format."""
+    assert format_timestamp(3723456) == "01:02:03.456"
+    assert format_timestamp(3723456, 'srt') == "01:02:03,456"
+    assert format_timestamp(3723456, 'ass') == "1:02:03.45"
+
+def test_detect_format(sample_subtitle):
+    """Test content-based format detection."""
+    assert detect_format(sample_subtitle.read_text(encoding="utf-8")) == 'vtt'
+    assert detect_format(SRT_CONTENT) == 'srt'
+    assert detect_format(ASS_CONTENT) == 'ass'
+    assert detect_format(TTML_CONTENT) == 'ttml'
+
+@pytest.mark.parametrize("content", [SRT_CONTENT, ASS_CONTENT, TTML_CONTENT])
+def test_read_formats(content):
+    """Test that every input format yields the same cues."""
+    captions = list(iter_captions(content))
+
+    assert [(c.start_ms, c.end_ms) for c in captions] == [(1000, 4000), (5500, 8250)]
+    assert captions[0].text == "First line\nsecond line"
+    assert captions[0].start == "00:00:01.000"
+
+def test_read_vtt_matches_webvtt(sample_subtitle):
+    """Test that the VTT reader agrees with webvtt-py on the sample file."""
+    ours = list(read_subtitles(sample_subtitle))
+    theirs = list(webvtt.read(str(sample_subtitle)))
+
+    assert len(ours) == len(theirs)
+    for a, b in zip(ours, theirs):
+        assert a.start == b.start
+        assert a.end == b.end
+        assert a.text == b.text
+
+@pytest.mark.parametrize("suffix", [".vtt", ".srt", ".ass", ".ttml"])
+def test_convert_round_trip(sample_subtitle, tmp_path, suffix):
+    """Test converting to each format and back preserves cues."""
+    converted = tmp_path / f"converted{suffix}"
+    back = tmp_path / "back.vtt"
+
+    assert convert(str(sample_subtitle), str(converted)) == 5
+    assert convert(str(converted), str(back)) == 5
+
+    original = list(read_subtitles(sample_subtitle))
+    result = list(read_subtitles(back))
+    assert [(c.start_ms, c.end_ms) for c in result] == [(c.start_ms, c.end_ms) for c in original]
+    assert [c.text for c in result] == [c.text for c in original]
+
+def test_write_enhanced_dicts(tmp_path):
+    """Test writing enhanced caption dicts keeps the positioning setting."""
+    output = tmp_path / "out.vtt"
+    write_subtitles([{
+        'start': "00:00:01.000",
+        'end': "00:00:02.000",
+        'text': "Hello",
+        'position': {'x': 50, 'y': 90}
+    }], output)
+
+    assert output.read_text(encoding="utf-8") == (
+        "WEBVTT\n\n1\n00:00:01.000 --> 00:00:02.000 position:50%,90%\nHello\n\n"
+    )
+
+PRETTY_TTML = """<?xml version="1.0" encoding="utf-8"?>
+<tt xmlns="http://www.w3.org/ns/ttml" xmlns:ttp="http://www.w3.org/ns/ttml#parameter"
+    ttp:tickRate="10000000" ttp:frameRate="25" xml:lang="de">
+  <body>
+    <div>
+      <p begin="10000000t" end="40000000t">
+        Erste Zeile
+        <br/>
+        zweite   <span>Zeile</span>
+      </p>
+      <p begin="125f" dur="50f">Noch ein Satz</p>
+    </div>
+  </body>
+</tt>
+"""
+
+def test_ttml_whitespace_and_time_metrics(tmp_path):
+    """Test source indentation collapses, lines break only at <br/>, and tick and frame times parse."""
+    captions = list(iter_captions(PRETTY_TTML))
+    assert [(c.start_ms, c.end_ms, c.text) for c in captions] == [
+        (1000, 4000, "Erste Zeile\nzweite Zeile"),
+        (5000, 7000, "Noch ein Satz")
+    ]
+
+    source = tmp_path / "pretty.ttml"
+    source.write_text(PRETTY_TTML, encoding="utf-8")
+    assert convert(str(source), str(tmp_path / "out.srt")) == 2
+    assert [c.text for c in read_subtitles(tmp_path / "out.srt")] == ["Erste Zeile\nzweite Zeile", "Noch ein Satz"]
+
+    assert convert(str(source), str(tmp_path / "out.ttml")) == 2
+    assert 'xml:lang="de"' in (tmp_path / "out.ttml").read_text(encoding="utf-8")
+
+def test_writers_drop_blank_lines_and_keep_settings(tmp_path):
+    """Test blank lines never end a cue early and VTT cue settings survive conversion."""
+    output = tmp_path / "out.srt"
+    write_subtitles([{'start_ms': 1000, 'end_ms': 2000, 'text': "\nHello\n\nthere"}], output, 'srt')
+    assert [c.text for c in read_subtitles(output)] == ["Hello\nthere"]
+
+    source = tmp_path / "in.vtt"
+    source.write_text("WEBVTT\n\n00:00:01.000 --> 00:00:02.000 align:start line:10%\nHello\n", encoding="utf-8")
+    convert(str(source), str(tmp_path / "out.vtt"))
+    assert [c.settings for c in read_subtitles(tmp_path / "out.vtt")] == ["align:start line:10%"]
+
+def test_ttml_preserved_space():
+    """Test xml:space="preserve" keeps runs of spaces and source line breaks."""
+    captions = list(iter_captions(
+        '<tt xmlns="http://www.w3.org/ns/ttml"><body><div>'
+        '<p begin="1s" end="2s" xml:space="preserve">A  B\nC</p></div></body></tt>'
+    ))
+    assert captions[0].text == "A  B\nC"
@@ -0,0 +1,141 @@
+import pytest
+from pathlib import Path
+from src.core.text_normalizer import normalize_text, Reflow
+from src.core.subtitle_processor import SubtitleProcessor
+from src.core.subtitle_formats import read_subtitles
+
+SAMPLE = Path(__file__).parent.parent / "data" / "test_subtitles" / "sample1.vtt"
+TAGGED_SAMPLE = SAMPLE.with_name("sample2.vtt")
+
+@pytest.fixture
+def reflow():
+    return Reflow(max_chars_per_line=42, max_lines=2, max_cps=17.0)
+
+def _cue(start_ms, end_ms, text):
+    return {'start_ms': start_ms, 'end_ms': end_ms, 'start': '', 'end': '', 'text': text, 'position': None}
+
+def test_normalize_text():
+    """Test control and zero-width characters, space runs and blank lines are removed."""
+    assert normalize_text("Hello\u0000World") == "HelloWorld"
+    assert normalize_text("Hello\u200bWorld with zero-width space") == "HelloWorld with zero-width space"
+    assert normalize_text("Multiple     spaces      and\n\n\n\nextra lines  ") == "Multiple spaces and\nextra lines"
+    assert normalize_text(" Tabs\tand non-breaking\r\n  spaces ") == "Tabs and non-breaking\nspaces"
+    assert normalize_text("Music \U0001f3b5 playing") == "Music playing"
+    assert normalize_text("Déjà vu ♪") == "Déjà vu ♪"
+    # Joiners carry meaning in Persian and Indic scripts and are kept
+    assert normalize_text("می‌خواهم") == "می‌خواهم"
+    assert normalize_text("क्‍ष") == "क्‍ष"
+    assert normalize_text("Family 👩‍👧 time") == "Family time"
+
+def test_break_lines(reflow):
+    """Test fitting lines are kept and long text is wrapped into balanced lines."""
+    assert reflow.break_lines("- Hi there\n- Hello") == ["- Hi there", "- Hello"]
+
+    lines = reflow.break_lines("This is a sample subtitle with multiple lines and some errors")
+    assert lines == ["This is a sample subtitle with", "multiple lines and some errors"]
+
+def test_break_lines_keeps_author_breaks(reflow):
+    """Test over-long lines are wrapped on their own while the author's line breaks still fit."""
+    lines = Reflow(max_lines=3).break_lines("Where exactly are you going this late at night,\nmy friend?")
+    assert lines == ["Where exactly are you going this late at", "night,", "my friend?"]
+
+    # Beyond max_lines all words are wrapped together
+    lines = reflow.break_lines("Where exactly are you going at this late hour,\nmy friend?")
+    assert lines == ["Where exactly are you going", "at this late hour, my friend?"]
+
+def test_dialogue_keeps_speaker_lines(reflow):
+    """Test dialogue cues keep each speaker on their own lines, splitting between speakers."""
+    text = "- Where exactly are you going at this hour?\n- Home."
+    assert reflow.break_lines(text) == ["- Where exactly are you going at this", "hour?", "- Home."]
+
+    pieces = reflow.apply([_cue(0, 4000, text)])
+    assert [piece['text'] for piece in pieces] == ["- Where exactly are you going at this\nhour?", "- Home."]
+    assert pieces[0]['end_ms'] == pieces[1]['start_ms']
+
+def test_long_cue_is_split(reflow):
+    """Test text beyond two lines is split into cues of similar length sharing the cue's time."""
+    text = ' '.join(f"word{i}" for i in range(60))
+    pieces = reflow.apply([_cue(0, 30000, text)])
+
+    assert len(pieces) > 1
+    assert all(len(piece['text'].split('\n')) <= 2 for piece in pieces)
+    assert all(len(line) <= 42 for piece in pieces for line in piece['text'].split('\n'))
+    assert ' '.join(piece['text'].replace('\n', ' ') for piece in pieces) == text
+    assert pieces[0]['start_ms'] == 0 and pieces[-1]['end_ms'] == 30000
+    assert all(a['end_ms'] == b['start_ms'] for a, b in zip(pieces, pieces[1:]))
+    assert pieces[1]['start'] == "00:00:{:06.3f}".format(pieces[1]['start_ms'] / 1000)
+
+def test_fast_cue_is_extended_into_gap(reflow):
+    """Test a cue read too fast is lengthened, keeping a gap before the next cue."""
+    full = "The next cue already fills both of its\nlines, so the two cannot be merged"
+    cues = reflow.apply([_cue(0, 1000, "This cue has far too many characters"), _cue(1500, 6000, full)])
+    assert cues[0]['end_ms'] == 1420
+
+    cues = reflow.apply([_cue(0, 1000, "This cue has far too many characters"), _cue(5000, 6000, "Next")])
+    assert cues[0]['end_ms'] == 2118
+    assert reflow.reading_speed(cues[0]) <= 17.0
+
+def test_fast_cues_are_merged(reflow):
+    """Test short fast cues close together are merged into one slower cue."""
+    cues = reflow.apply([_cue(0, 500, "Where are you going?"), _cue(520, 2500, "Home."), _cue(6000, 7000, "Later")])
+
+    assert [cue['text'] for cue in cues] == ["Where are you going?\nHome.", "Later"]
+    assert (cues[0]['start_ms'], cues[0]['end_ms']) == (0, 2500)
+
+def test_tags_take_no_space_and_are_never_split(reflow):
+    """Test markup is left out of line length and reading speed and stays whole."""
+    text = '<font face="Times New Roman">This one uses Times New Roman\nIt should be standardized</font>'
+    assert reflow.break_lines(text) == text.split('\n')
+    assert reflow.apply([_cue(5600, 8000, text)])[0]['text'] == text
+    assert reflow.reading_speed(_cue(0, 1000, "<i>Hello</i>")) == 5.0
+
+    lines = reflow.break_lines('<font face="Times New Roman">Where exactly are you going at this late hour?</font>')
+    assert lines == ['<font face="Times New Roman">Where exactly are you</font>',
+                     '<font face="Times New Roman">going at this late hour?</font>']
+
+def test_split_cues_reopen_tags(reflow):
+    """Test tags open across a cue split are closed and reopened so every cue is balanced."""
+    words = ' '.join(f"word{i}" for i in range(30))
+    pieces = reflow.apply([_cue(0, 20000, f"<i>{words}</i>")])
+
+    assert len(pieces) > 1
+    for piece in pieces:
+        for line in piece['text'].split('\n'):
+            assert line.startswith("<i>") and line.endswith("</i>")
+            assert len(line) - len("<i></i>") <= 42
+    assert ' '.join(p['text'].replace('\n', ' ') for p in pieces).replace("</i> <i>", " ") == f"<i>{words}</i>"
+
+    text = "<i>- Where exactly are you going at this hour?\n- Home, then <b>somewhere far away from here</b> I think.</i>"
+    pieces = reflow.apply([_cue(0, 20000, text)])
+    assert [p['text'] for p in pieces] == [
+        "<i>- Where exactly are you going at this</i>\n<i>hour?</i>",
+        "<i>- Home, then <b>somewhere far away from here</b></i>\n<i>I think.</i>"
+    ]
+
+def test_disabled_limits_pass_cues_through():
+    """Test cues are untouched when both limits are disabled."""
+    cues = [_cue(0, 100, "x" * 100)]
+    assert Reflow(max_chars_per_line=None, max_cps=None).apply(cues) == cues
+
+def test_processed_file_respects_limits(tmp_path, reflow, language_tool):
+    """Test processing a sample file yields clean text within the line length limit."""
+    processor = SubtitleProcessor(language_tool=language_tool, transcribe=object(),
+                                  translate=object(), rekognition=object(), reflow=reflow)
+    output_path = tmp_path / "output.vtt"
+    assert processor.process_subtitle_file(str(SAMPLE), str(output_path))
+
+    texts = [cue.text for cue in read_subtitles(str(output_path))]
+    assert "\u200b" not in ''.join(texts)
+    assert "Multiple spaces and" in texts
+    assert all(len(line) <= 42 for text in texts for line in text.split('\n'))
+
+def test_processed_file_keeps_tags_whole(tmp_path, reflow, language_tool):
+    """Test processing a file with font tags never breaks inside a tag or splits it across cues."""
+    processor = SubtitleProcessor(language_tool=language_tool, transcribe=object(),
+                                  translate=object(), rekognition=object(), reflow=reflow)
+    output_path = tmp_path / "output.vtt"
+    assert processor.process_subtitle_file(str(TAGGED_SAMPLE), str(output_path))
+
+    texts = [cue.text for cue in read_subtitles(str(output_path))]
+    assert '<font face="Times New Roman">This one uses Times New Roman\nIt should be standardized</font>' in texts
+    assert all(text.count("<font") == text.count("</font>") for text in texts)
@@ -0,0 +1,133 @@
+import pytest
+from src.core.video_processor import VideoProcessor
+
+class StubS3:
+    """Local S3 stand-in recording uploads and deletes."""
+
+    def __init__(self):
+        self.objects = set()
+        self.uploaded = []
+
+    def upload_file(self, filename, bucket, key):
+        self.objects.add(key)
+        self.uploaded.append(key)
+
+    def delete_object(self, Bucket, Key):
+        self.objects.discard(Key)
+
+class StubRekognition:
+    """Local Rekognition stand-in serving a paginated video text detection job."""
+
+    def __init__(self, detections, page_size=2, polls_before_done=1, status='SUCCEEDED'):
+        self.detections = detections
+        self.page_size = page_size
+        self.polls_before_done = polls_before_done
+        self.status = status
+        self.started = []
+        self.detect_text_calls = 0
+
+    def start_text_detection(self, Video):
+        self.started.append(Video)
+        return {'JobId': 'job-1'}
+
+    def get_text_detection(self, JobId, MaxResults=1000, NextToken=None):
+        if self.polls_before_done:
+            self.polls_before_done -= 1
+            return {'JobStatus': 'IN_PROGRESS'}
+        if self.status != 'SUCCEEDED':
+            return {'JobStatus': self.status, 'StatusMessage': 'bad video'}
+        start = int(NextToken or 0)
+        end = start + self.page_size
+        page = {'JobStatus': 'SUCCEEDED', 'TextDetections': self.detections[start:end]}
+        if end < len(self.detections):
+            page['NextToken'] = str(end)
+        return page
+
+    def detect_text(self, Image):
+        self.detect_text_calls += 1
+        return {'TextDetections': []}
+
+def _detection(timestamp_ms, text, kind='LINE'):
+    return {
+        'Timestamp': timestamp_ms,
+        'TextDetection': {
+            'DetectedText': text,
+            'Type': kind,
+            'Confidence': 98.5,
+            'Geometry': {'BoundingBox': {'Left': 0.1, 'Top': 0.8, 'Width': 0.3, 'Height': 0.05}}
+        }
+    }
+
+@pytest.fixture
+def detections():
+    return [
+        _detection(0, 'Introduction'),
+        _detection(0, 'Introduction', kind='WORD'),
+        _detection(500, 'Key Features'),
+        _detection(500, 'Lower third'),
+        _detection(1500, 'Outro'),
+    ]
+
+def test_video_job_backend_paginates_and_normalizes(tmp_path, detections):
+    """Test the video job backend collects every page into text_regions."""
+    s3 = StubS3()
+    rekognition = StubRekognition(detections)
+    processor = VideoProcessor(rekognition=rekognition, transcribe=object(), s3=s3, text_backend='video')
+    processor.poll_interval = 0
+    video_path = tmp_path / "video.mp4"
+    video_path.write_bytes(b'')
+
+    regions = processor._analyze_text_regions_video_job(str(video_path))
+
+    assert [r['timestamp'] for r in regions] == [0.0, 0.5, 1.5]
+    assert [region['text'] for region in regions[1]['regions']] == ['Key Features', 'Lower third']
+    assert regions[0]['regions'] == [{
+        'text': 'Introduction',
+        'confidence': 98.5,
+        'bbox': {'Left': 0.1, 'Top': 0.8, 'Width': 0.3, 'Height': 0.05}
+    }]
+    # Video staged once and cleaned up afterwards
+    assert len(s3.uploaded) == 1
+    assert not s3.objects
+    assert rekognition.started[0]['S3Object']['Name'] == s3.uploaded[0]
+
+def test_video_job_failure_raises_and_cleans_up(tmp_path, detections):
+    """Test a failed job raises and still removes the staged video."""
+    s3 = StubS3()
+    rekognition = StubRekognition(detections, status='FAILED')
+    processor = VideoProcessor(rekognition=rekognition, transcribe=object(), s3=s3)
+    processor.poll_interval = 0
+    video_path = tmp_path / "video.mp4"
+    video_path.write_bytes(b'')
+
+    with pytest.raises(Exception, match="bad video"):
+        processor._analyze_text_regions_video_job(str(video_path))
+    assert not s3.objects
+
+def test_backend_selection_by_duration():
+    """Test automatic backend choice by duration and explicit overrides."""
+    processor = VideoProcessor(rekognition=object(), transcribe=object(), s3=object(),
+                               video_backend_min_duration=60.0)
+    assert processor._select_text_backend(None) == 'image'
+    assert processor._select_text_backend(20.0) == 'image'
+    assert processor._select_text_backend(3 * 3600.0) == 'video'
+
+    processor = VideoProcessor(rekognition=object(), transcribe=object(), text_backend='image')
+    assert processor._select_text_backend(3 * 3600.0) == 'image'
+
+    with pytest.raises(ValueError):
+        VideoProcessor(rekognition=object(), transcribe=object(), text_backend='frames')
+
+def test_get_optimal_subtitle_positions_with_video_job_regions(tmp_path, detections):
+    """Test video job regions feed positioning like per-frame regions do."""
+    processor = VideoProcessor(rekognition=StubRekognition(detections), transcribe=object(), s3=StubS3())
+    processor.poll_interval = 0
+    video_path = tmp_path / "video.mp4"
+    video_path.write_bytes(b'')
+    regions = processor._analyze_text_regions_video_job(str(video_path))
+
+    positions = processor.get_optimal_subtitle_positions({
+        'metadata': {'width': 1920, 'height': 1080},
+        'text_regions': regions
+    })
+    assert [p['timestamp'] for p in positions] == [0.0, 0.5, 1.5]